@@ -9,9 +9,10 @@ Version: 1.0.0
 import base64
 import logging
 import re
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from functools import wraps
-from typing import Dict, Optional, Tuple
+from typing import Dict, Iterator, Optional, Tuple
 
 from cryptography.fernet import Fernet  # cryptography v41.0+
 from cryptography.hazmat.primitives import hashes
@@ -156,6 +157,16 @@ class SecurityManager:
             logger.error(f"Decryption failed: {str(e)}")
             raise RuntimeError("Decryption failed") from e
 
+    @contextmanager
+    def secure_context(self) -> Iterator["SecurityManager"]:
+        """Scope PHI processing to the current key version, logging failures."""
+        key_version = self._current_key_version
+        try:
+            yield self
+        except Exception:
+            logger.error(f"Secure processing failed under key version {key_version}")
+            raise
+
     def rotate_keys(self) -> bool:
         """Perform key rotation and update version tracking."""
         try:
@@ -7,28 +7,50 @@ Version: 1.0.0
 """
 
 import logging
+import os
+import re
+import threading
+from functools import wraps
 from typing import Dict, List, Optional, Tuple, Union
 import numpy as np
-from PIL import Image, ImageEnhance, ImageFilter
+from PIL import Image
 import cv2
+import pydicom  # pydicom v2.4+
+from pydicom.pixel_data_handlers import gdcm_handler, numpy_handler, pylibjpeg_handler
+from pydicom.pixel_data_handlers.util import apply_modality_lut, apply_voi_lut
 import torch
-from sklearn.preprocessing import StandardScaler
 from torch.cuda import is_available as cuda_available
 
+try:
+    import ahocorasick  # pyahocorasick v2.0+
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 from ml.utils.data import DataPreprocessor, clean_data
-from core.config import Settings
+from core.config import settings
 from core.security import SecurityManager
 
 # Configure logging
 logger = logging.getLogger(__name__)
-settings = Settings.get_settings()
 security_manager = SecurityManager(settings)
 
+# Prefer the compiled JPEG/JPEG-LS decoders for compressed DICOM pixel data
+pydicom.config.pixel_data_handlers = [pylibjpeg_handler, gdcm_handler, numpy_handler]
+
+# Device availability is fixed for the life of the process
+TORCH_CUDA_AVAILABLE = cuda_available()
+
+# OpenCV CUDA support is optional
+OPENCV_CUDA_AVAILABLE = cv2.cuda.getCudaEnabledDeviceCount() > 0
+
 # Constants for image processing
 TARGET_IMAGE_SIZE = (1024, 1024)
 MIN_IMAGE_RESOLUTION = (300, 300)
 SUPPORTED_IMAGE_FORMATS = ["PNG", "JPEG", "TIFF", "BMP", "DICOM"]
+DICOM_EXTENSIONS = (".dcm", ".dicom")
 DEFAULT_DPI = 300
+FEATURE_EPSILON = 1e-9
 
 # Quality thresholds
 QUALITY_THRESHOLDS = {
@@ -40,8 +62,64 @@ QUALITY_THRESHOLDS = {
     "max_brightness": 0.9
 }
 
+# Non-local means parameters for luminance denoising
+DENOISE_PARAMS = {
+    "h": 10,
+    "templateWindowSize": 7,
+    "searchWindowSize": 21
+}
+
+# Document enhancement factors (PIL ImageEnhance semantics)
+ENHANCEMENT_FACTORS = {
+    "contrast": 1.2,
+    "sharpness": 1.3,
+    "brightness": 1.1
+}
+
+# PIL's SMOOTH kernel, used by ImageEnhance.Sharpness as the degenerate image
+SMOOTH_KERNEL = np.array([[1, 1, 1],
+                          [1, 5, 1],
+                          [1, 1, 1]], dtype=np.float32) / 13.0
+IDENTITY_KERNEL = np.array([[0, 0, 0],
+                            [0, 1, 0],
+                            [0, 0, 0]], dtype=np.float32)
+
+# ITU-R 601-2 luma weights, matching PIL's RGB -> L conversion
+LUMA_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+def _is_word_char(char: str) -> bool:
+    """Match regex \\w semantics for term boundary checks."""
+    return char.isalnum() or char == "_"
+
+def _load_dicom_image(path: Union[str, os.PathLike]) -> Image.Image:
+    """Decode DICOM pixel data with pydicom, windowing it to the pipeline's 8-bit range."""
+    dataset = pydicom.dcmread(path)
+    pixels = dataset.pixel_array
+    if pixels.ndim == 4 or (pixels.ndim == 3 and pixels.shape[-1] != 3):
+        # Multi-frame series: documents are single images, keep the first frame
+        pixels = pixels[0]
+
+    if pixels.ndim == 2:
+        # Stored values to modality units (RescaleSlope/Intercept or a modality LUT), then
+        # the file's display window, both at full bit depth before reducing to 8 bits
+        pixels = apply_voi_lut(apply_modality_lut(pixels, dataset), dataset)
+        if dataset.get("PhotometricInterpretation") == "MONOCHROME1":
+            # MONOCHROME1 displays the lowest value as white
+            pixels = pixels.astype(np.float32)
+            pixels = pixels.max() + pixels.min() - pixels
+
+    if pixels.dtype != np.uint8:
+        # Min-max stretch of the windowed values instead of truncating high bits
+        pixels = pixels.astype(np.float32)
+        low, high = float(pixels.min()), float(pixels.max())
+        scale = 255.0 / (high - low) if high > low else 0.0
+        pixels = ((pixels - low) * scale).astype(np.uint8)
+
+    return Image.fromarray(pixels)
+
 def hipaa_compliant(func):
     """Decorator to ensure HIPAA compliance for document processing."""
+    @wraps(func)
     def wrapper(*args, **kwargs):
         try:
             # Create secure processing environment
@@ -55,8 +133,9 @@ def hipaa_compliant(func):
 
 def gpu_enabled(func):
     """Decorator to handle GPU acceleration when available."""
+    @wraps(func)
     def wrapper(*args, **kwargs):
-        use_gpu = cuda_available() and kwargs.get('use_gpu', True)
+        use_gpu = TORCH_CUDA_AVAILABLE and kwargs.get('use_gpu', True)
         if use_gpu:
             with torch.cuda.device(0):
                 return func(*args, **kwargs)
@@ -72,20 +151,21 @@ class DocumentPreprocessor:
                  quality_thresholds: Optional[Dict] = None):
         """Initialize document preprocessor with advanced configuration."""
         self.config = config or {}
-        self.use_gpu = use_gpu and cuda_available()
+        self.use_gpu = use_gpu and OPENCV_CUDA_AVAILABLE
         self.quality_thresholds = quality_thresholds or QUALITY_THRESHOLDS
         
         # Initialize processors and utilities
         self.image_processors = {
-            'denoise': cv2.fastNlMeansDenoisingColored,
-            'sharpen': ImageEnhance.Sharpness,
-            'contrast': ImageEnhance.Contrast,
-            'brightness': ImageEnhance.Brightness
+            'denoise': cv2.fastNlMeansDenoising,
+            'enhance': cv2.filter2D
         }
         
-        self.feature_scaler = StandardScaler()
         self.quality_metrics = {}
         
+        # Persistent upload buffer and stream per thread; batch callers preprocess from
+        # worker threads, and neither a GpuMat nor a stream is safe to share between them
+        self._gpu_local = threading.local()
+        
         # Load medical term mappings
         self._load_medical_mappings()
         
@@ -96,74 +176,237 @@ class DocumentPreprocessor:
         try:
             # Load medical term standardization mappings
             self.medical_term_mappings = {}  # Would load from a medical terminology service
+            self._term_matcher = self._build_term_matcher(self.medical_term_mappings)
             logger.info("Medical term mappings loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load medical mappings: {str(e)}")
             raise
 
+    @staticmethod
+    def _build_term_matcher(mappings: Dict[str, str]):
+        """Compile all term variants into one multi-pattern matcher."""
+        if not mappings:
+            return None
+
+        if AHOCORASICK_AVAILABLE:
+            automaton = ahocorasick.Automaton()
+            for variant, canonical in mappings.items():
+                automaton.add_word(variant, (len(variant), canonical))
+            automaton.make_automaton()
+            return automaton
+
+        # Longest variants first so the alternation prefers the longest match
+        variants = sorted(mappings, key=len, reverse=True)
+        return re.compile(r"(?<!\w)(?:" + "|".join(map(re.escape, variants)) + r")(?!\w)")
+
+    def _standardize_medical_terms(self, text: str) -> str:
+        """Replace known term variants with their canonical form in a single scan."""
+        if self._term_matcher is None:
+            return text
+
+        if not AHOCORASICK_AVAILABLE:
+            return self._term_matcher.sub(lambda m: self.medical_term_mappings[m.group(0)], text)
+
+        # Collect whole-word matches, then keep the leftmost-longest non-overlapping ones
+        matches = []
+        for end, (length, canonical) in self._term_matcher.iter(text):
+            start = end - length + 1
+            end += 1
+            if (start == 0 or not _is_word_char(text[start - 1])) and \
+                    (end == len(text) or not _is_word_char(text[end])):
+                matches.append((start, end, canonical))
+        matches.sort(key=lambda match: (match[0], -match[1]))
+
+        pieces = []
+        cursor = 0
+        for start, end, canonical in matches:
+            if start < cursor:
+                continue
+            pieces.append(text[cursor:start])
+            pieces.append(canonical)
+            cursor = end
+        pieces.append(text[cursor:])
+        return "".join(pieces)
+
     @hipaa_compliant
     @gpu_enabled
     def preprocess_image(self, 
-                        image: Image.Image,
+                        image: Union[Image.Image, str, os.PathLike],
                         preprocessing_params: Optional[Dict] = None) -> Tuple[Image.Image, Dict]:
         """Advanced document image preprocessing with quality validation."""
+        return self._preprocess_batch([image], preprocessing_params)[0]
+
+    @hipaa_compliant
+    @gpu_enabled
+    def preprocess_images(self,
+                          images: List[Union[Image.Image, str, os.PathLike]],
+                          preprocessing_params: Optional[Dict] = None
+                          ) -> List[Tuple[Image.Image, Dict]]:
+        """Preprocess a batch of document images, sharing one GPU synchronization."""
+        return self._preprocess_batch(images, preprocessing_params)
+
+    def _preprocess_batch(self,
+                          images: List[Union[Image.Image, str, os.PathLike]],
+                          preprocessing_params: Optional[Dict] = None
+                          ) -> List[Tuple[Image.Image, Dict]]:
+        """Run the preprocessing pipeline over one or more images."""
         try:
-            # Validate input image
-            if not isinstance(image, Image.Image):
-                raise ValueError("Input must be a PIL Image")
-            
-            # Convert to numpy array for GPU processing if needed
-            img_array = np.array(image)
-            
-            # Quality validation
-            quality_check, metrics, message = validate_image_quality(image, self.quality_thresholds)
-            if not quality_check:
-                logger.warning(f"Image quality validation failed: {message}")
-                self.quality_metrics.update(metrics)
+            img_arrays = []
+            for image in images:
+                # DICOM files go straight to pydicom; PIL cannot decode them
+                if isinstance(image, (str, os.PathLike)) and \
+                        os.fspath(image).lower().endswith(DICOM_EXTENSIONS):
+                    image = _load_dicom_image(image)
+                
+                # Validate input image
+                if not isinstance(image, Image.Image):
+                    raise ValueError("Input must be a PIL Image or a DICOM file path")
+                
+                # Quality validation
+                quality_check, metrics, message = validate_image_quality(
+                    image, self.quality_thresholds
+                )
+                if not quality_check:
+                    logger.warning(f"Image quality validation failed: {message}")
+                    self.quality_metrics.update(metrics)
+                
+                # asarray skips a second copy of the PIL buffer; nothing below writes to it
+                img_arrays.append(np.asarray(image))
             
             # GPU-accelerated processing if available
             if self.use_gpu:
-                img_tensor = torch.from_numpy(img_array).cuda()
-                # Apply GPU-optimized operations
-                img_tensor = self._gpu_denoise(img_tensor)
-                img_array = img_tensor.cpu().numpy()
-            
-            # Enhanced image processing pipeline
-            processed_image = Image.fromarray(img_array)
-            processed_image = self._enhance_document_image(processed_image, preprocessing_params)
+                img_arrays = self._gpu_denoise_batch(img_arrays)
+            else:
+                img_arrays = [self._denoise_luminance(img_array) for img_array in img_arrays]
             
-            # Final quality validation
-            final_metrics = self._compute_quality_metrics(processed_image)
+            results = []
+            for img_array in img_arrays:
+                # Enhanced image processing pipeline
+                processed_image = Image.fromarray(img_array)
+                processed_image = self._enhance_document_image(processed_image,
+                                                               preprocessing_params)
+                
+                # Final quality validation
+                final_metrics = self._compute_quality_metrics(processed_image)
+                results.append((processed_image, final_metrics))
             
-            return processed_image, final_metrics
+            return results
             
         except Exception as e:
             logger.error(f"Image preprocessing failed: {str(e)}")
             raise
 
+    def _compute_quality_metrics(self, image: Image.Image) -> Dict:
+        """Measure a processed image with the same checks as the input validation."""
+        _, metrics, _ = validate_image_quality(image, self.quality_thresholds)
+        return metrics
+
+    def _denoise_luminance(self, img_array: np.ndarray) -> np.ndarray:
+        """Denoise only the luminance plane; scanned documents carry no useful chroma detail."""
+        denoise = self.image_processors['denoise']
+
+        if img_array.ndim == 2:
+            return denoise(img_array, None, **DENOISE_PARAMS)
+
+        if img_array.ndim == 3 and img_array.shape[2] == 3:
+            y, cr, cb = cv2.split(cv2.cvtColor(img_array, cv2.COLOR_RGB2YCrCb))
+            y = denoise(y, None, **DENOISE_PARAMS)
+            return cv2.cvtColor(cv2.merge((y, cr, cb)), cv2.COLOR_YCrCb2RGB)
+
+        return img_array
+
+    def _gpu_denoise_batch(self, img_arrays: List[np.ndarray]) -> List[np.ndarray]:
+        """
+        Luminance denoising on the GPU for a batch of images.
+
+        Every upload, denoise and download is queued on this thread's stream so
+        transfers overlap with compute, and the host synchronizes only once.
+        """
+        gpu_input, stream = self._gpu_resources()
+        nlm_args = {
+            'search_window': DENOISE_PARAMS['searchWindowSize'],
+            'block_size': DENOISE_PARAMS['templateWindowSize'],
+            'stream': stream
+        }
+
+        results = []
+        for img_array in img_arrays:
+            if not (img_array.ndim == 2 or (img_array.ndim == 3 and img_array.shape[2] == 3)):
+                results.append(img_array)
+                continue
+
+            # Stream ordering makes reuse safe: the next upload queues behind this denoise
+            gpu_mat = gpu_input
+            gpu_mat.upload(img_array, stream)
+
+            if img_array.ndim == 2:
+                gpu_mat = cv2.cuda.fastNlMeansDenoising(gpu_mat, DENOISE_PARAMS['h'], **nlm_args)
+            else:
+                ycrcb = cv2.cuda.cvtColor(gpu_mat, cv2.COLOR_RGB2YCrCb, stream=stream)
+                y, cr, cb = cv2.cuda.split(ycrcb, stream=stream)
+                y = cv2.cuda.fastNlMeansDenoising(y, DENOISE_PARAMS['h'], **nlm_args)
+                merged = cv2.cuda.merge([y, cr, cb], stream=stream)
+                gpu_mat = cv2.cuda.cvtColor(merged, cv2.COLOR_YCrCb2RGB, stream=stream)
+
+            results.append(gpu_mat.download(stream))
+
+        stream.waitForCompletion()
+        return results
+
+    def _gpu_resources(self) -> Tuple["cv2.cuda_GpuMat", "cv2.cuda_Stream"]:
+        """This thread's upload buffer and CUDA stream, created on first use."""
+        local = self._gpu_local
+        if not hasattr(local, 'stream'):
+            # Re-uploading same-sized images reuses the buffer's device allocation
+            local.gpu_input = cv2.cuda_GpuMat()
+            local.stream = cv2.cuda_Stream()
+        return local.gpu_input, local.stream
+
     def _enhance_document_image(self, 
                               image: Image.Image,
                               params: Optional[Dict] = None) -> Image.Image:
-        """Apply document-specific image enhancements."""
+        """Apply document-specific image enhancements in a single fused pass."""
         try:
-            # Apply adaptive contrast enhancement
-            enhancer = self.image_processors['contrast'](image)
-            image = enhancer.enhance(1.2)
-            
-            # Optimize sharpness
-            enhancer = self.image_processors['sharpen'](image)
-            image = enhancer.enhance(1.3)
-            
-            # Normalize brightness
-            enhancer = self.image_processors['brightness'](image)
-            image = enhancer.enhance(1.1)
-            
-            # Resize if needed while maintaining aspect ratio
-            if image.size != TARGET_IMAGE_SIZE:
-                image.thumbnail(TARGET_IMAGE_SIZE, Image.Resampling.LANCZOS)
-            
-            return image
-            
+            # Only the dedicated key overrides the factors; other preprocessing params
+            # (thresholds, flags) must never be read as enhancement strengths
+            factors = {**ENHANCEMENT_FACTORS, **(params or {}).get('enhancement_factors', {})}
+            contrast = factors['contrast']
+            sharpness = factors['sharpness']
+            brightness = factors['brightness']
+
+            img_array = np.asarray(image)
+
+            # Contrast pivots around the mean luminance of the image
+            if img_array.ndim == 3:
+                channel_means = img_array[..., :3].mean(axis=(0, 1))
+                pivot = float(np.dot(channel_means, LUMA_WEIGHTS))
+            else:
+                pivot = float(img_array.mean())
+            pivot = int(pivot + 0.5)
+
+            # Contrast, sharpness and brightness are linear, so
+            # brightness(sharpen(contrast(x))) folds into one kernel + offset
+            kernel = brightness * contrast * (
+                sharpness * IDENTITY_KERNEL + (1.0 - sharpness) * SMOOTH_KERNEL
+            )
+            offset = brightness * (1.0 - contrast) * pivot
+
+            enhanced = self.image_processors['enhance'](
+                img_array, cv2.CV_32F, kernel,
+                delta=offset, borderType=cv2.BORDER_REPLICATE
+            )
+            np.clip(enhanced, 0, 255, out=enhanced)
+            enhanced = enhanced.astype(np.uint8)
+
+            # Downscale to fit TARGET_IMAGE_SIZE while maintaining aspect ratio
+            height, width = enhanced.shape[:2]
+            scale = min(TARGET_IMAGE_SIZE[0] / width, TARGET_IMAGE_SIZE[1] / height)
+            if scale < 1.0:
+                target = (max(1, round(width * scale)), max(1, round(height * scale)))
+                enhanced = cv2.resize(enhanced, target, interpolation=cv2.INTER_AREA)
+
+            return Image.fromarray(enhanced)
+
         except Exception as e:
             logger.error(f"Image enhancement failed: {str(e)}")
             raise
@@ -204,7 +447,7 @@ class DocumentPreprocessor:
         """Advanced feature extraction with medical document specifics."""
         try:
             # Convert image to numpy array
-            img_array = np.array(image)
+            img_array = np.asarray(image)
             
             # Extract document structure features
             structure_features = self._extract_structure_features(img_array)
@@ -213,8 +456,14 @@ class DocumentPreprocessor:
             medical_features = self._extract_medical_features(img_array)
             
             # Combine and normalize features
-            features = np.concatenate([structure_features, medical_features])
-            normalized_features = self.feature_scaler.fit_transform(features.reshape(1, -1))
+            features = np.concatenate([structure_features, medical_features]).astype(
+                np.float32, copy=False
+            )
+            # Standardize within the feature vector; fitting a scaler on a single
+            # row would only ever produce zeros
+            normalized_features = (
+                (features - features.mean()) / (features.std() + FEATURE_EPSILON)
+            ).reshape(1, -1)
             
             metrics = {
                 'feature_count': len(features),
@@ -250,9 +499,16 @@ def validate_image_quality(image: Image.Image,
             logger.warning("Could not determine image DPI")
         
         # Calculate image quality metrics
-        img_array = np.array(image)
-        metrics['contrast'] = np.std(img_array) / 255.0
-        metrics['brightness'] = np.mean(img_array) / 255.0
+        # meanStdDev rejects bilevel (bool) arrays and palette indices are not intensities,
+        # so modes other than L/RGB are measured on their 8-bit luminance
+        if image.mode not in ("L", "RGB"):
+            image = image.convert("L")
+        # Per-channel mean/std in one pass, pooled into whole-image statistics
+        channel_means, channel_stds = cv2.meanStdDev(np.asarray(image))
+        mean = float(channel_means.mean())
+        variance = float(np.mean(channel_stds ** 2 + channel_means ** 2)) - mean ** 2
+        metrics['contrast'] = np.sqrt(max(variance, 0.0)) / 255.0
+        metrics['brightness'] = mean / 255.0
         
         # Validate metrics against thresholds
         if metrics['contrast'] < quality_thresholds['min_contrast']:
@@ -12,7 +12,7 @@ import tensorflow as tf  # tensorflow v2.13.0
 from sklearn.ensemble import RandomForestRegressor  # scikit-learn v1.3.0
 
 # Internal imports
-from ml.health.analyzer import HealthAnalyzer
+from ml.health.analyzer import HealthAnalyzer as _CoreHealthAnalyzer
 from ml.health.predictor import LSTMHealthPredictor, RandomForestHealthPredictor
 from ml.health.preprocessor import HealthDataPreprocessor
 
@@ -44,14 +44,19 @@ SECURITY_CONFIG = {
     "data_retention_days": 730
 }
 
+ENSEMBLE_WEIGHTS = {
+    "lstm": 0.6,
+    "random_forest": 0.4
+}
+
 MODEL_MONITORING_CONFIG = {
     "drift_threshold": 0.1,
     "retraining_frequency_days": 30
 }
 
-class HealthAnalyzer:
+class HealthAnalyzerFacade:
     """
-    Core health analysis class providing comprehensive health data analysis capabilities
+    Package-level facade over the core health analyzer, adding ensemble prediction
     with enhanced security features and HIPAA compliance.
     """
     
@@ -63,13 +68,16 @@ class HealthAnalyzer:
             config (dict, optional): Configuration parameters for analysis
         """
         self.config = config or {}
+        # Fitted scalers and models are per facade; only process-wide device setup
+        # (done once inside the LSTM predictor) is shared
         self.preprocessor = HealthDataPreprocessor()
         self.lstm_predictor = LSTMHealthPredictor()
         self.rf_predictor = RandomForestHealthPredictor()
         
-        # Initialize analyzers with security configuration
-        self.analyzer = HealthAnalyzer(
-            config={**self.config, **SECURITY_CONFIG}
+        # Initialize analyzers with security configuration, reusing this facade's preprocessor
+        self.analyzer = _CoreHealthAnalyzer(
+            config={**self.config, **SECURITY_CONFIG},
+            preprocessor=self.preprocessor
         )
 
     def analyze_trends(self, health_data, metric_type):
@@ -147,20 +155,27 @@ class HealthAnalyzer:
             metric_type
         )
         
-        # Combine predictions with weighted ensemble
+        # Contiguous float32 views keep the ensemble arithmetic SIMD-friendly
+        def _as_f32(values):
+            return np.ascontiguousarray(values, dtype=np.float32)
+        
+        lstm_values = _as_f32(lstm_predictions['predictions'])
+        rf_values = _as_f32(rf_predictions['predictions'])
+        
+        # Weighted ensemble accumulated in place, without stacking both arrays
+        combined = lstm_values * np.float32(ENSEMBLE_WEIGHTS['lstm'])
+        combined += rf_values * np.float32(ENSEMBLE_WEIGHTS['random_forest'])
+        
         ensemble_predictions = {
-            'predictions': np.average([
-                lstm_predictions['predictions'],
-                rf_predictions['predictions']
-            ], weights=[0.6, 0.4], axis=0),
+            'predictions': combined,
             'confidence_intervals': {
                 'lower': np.minimum(
-                    lstm_predictions['confidence_intervals']['lower'],
-                    rf_predictions['confidence_intervals']['lower']
+                    _as_f32(lstm_predictions['confidence_intervals']['lower']),
+                    _as_f32(rf_predictions['confidence_intervals']['lower'])
                 ),
                 'upper': np.maximum(
-                    lstm_predictions['confidence_intervals']['upper'],
-                    rf_predictions['confidence_intervals']['upper']
+                    _as_f32(lstm_predictions['confidence_intervals']['upper']),
+                    _as_f32(rf_predictions['confidence_intervals']['upper'])
                 )
             },
             'model_metadata': {
@@ -171,9 +186,13 @@ class HealthAnalyzer:
         
         return ensemble_predictions
 
+# The facade is the package's public HealthAnalyzer
+HealthAnalyzer = HealthAnalyzerFacade
+
 # Export public components
 __all__ = [
     'HealthAnalyzer',
+    'HealthAnalyzerFacade',
     'SUPPORTED_METRICS',
     'DEFAULT_PREDICTION_HORIZON',
     'METRIC_WEIGHTS',
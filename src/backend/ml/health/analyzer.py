@@ -10,7 +10,13 @@ import pandas as pd  # pandas v2.0+
 import scipy.stats as stats  # scipy v1.9+
 import logging
 from typing import Dict, List, Optional, Tuple, Union
-from functools import wraps
+from functools import lru_cache, wraps
+
+try:
+    from numba import njit  # numba v0.57+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 from hipaa_security_validator import SecurityValidator  # hipaa_security_validator v2.1+
 from performance_monitoring import PerformanceMonitor  # performance_monitoring v1.0+
@@ -53,14 +59,54 @@ def hipaa_compliant(func):
         return func(*args, **kwargs)
     return wrapper
 
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _mean_std(values: np.ndarray) -> Tuple[float, float]:
+        """Population mean and standard deviation in one pass (Welford)."""
+        mean = 0.0
+        m2 = 0.0
+        for i in range(values.shape[0]):
+            delta = values[i] - mean
+            mean += delta / (i + 1)
+            m2 += delta * (values[i] - mean)
+        return mean, np.sqrt(m2 / values.shape[0])
+else:
+    def _mean_std(values: np.ndarray) -> Tuple[float, float]:
+        """Population mean and standard deviation, reusing the mean for the variance."""
+        mean = float(values.mean(dtype=np.float64))
+        centered = values - np.float32(mean)
+        return mean, float(np.sqrt(np.dot(centered, centered) / len(values)))
+
+def _zscore_flags(values: np.ndarray, mean: float, std: float,
+                  threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Return indices and z-scores of values whose |z| exceeds threshold."""
+    # Whole-vector float32 compare; no per-element branching
+    z_scores = np.abs((values - np.float32(mean)) * np.float32(1.0 / std))
+    indices = np.flatnonzero(z_scores > threshold)
+    return indices, z_scores[indices]
+
+@lru_cache(maxsize=1024)
+def _t_critical_value(confidence_level: float, n: int) -> float:
+    """Two-sided Student's t critical value, cached per (confidence level, sample size)."""
+    return float(stats.t.ppf((1 + confidence_level) / 2, n - 1))
+
+def _moving_average(cumsum: np.ndarray, window: int) -> np.ndarray:
+    """Trailing moving average from a zero-prefixed cumulative sum, NaN-padded like rolling()."""
+    n = len(cumsum) - 1
+    averages = np.full(n, np.nan)
+    if n >= window:
+        averages[window - 1:] = (cumsum[window:] - cumsum[:-window]) / window
+    return averages
+
 class HealthAnalyzer:
     """Core class for analyzing health data and generating insights with enhanced security and performance features."""
 
-    def __init__(self, config: Dict, logger: Optional[logging.Logger] = None):
+    def __init__(self, config: Dict, logger: Optional[logging.Logger] = None,
+                 preprocessor: Optional[HealthDataPreprocessor] = None):
         """Initialize health analyzer with security and monitoring capabilities."""
         self.config = config
         self.logger = logger or setup_logging()
-        self.preprocessor = HealthDataPreprocessor()
+        self.preprocessor = preprocessor or HealthDataPreprocessor()
         self.security_validator = SecurityValidator(security_level=SECURITY_LEVEL)
         self.performance_monitor = PerformanceMonitor()
         
@@ -93,9 +139,10 @@ class HealthAnalyzer:
             if metric_type not in SUPPORTED_METRICS:
                 raise ValueError(f"Unsupported metric type: {metric_type}")
             
-            # Preprocess data
+            # Preprocess data with the scalers fitted at training time (fitted on first
+            # use otherwise); analysis never refits them
             processed_data, quality_metrics = self.preprocessor.preprocess_health_metrics(
-                health_data, metric_type
+                health_data, metric_type, fit=False
             )
             
             if quality_metrics.get("quality_score", 0) < MINIMUM_DATA_QUALITY_SCORE:
@@ -106,18 +153,21 @@ class HealthAnalyzer:
                 processed_data, metric_type
             )
             
+            # Pull the metric column out of pandas once for all numeric passes
+            values = processed_data[metric_type].to_numpy(dtype=np.float32, copy=False)
+            
             # Calculate statistical trends
-            trend_results = self._calculate_trends(processed_data, metric_type)
+            trend_results = self._calculate_trends(values)
             
             # Detect anomalies
-            anomalies = self._detect_anomalies(processed_data, metric_type)
+            anomalies = self._detect_anomalies(values, processed_data.index)
             
             # Generate insights
             insights = self._generate_insights(trend_results, anomalies, metric_type)
             
             # Calculate confidence intervals
             confidence_intervals = self._calculate_confidence_intervals(
-                processed_data, trend_results
+                values, trend_results
             )
             
             analysis_results = {
@@ -137,53 +187,84 @@ class HealthAnalyzer:
             self.logger.error(f"Error in trend analysis for {metric_type}: {str(e)}")
             raise
 
-    def _calculate_trends(self, data: pd.DataFrame, metric_type: str) -> Dict:
+    def _calculate_trends(self, values: np.ndarray) -> Dict:
         """Calculate statistical trends with significance testing."""
         trends = {}
+        n = len(values)
+        if n < 2:
+            raise ValueError(f"At least 2 data points are required for trend analysis, got {n}")
+        
+        # A single cumulative sum feeds the statistics and both moving averages;
+        # it accumulates in float64 so window differences stay exact on long series
+        cumsum = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+        mean = cumsum[-1] / n
+        # Sums of squares and cross-products are also taken in float64: float32 dot
+        # products lose the slope on long or high-magnitude series
+        centered = np.asarray(values, dtype=np.float64) - mean
+        ss_y = float(np.dot(centered, centered))
         
         # Calculate basic statistics
-        trends["mean"] = float(data[metric_type].mean())
-        trends["std"] = float(data[metric_type].std())
+        trends["mean"] = float(mean)
+        trends["std"] = float(np.sqrt(ss_y / (n - 1)))
+        
+        # Calculate trend line (closed-form OLS against x = 0..n-1)
+        x_mean = (n - 1) / 2.0
+        ss_x = n * (n * n - 1) / 12.0
+        ss_xy = float(np.dot(np.arange(n, dtype=np.float64), centered))
+        slope = ss_xy / ss_x
+        intercept = mean - slope * x_mean
+        r_value = float(np.clip(ss_xy / np.sqrt(ss_x * ss_y), -1.0, 1.0)) if ss_y > 0 else 0.0
         
-        # Calculate trend line
-        x = np.arange(len(data))
-        slope, intercept, r_value, p_value, std_err = stats.linregress(x, data[metric_type])
+        # Two-sided p-value for a non-zero slope, as in scipy.stats.linregress
+        dof = n - 2
+        if dof == 0:
+            # Two points always fit exactly; linregress reports 1.0 only for a flat pair
+            p_value = 1.0 if ss_y == 0 else 0.0
+        elif abs(r_value) >= 1.0:
+            p_value = 0.0
+        else:
+            t_stat = r_value * np.sqrt(dof / ((1.0 - r_value) * (1.0 + r_value)))
+            p_value = float(2 * stats.t.sf(abs(t_stat), dof))
         
         trends["trend"] = {
             "slope": float(slope),
             "intercept": float(intercept),
             "r_squared": float(r_value ** 2),
-            "p_value": float(p_value),
+            "p_value": p_value,
             "significant": p_value < TREND_SIGNIFICANCE_LEVEL
         }
         
         # Calculate moving averages
         trends["moving_averages"] = {
-            "daily": data[metric_type].rolling(window=24).mean().tolist(),
-            "weekly": data[metric_type].rolling(window=168).mean().tolist()
+            "daily": _moving_average(cumsum, 24).tolist(),
+            "weekly": _moving_average(cumsum, 168).tolist()
         }
         
         return trends
 
-    def _detect_anomalies(self, data: pd.DataFrame, metric_type: str) -> List[Dict]:
+    def _detect_anomalies(self, values: np.ndarray, index: pd.Index) -> List[Dict]:
         """Detect anomalies using statistical methods."""
-        anomalies = []
-        values = data[metric_type].values
-        mean = np.mean(values)
-        std = np.std(values)
-        
-        for idx, value in enumerate(values):
-            z_score = abs((value - mean) / std)
-            if z_score > ANOMALY_THRESHOLD:
-                anomalies.append({
-                    "index": idx,
-                    "timestamp": data.index[idx].isoformat() if isinstance(data.index, pd.DatetimeIndex) else str(idx),
-                    "value": float(value),
-                    "z_score": float(z_score),
-                    "severity": "high" if z_score > 2 * ANOMALY_THRESHOLD else "medium"
-                })
-        
-        return anomalies
+        if len(values) == 0:
+            return []
+        mean, std = _mean_std(values)
+        if std == 0:
+            return []
+        
+        indices, z_scores = _zscore_flags(values, mean, std, ANOMALY_THRESHOLD)
+        high_severity = z_scores > 2 * ANOMALY_THRESHOLD
+        
+        # Only flagged points are materialized as dicts
+        is_datetime_index = isinstance(index, pd.DatetimeIndex)
+        return [
+            {
+                "index": int(idx),
+                "timestamp": index[idx].isoformat() if is_datetime_index else str(idx),
+                "value": float(values[idx]),
+                "z_score": float(z_score),
+                "severity": "high" if is_high else "medium"
+            }
+            for idx, z_score, is_high in zip(indices, z_scores, high_severity)
+        ]
 
     def _generate_insights(self, trends: Dict, anomalies: List[Dict], metric_type: str) -> List[Dict]:
         """Generate actionable insights from analysis results."""
@@ -210,16 +291,16 @@ class HealthAnalyzer:
         
         return insights
 
-    def _calculate_confidence_intervals(self, data: pd.DataFrame, trends: Dict) -> Dict:
+    def _calculate_confidence_intervals(self, values: np.ndarray, trends: Dict) -> Dict:
         """Calculate confidence intervals for trend predictions."""
         confidence_level = self.analysis_config["confidence_level"]
-        n = len(data)
+        n = len(values)
         
         # Calculate standard error
         std_error = trends["std"] / np.sqrt(n)
         
         # Calculate t-value for confidence level
-        t_value = stats.t.ppf((1 + confidence_level) / 2, n - 1)
+        t_value = _t_critical_value(confidence_level, n)
         
         # Calculate margins
         margin = t_value * std_error
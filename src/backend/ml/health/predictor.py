@@ -6,18 +6,22 @@ monitoring, and comprehensive error handling.
 Version: 1.0.0
 """
 
+import asyncio
+import logging
+import os
+import threading
+import time
 import numpy as np  # numpy v1.23+
 import pandas as pd  # pandas v2.0+
 import tensorflow as tf  # tensorflow v2.13+
 from sklearn.ensemble import RandomForestRegressor  # scikit-learn v1.2+
 from prometheus_client import Counter, Histogram, Gauge  # prometheus_client v0.17+
 from cryptography.fernet import Fernet  # cryptography v41.0+
-from functools import wraps
-from typing import Dict, List, Optional, Tuple, Union
+from functools import partial, wraps
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 from ml.health.preprocessor import HealthDataPreprocessor
-from ml.utils.metrics import ModelEvaluator
-from core.logging import setup_logging
+from ml.utils.metrics import ModelEvaluator, bootstrap_intervals
 from core.constants import HealthMetricType
 
 # Model configuration defaults
@@ -25,41 +29,141 @@ LSTM_DEFAULT_CONFIG = {
     "units": [64, 32],
     "dropout": 0.2,
     "learning_rate": 0.001,
-    "gpu_memory_limit": 0.8
+    "gpu_memory_limit": 0.8,
+    "mixed_precision": False
 }
 
 RF_DEFAULT_CONFIG = {
     "n_estimators": 100,
     "max_depth": 10,
-    "min_samples_split": 5
+    "min_samples_split": 5,
+    "n_jobs": -1,
+    "random_state": 42
 }
 
 SUPPORTED_METRICS = ["heart_rate", "blood_pressure", "steps", "weight", "sleep", "activity"]
 DEFAULT_PREDICTION_HORIZON = 7
+PREDICT_BATCH_SIZE = 128
+BATCH_MAX_WAIT_SECONDS = 0.005
+TFLITE_CALIBRATION_SAMPLES = 100
 
 # Monitoring metrics
 prediction_requests = Counter('health_prediction_requests_total', 'Total prediction requests', ['model_type', 'metric_type'])
 prediction_latency = Histogram('health_prediction_latency_seconds', 'Prediction latency', ['model_type'])
 model_accuracy = Gauge('health_model_accuracy', 'Model prediction accuracy', ['model_type', 'metric_type'])
 
+logger = logging.getLogger(__name__)
+
+# Bound metric children, keyed by label values, so the hot path skips labels() lookups
+_latency_children: Dict[str, Histogram] = {}
+_request_children: Dict[Tuple[str, str], Counter] = {}
+
+# GPU memory settings are process-wide and only take effect before TensorFlow
+# initializes the device, so they are applied once, by the first LSTM predictor
+_gpu_configured = False
+_gpu_config_lock = threading.Lock()
+
+def _configure_gpu_memory(gpus: List, memory_limit: int) -> None:
+    """Apply the GPU memory configuration once per process."""
+    global _gpu_configured
+    with _gpu_config_lock:
+        if _gpu_configured:
+            return
+        _gpu_configured = True
+        try:
+            tf.config.experimental.set_memory_growth(gpus[0], True)
+            tf.config.experimental.set_virtual_device_configuration(
+                gpus[0],
+                [tf.config.experimental.VirtualDeviceConfiguration(memory_limit=memory_limit)]
+            )
+        except RuntimeError as e:
+            logger.warning(f"GPU configuration failed: {str(e)}")
+
 def monitor_performance(func):
     """Decorator for monitoring model performance and logging."""
     @wraps(func)
-    def wrapper(*args, **kwargs):
-        with prediction_latency.labels(args[0].__class__.__name__).time():
-            try:
-                result = func(*args, **kwargs)
-                prediction_requests.labels(
-                    args[0].__class__.__name__,
-                    kwargs.get('metric_type', 'unknown')
-                ).inc()
-                return result
-            except Exception as e:
-                logger = setup_logging()
-                logger.error(f"Prediction error in {func.__name__}: {str(e)}")
-                raise
+    def wrapper(self, *args, **kwargs):
+        model_type = self.__class__.__name__
+        start = time.perf_counter()
+        try:
+            result = func(self, *args, **kwargs)
+        except Exception as e:
+            logger.error(f"Prediction error in {func.__name__}: {str(e)}")
+            raise
+        finally:
+            latency = _latency_children.get(model_type)
+            if latency is None:
+                latency = _latency_children[model_type] = prediction_latency.labels(model_type)
+            latency.observe(time.perf_counter() - start)
+        
+        request_key = (model_type, kwargs.get('metric_type', 'unknown'))
+        requests = _request_children.get(request_key)
+        if requests is None:
+            requests = _request_children[request_key] = prediction_requests.labels(*request_key)
+        requests.inc()
+        return result
     return wrapper
 
+class PredictionBatcher:
+    """Coalesces concurrent forward-pass requests into one batched call per wait window."""
+    
+    def __init__(self, predict_fn: Callable[[np.ndarray], np.ndarray],
+                 max_wait: float = BATCH_MAX_WAIT_SECONDS,
+                 max_batch_size: int = PREDICT_BATCH_SIZE):
+        """Initialize batcher around a batched prediction function."""
+        self._predict_fn = predict_fn
+        self.max_wait = max_wait
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[np.ndarray, asyncio.Future]] = []
+        self._pending_rows = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, X: np.ndarray) -> np.ndarray:
+        """Queue a batch of sequences and await its rows of the coalesced output."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((X, future))
+        self._pending_rows += len(X)
+        
+        if self._pending_rows >= self.max_batch_size:
+            self._flush(loop)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush, loop)
+        
+        return await future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start one forward pass over all pending requests."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        pending, self._pending, self._pending_rows = self._pending, [], 0
+        if not pending:
+            return
+        
+        # The forward pass runs in the default executor so the loop keeps accepting requests
+        batch = loop.run_in_executor(None, self._predict_fn,
+                                     np.concatenate([X for X, _ in pending]))
+        batch.add_done_callback(partial(self._resolve, pending))
+
+    @staticmethod
+    def _resolve(pending: List[Tuple[np.ndarray, asyncio.Future]],
+                 batch: asyncio.Future) -> None:
+        """Hand every request its rows of the batched output, or the shared failure."""
+        try:
+            outputs = batch.result()
+        except (Exception, asyncio.CancelledError) as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        offsets = np.cumsum([len(X) for X, _ in pending])[:-1]
+        for (_, future), output in zip(pending, np.split(outputs, offsets)):
+            if not future.done():
+                future.set_result(output)
+
 class LSTMHealthPredictor:
     """LSTM-based model for time series health metric predictions with enhanced security and monitoring."""
     
@@ -69,49 +173,151 @@ class LSTMHealthPredictor:
         self.preprocessor = HealthDataPreprocessor()
         self.evaluator = ModelEvaluator()
         self.model = None
-        self.logger = setup_logging()
+        self._predict_fn = None
+        self._tflite = None
+        self._calibration_data = None
+        self.batcher = PredictionBatcher(self._forward)
+        self.logger = logger
+        self.precision_policy = None
         
         # Configure GPU memory
         gpus = tf.config.experimental.list_physical_devices('GPU')
         if gpus:
-            try:
-                tf.config.experimental.set_memory_growth(gpus[0], True)
-                tf.config.experimental.set_virtual_device_configuration(
-                    gpus[0],
-                    [tf.config.experimental.VirtualDeviceConfiguration(
-                        memory_limit=self.config['gpu_memory_limit']
-                    )]
-                )
-            except RuntimeError as e:
-                self.logger.warning(f"GPU configuration failed: {str(e)}")
+            _configure_gpu_memory(gpus, self.config['gpu_memory_limit'])
+            
+            # Opt-in fp16 compute, applied while building; only pays off on Tensor Cores
+            if self.config['mixed_precision']:
+                self.precision_policy = 'mixed_float16'
 
     def _build_model(self, input_shape: Tuple[int, int, int]) -> None:
         """Build LSTM model architecture."""
-        model = tf.keras.Sequential()
+        # Layers capture the dtype policy at construction, so apply it only while building
+        # rather than leaking a process-wide policy into other models
+        previous_policy = tf.keras.mixed_precision.global_policy()
+        if self.precision_policy:
+            tf.keras.mixed_precision.set_global_policy(self.precision_policy)
+        try:
+            model = tf.keras.Sequential()
+            
+            # Add LSTM layers with dropout
+            for i, units in enumerate(self.config['units']):
+                return_sequences = i < len(self.config['units']) - 1
+                if i == 0:
+                    model.add(tf.keras.layers.LSTM(
+                        units, return_sequences=return_sequences,
+                        input_shape=input_shape
+                    ))
+                else:
+                    model.add(tf.keras.layers.LSTM(units, return_sequences=return_sequences))
+                model.add(tf.keras.layers.Dropout(self.config['dropout']))
+            
+            # Add output layer, kept in float32 so predictions and loss stay full precision
+            model.add(tf.keras.layers.Dense(1, dtype='float32'))
+            
+            optimizer = tf.keras.optimizers.Adam(learning_rate=self.config['learning_rate'])
+            if tf.keras.mixed_precision.global_policy().name == 'mixed_float16':
+                optimizer = tf.keras.mixed_precision.LossScaleOptimizer(optimizer)
+            
+            # Compile model
+            model.compile(
+                optimizer=optimizer,
+                loss='mse',
+                metrics=['mae']
+            )
+        finally:
+            tf.keras.mixed_precision.set_global_policy(previous_policy)
         
-        # Add LSTM layers with dropout
-        for i, units in enumerate(self.config['units']):
-            return_sequences = i < len(self.config['units']) - 1
-            if i == 0:
-                model.add(tf.keras.layers.LSTM(
-                    units, return_sequences=return_sequences,
-                    input_shape=input_shape
-                ))
-            else:
-                model.add(tf.keras.layers.LSTM(units, return_sequences=return_sequences))
-            model.add(tf.keras.layers.Dropout(self.config['dropout']))
+        self.model = model
+        self._compile_predict_fn(input_shape)
+
+    def _compile_predict_fn(self, input_shape: Tuple[int, ...]) -> None:
+        """Trace a fixed-signature inference graph once, ahead of the first request."""
+        model = self.model
+        # The unbounded batch dimension makes this single trace serve every batch size
+        self._predict_fn = tf.function(
+            lambda x: model(x, training=False),
+            input_signature=[tf.TensorSpec([None, *input_shape], tf.float32)]
+        )
+        self._predict_fn(tf.zeros((1, *input_shape), dtype=tf.float32))
+
+    def _forward(self, X: np.ndarray) -> np.ndarray:
+        """Run the traced inference graph over X in fixed-size batches."""
+        if self._tflite is not None:
+            return self._tflite_forward(X)
         
-        # Add output layer
-        model.add(tf.keras.layers.Dense(1))
+        if self._predict_fn is None:
+            self._compile_predict_fn(tuple(self.model.input_shape[1:]))
         
-        # Compile model
-        model.compile(
-            optimizer=tf.keras.optimizers.Adam(learning_rate=self.config['learning_rate']),
-            loss='mse',
-            metrics=['mae']
-        )
+        X = np.asarray(X, dtype=np.float32)
+        outputs = [
+            self._predict_fn(X[start:start + PREDICT_BATCH_SIZE]).numpy()
+            for start in range(0, len(X), PREDICT_BATCH_SIZE)
+        ]
+        return np.concatenate(outputs) if outputs else np.empty((0, 1), dtype=np.float32)
+
+    def export_tflite(self, int16x8: bool = True, output_path: Optional[str] = None) -> bytes:
+        """Export the trained model as a quantized TFLite flatbuffer and serve inference from it."""
+        if self.model is None or self._calibration_data is None:
+            raise RuntimeError("Model not trained. Call train() first.")
         
-        self.model = model
+        calibration_data = self._calibration_data
+        
+        def representative_dataset():
+            for sample in calibration_data:
+                yield [sample[np.newaxis]]
+        
+        try:
+            tflite_model = None
+            if int16x8:
+                converter = tf.lite.TFLiteConverter.from_keras_model(self.model)
+                converter.optimizations = [tf.lite.Optimize.DEFAULT]
+                converter.representative_dataset = representative_dataset
+                converter.target_spec.supported_ops = [
+                    tf.lite.OpsSet.EXPERIMENTAL_TFLITE_BUILTINS_ACTIVATIONS_INT16_WEIGHTS_INT8
+                ]
+                try:
+                    tflite_model = converter.convert()
+                except Exception as e:
+                    self.logger.warning(
+                        f"16x8 quantization unsupported, falling back to float16: {str(e)}"
+                    )
+            
+            if tflite_model is None:
+                converter = tf.lite.TFLiteConverter.from_keras_model(self.model)
+                converter.optimizations = [tf.lite.Optimize.DEFAULT]
+                converter.target_spec.supported_types = [tf.float16]
+                tflite_model = converter.convert()
+            
+            if output_path:
+                with open(output_path, 'wb') as f:
+                    f.write(tflite_model)
+            
+            self._tflite = tf.lite.Interpreter(model_content=tflite_model,
+                                               num_threads=os.cpu_count())
+            self._tflite.allocate_tensors()
+            return tflite_model
+            
+        except Exception as e:
+            self.logger.error(f"TFLite export failed: {str(e)}")
+            raise
+
+    def _tflite_forward(self, X: np.ndarray) -> np.ndarray:
+        """Run the quantized TFLite interpreter over X in fixed-size batches."""
+        input_details = self._tflite.get_input_details()[0]
+        output_index = self._tflite.get_output_details()[0]['index']
+        
+        X = np.asarray(X, dtype=np.float32)
+        outputs = []
+        for start in range(0, len(X), PREDICT_BATCH_SIZE):
+            batch = X[start:start + PREDICT_BATCH_SIZE]
+            if tuple(input_details['shape']) != batch.shape:
+                self._tflite.resize_tensor_input(input_details['index'], batch.shape)
+                self._tflite.allocate_tensors()
+                input_details = self._tflite.get_input_details()[0]
+            self._tflite.set_tensor(input_details['index'], batch)
+            self._tflite.invoke()
+            outputs.append(self._tflite.get_tensor(output_index).copy())
+        return np.concatenate(outputs) if outputs else np.empty((0, 1), dtype=np.float32)
 
     @monitor_performance
     def train(self, training_data: pd.DataFrame, metric_type: str,
@@ -123,7 +329,7 @@ class LSTMHealthPredictor:
             
             # Preprocess training data
             processed_data, preprocessing_metrics = self.preprocessor.preprocess_health_metrics(
-                training_data, metric_type
+                training_data, metric_type, fit=True
             )
             
             # Prepare sequences
@@ -157,15 +363,27 @@ class LSTMHealthPredictor:
                 verbose=1
             )
             
-            # Calculate and log metrics
-            train_metrics = self.evaluator.calculate_time_series_metrics(
-                y[:-int(len(y)*validation_split)],
-                self.model.predict(X[:-int(len(X)*validation_split)])
-            )
+            # Keep a calibration sample for quantized export; drop any stale TFLite model
+            self._calibration_data = np.asarray(X[:TFLITE_CALIBRATION_SAMPLES], dtype=np.float32)
+            self._tflite = None
             
-            model_accuracy.labels(
-                'lstm', metric_type
-            ).set(train_metrics['directional_accuracy'])
+            # Take loss/mae from the fit history at the epoch whose weights were kept
+            val_losses = history.history.get('val_loss')
+            best_epoch = int(np.argmin(val_losses)) if val_losses else -1
+            train_metrics = {
+                name: float(values[best_epoch]) for name, values in history.history.items()
+            }
+            
+            # Directional metrics only need a forward pass over the held-out split
+            n_val = int(len(X) * validation_split)
+            if n_val > 1:
+                train_metrics.update(self.evaluator.calculate_time_series_metrics(
+                    y[-n_val:],
+                    self._forward(X[-n_val:]).ravel()
+                ))
+                model_accuracy.labels(
+                    'lstm', metric_type
+                ).set(train_metrics['directional_accuracy'])
             
             return {
                 'history': history.history,
@@ -183,43 +401,71 @@ class LSTMHealthPredictor:
                prediction_horizon: int = DEFAULT_PREDICTION_HORIZON) -> Dict:
         """Generate predictions for future health metrics."""
         try:
-            if self.model is None:
-                raise RuntimeError("Model not trained. Call train() first.")
-            
-            # Preprocess input data
-            processed_data, _ = self.preprocessor.preprocess_health_metrics(
-                input_data, metric_type
-            )
-            
-            # Generate sequences
-            X, _, sequence_metadata = self.preprocessor.prepare_sequences(
-                processed_data,
-                sequence_length=self.config.get('sequence_length', 24)
-            )
+            X, sequence_metadata = self._prepare_input(input_data, metric_type)
             
             # Generate predictions
-            predictions = self.model.predict(X)
+            predictions = self._forward(X)
             
-            # Calculate prediction intervals
-            lower_bound, upper_bound, error_estimates = self.evaluator.calculate_prediction_intervals(
-                predictions,
-                confidence_level=0.95
+            return self._prediction_result(predictions, sequence_metadata)
+            
+        except Exception as e:
+            self.logger.error(f"LSTM prediction failed: {str(e)}")
+            raise
+
+    async def predict_async(self, input_data: pd.DataFrame, metric_type: str,
+                            prediction_horizon: int = DEFAULT_PREDICTION_HORIZON) -> Dict:
+        """Generate predictions, sharing one forward pass with concurrent requests."""
+        try:
+            loop = asyncio.get_running_loop()
+            X, sequence_metadata = await loop.run_in_executor(
+                None, self._prepare_input, input_data, metric_type
             )
             
-            return {
-                'predictions': predictions.tolist(),
-                'confidence_intervals': {
-                    'lower': lower_bound.tolist(),
-                    'upper': upper_bound.tolist()
-                },
-                'error_estimates': error_estimates,
-                'sequence_metadata': sequence_metadata
-            }
+            # Requests arriving within the batcher's wait window run as a single batch
+            predictions = await self.batcher.submit(X)
+            
+            return self._prediction_result(predictions, sequence_metadata)
             
         except Exception as e:
             self.logger.error(f"LSTM prediction failed: {str(e)}")
             raise
 
+    def _prepare_input(self, input_data: pd.DataFrame, metric_type: str) -> Tuple[np.ndarray, Dict]:
+        """Preprocess raw metrics into model input sequences."""
+        if self.model is None:
+            raise RuntimeError("Model not trained. Call train() first.")
+        
+        # Preprocess input data
+        processed_data, _ = self.preprocessor.preprocess_health_metrics(
+            input_data, metric_type
+        )
+        
+        # Generate sequences
+        X, _, sequence_metadata = self.preprocessor.prepare_sequences(
+            processed_data,
+            sequence_length=self.config.get('sequence_length', 24)
+        )
+        return X, sequence_metadata
+
+    @staticmethod
+    def _prediction_result(predictions: np.ndarray, sequence_metadata: Dict) -> Dict:
+        """Predictions with bootstrap confidence intervals."""
+        # Calculate prediction intervals
+        lower_bound, upper_bound, error_estimates = bootstrap_intervals(
+            predictions,
+            confidence_level=0.95
+        )
+        
+        return {
+            'predictions': predictions.tolist(),
+            'confidence_intervals': {
+                'lower': lower_bound.tolist(),
+                'upper': upper_bound.tolist()
+            },
+            'error_estimates': error_estimates,
+            'sequence_metadata': sequence_metadata
+        }
+
 class RandomForestHealthPredictor:
     """Random Forest model for feature-based health predictions."""
     
@@ -229,7 +475,7 @@ class RandomForestHealthPredictor:
         self.preprocessor = HealthDataPreprocessor()
         self.evaluator = ModelEvaluator()
         self.model = None
-        self.logger = setup_logging()
+        self.logger = logger
 
     @monitor_performance
     def train(self, training_data: pd.DataFrame, metric_type: str) -> Dict:
@@ -240,7 +486,7 @@ class RandomForestHealthPredictor:
             
             # Preprocess and extract features
             processed_data, preprocessing_metrics = self.preprocessor.preprocess_health_metrics(
-                training_data, metric_type
+                training_data, metric_type, fit=True
             )
             
             features, feature_metadata = self.preprocessor.extract_health_features(
@@ -293,7 +539,7 @@ class RandomForestHealthPredictor:
             predictions = self.model.predict(features)
             
             # Calculate prediction intervals using bootstrapping
-            lower_bound, upper_bound, error_estimates = self.evaluator.calculate_prediction_intervals(
+            lower_bound, upper_bound, error_estimates = bootstrap_intervals(
                 predictions,
                 confidence_level=0.95
             )
@@ -312,6 +558,32 @@ class RandomForestHealthPredictor:
             self.logger.error(f"Random Forest prediction failed: {str(e)}")
             raise
 
+    @monitor_performance
+    def predict_batch(self, input_frames: List[pd.DataFrame], metric_type: str) -> Dict:
+        """Generate one prediction per patient frame with a single forest traversal."""
+        try:
+            if self.model is None:
+                raise RuntimeError("Model not trained. Call train() first.")
+            
+            processed_frames = [
+                self.preprocessor.preprocess_health_metrics(input_data, metric_type)[0]
+                for input_data in input_frames
+            ]
+            features, feature_metadata = self.preprocessor.extract_health_features_batch(
+                processed_frames, metric_type
+            )
+            
+            predictions = self.model.predict(features)
+            
+            return {
+                'predictions': predictions.tolist(),
+                'feature_metadata': feature_metadata
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Random Forest batch prediction failed: {str(e)}")
+            raise
+
     def get_feature_importance(self) -> Dict[str, float]:
         """Get feature importance scores from the Random Forest model."""
         if self.model is None:
@@ -6,15 +6,31 @@ normalization, feature extraction, and validation specific to health data types.
 Version: 1.0.0
 """
 
+import hashlib
 import logging
+import warnings
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple, Union
 import numpy as np  # numpy v1.23+
 import pandas as pd  # pandas v2.0+
+import scipy.stats as stats  # scipy v1.9+
+from numpy.lib.stride_tricks import sliding_window_view
 from sklearn.preprocessing import StandardScaler, MinMaxScaler, RobustScaler  # scikit-learn v1.2+
 
+try:
+    from numba import njit, prange  # numba v0.57+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+try:
+    import xxhash  # xxhash v3.2+
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
 from ml.utils.data import DataPreprocessor
 from ml.utils.metrics import ModelEvaluator
-from core.logging import setup_logging
 from core.constants import HealthMetricType
 
 # Global constants for health data preprocessing
@@ -25,6 +41,124 @@ OUTLIER_ZSCORE_THRESHOLD = 3.0
 CACHE_SIZE_LIMIT = 1000
 VALIDATION_CONFIDENCE_THRESHOLD = 0.95
 MAX_SEQUENCE_GAP = 6
+SEQUENCE_DTYPE = np.float32
+
+def _frame_fingerprint(data: pd.DataFrame) -> int:
+    """Hash a frame's index and column buffers in place, without tobytes()/str() copies."""
+    hasher = xxhash.xxh3_64() if XXHASH_AVAILABLE else hashlib.blake2b(digest_size=8)
+    
+    for name, column in [("__index__", data.index), *data.items()]:
+        values = column.to_numpy() if hasattr(column, "to_numpy") else np.asarray(column)
+        if values.dtype == object:
+            # Object columns hold pointers; hash their contents instead
+            values = pd.util.hash_pandas_object(pd.Series(values), index=False).to_numpy()
+        hasher.update(str(name).encode())
+        hasher.update(np.ascontiguousarray(values).view(np.uint8))
+    
+    if XXHASH_AVAILABLE:
+        return hasher.intdigest()
+    return int.from_bytes(hasher.digest(), "little")
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _mask_outliers_inplace(values: np.ndarray, threshold: float) -> None:
+        """Replace per-column |z| > threshold entries with NaN, one thread per column."""
+        n_rows, n_cols = values.shape
+        for j in prange(n_cols):
+            count = 0
+            total = 0.0
+            for i in range(n_rows):
+                if not np.isnan(values[i, j]):
+                    total += values[i, j]
+                    count += 1
+            if count < 2:
+                continue
+            mean = total / count
+            
+            squares = 0.0
+            for i in range(n_rows):
+                if not np.isnan(values[i, j]):
+                    squares += (values[i, j] - mean) ** 2
+            std = np.sqrt(squares / (count - 1))
+            if std == 0.0:
+                continue
+            
+            for i in range(n_rows):
+                if abs(values[i, j] - mean) / std > threshold:
+                    values[i, j] = np.nan
+
+    # Load (or compile) the kernel at import rather than on the first request, in the
+    # layouts _handle_outliers passes: numba types a column-major copy as F-contiguous,
+    # except single-column copies, which are C-contiguous as well
+    for _dtype in (np.float32, np.float64):
+        for _shape in ((2, 1), (2, 2)):
+            _mask_outliers_inplace(np.zeros(_shape, dtype=_dtype, order="F"),
+                                   OUTLIER_ZSCORE_THRESHOLD)
+else:
+    def _mask_outliers_inplace(values: np.ndarray, threshold: float) -> None:
+        """Replace per-column |z| > threshold entries with NaN."""
+        # Constant columns yield NaN z-scores (never flagged); silence their warnings
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            z_scores = np.abs(stats.zscore(values, axis=0, ddof=1, nan_policy="omit"))
+        values[z_scores > threshold] = np.nan
+
+def _moments_from_central_sums(count, m2, m3, m4):
+    """Pandas-compatible std (ddof=1), skew (G1) and excess kurtosis (G2) from central sums."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        std = np.where(count > 1, np.sqrt(m2 / (count - 1)), np.nan)
+        variance = m2 / count
+        skew = np.sqrt(count * (count - 1)) / (count - 2) * (m3 / count) / variance ** 1.5
+        kurt = (count - 1) / ((count - 2) * (count - 3)) * (
+            (count + 1) * (m4 / count) / variance ** 2 - 3 * (count - 1)
+        )
+    skew = np.where(count > 2, np.where(m2 == 0, 0.0, skew), np.nan)
+    kurt = np.where(count > 3, np.where(m2 == 0, 0.0, kurt), np.nan)
+    return std, skew, kurt
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _central_sums(values: np.ndarray):
+        """Per-column count, mean and 2nd-4th central sums, skipping NaN."""
+        n_rows, n_cols = values.shape
+        count = np.zeros(n_cols)
+        mean = np.zeros(n_cols)
+        m2 = np.zeros(n_cols)
+        m3 = np.zeros(n_cols)
+        m4 = np.zeros(n_cols)
+        for j in prange(n_cols):
+            total = 0.0
+            for i in range(n_rows):
+                if not np.isnan(values[i, j]):
+                    total += values[i, j]
+                    count[j] += 1
+            mean[j] = total / count[j] if count[j] > 0 else np.nan
+            for i in range(n_rows):
+                if not np.isnan(values[i, j]):
+                    delta = values[i, j] - mean[j]
+                    delta_sq = delta * delta
+                    m2[j] += delta_sq
+                    m3[j] += delta_sq * delta
+                    m4[j] += delta_sq * delta_sq
+        return count, mean, m2, m3, m4
+else:
+    def _central_sums(values: np.ndarray):
+        """Per-column count, mean and 2nd-4th central sums, skipping NaN."""
+        count = np.sum(~np.isnan(values), axis=0).astype(np.float64)
+        with np.errstate(invalid="ignore"):
+            mean = np.nanmean(values, axis=0)
+        delta = values - mean
+        delta_sq = delta * delta
+        return (count, mean, np.nansum(delta_sq, axis=0),
+                np.nansum(delta_sq * delta, axis=0), np.nansum(delta_sq * delta_sq, axis=0))
+
+def _column_statistics(values: np.ndarray) -> List[np.ndarray]:
+    """Mean, std, skew, kurtosis and quartiles per column, matching the pandas reductions."""
+    count, mean, m2, m3, m4 = _central_sums(values)
+    std, skew, kurt = _moments_from_central_sums(count, m2, m3, m4)
+    # nanquantile selects with a partial sort; linear interpolation matches pandas
+    quartiles = np.nanquantile(values, [0.25, 0.5, 0.75], axis=0).T
+    return [mean, std, skew, kurt, quartiles]
 
 class HealthDataPreprocessor(DataPreprocessor):
     """Enhanced preprocessor for health data with comprehensive validation and scaling capabilities."""
@@ -47,9 +181,10 @@ class HealthDataPreprocessor(DataPreprocessor):
         
         # Setup metric-specific scalers
         self._initialize_metric_scalers(scaling_params or {})
+        self.scaler_generations = {metric: 0 for metric in SUPPORTED_METRICS}
         
         # Initialize preprocessing cache
-        self.preprocessing_cache = {}
+        self.preprocessing_cache = OrderedDict()
         self.cache_config = cache_config or {"max_size": CACHE_SIZE_LIMIT}
         
         # Setup quality metrics tracking
@@ -63,7 +198,7 @@ class HealthDataPreprocessor(DataPreprocessor):
         }
         
         # Setup logging
-        self.logger = setup_logging()
+        self.logger = logging.getLogger(__name__)
 
     def _initialize_metric_scalers(self, scaling_params: Dict) -> None:
         """Initialize specialized scalers for different health metric types."""
@@ -87,8 +222,17 @@ class HealthDataPreprocessor(DataPreprocessor):
 
     def preprocess_health_metrics(self, health_data: pd.DataFrame,
                                 metric_type: str,
-                                preprocessing_params: Optional[Dict] = None) -> Tuple[pd.DataFrame, Dict]:
-        """Enhanced preprocessing of raw health metrics with validation and error handling."""
+                                preprocessing_params: Optional[Dict] = None,
+                                fit: bool = False,
+                                use_cache: Optional[bool] = None) -> Tuple[pd.DataFrame, Dict]:
+        """
+        Enhanced preprocessing of raw health metrics with validation and error handling.
+        
+        Scalers are fitted when ``fit`` is set (training) or on first use; otherwise the
+        previously fitted state is reused via ``transform``. ``use_cache`` defaults to
+        ``not fit``: one-shot training frames are not worth fingerprinting. Fitting calls
+        never read the cache, since they must refit the scalers.
+        """
         try:
             # Input validation
             if not isinstance(health_data, pd.DataFrame):
@@ -99,36 +243,59 @@ class HealthDataPreprocessor(DataPreprocessor):
             # Initialize quality metrics
             quality_metrics = {"metric_type": metric_type}
             
-            # Check cache for existing transformations
-            cache_key = f"{metric_type}_{hash(str(health_data.values.tobytes()))}"
-            if cache_key in self.preprocessing_cache:
-                return self.preprocessing_cache[cache_key]
+            # Check cache for existing transformations; results are tied to the scaler
+            # generation that produced them
+            if use_cache is None:
+                use_cache = not fit
+            fingerprint = _frame_fingerprint(health_data) if use_cache else None
+            if use_cache and not fit:
+                cache_key = (metric_type, self.scaler_generations[metric_type],
+                             health_data.shape, fingerprint)
+                if cache_key in self.preprocessing_cache:
+                    self.preprocessing_cache.move_to_end(cache_key)
+                    return self.preprocessing_cache[cache_key]
+            
+            # Downcast once up front so every handler below works on float32 columns
+            float64_columns = health_data.select_dtypes(include=[np.float64]).columns
+            processed_data = health_data.astype({column: np.float32 for column in float64_columns})
             
             # Handle missing values
-            processed_data = self._handle_missing_data(health_data, preprocessing_params)
+            processed_data = self._handle_missing_data(processed_data, preprocessing_params)
             quality_metrics["missing_ratio"] = processed_data.isnull().sum().mean()
             
             # Handle outliers
             processed_data = self._handle_outliers(processed_data, metric_type)
             
             # Apply metric-specific normalization
+            if fit or not self._scalers_fitted(metric_type):
+                self.scaler_generations[metric_type] += 1
+                fit = True
+            
             if metric_type == "blood_pressure":
-                processed_data["systolic"] = self.metric_scalers[metric_type]["systolic"].fit_transform(
-                    processed_data["systolic"].values.reshape(-1, 1)
-                )
-                processed_data["diastolic"] = self.metric_scalers[metric_type]["diastolic"].fit_transform(
-                    processed_data["diastolic"].values.reshape(-1, 1)
-                )
+                for component in ("systolic", "diastolic"):
+                    processed_data[component] = self._apply_scaler(
+                        self.metric_scalers[metric_type][component],
+                        processed_data[component].values.reshape(-1, 1),
+                        fit
+                    )
             else:
                 numeric_columns = processed_data.select_dtypes(include=[np.number]).columns
-                processed_data[numeric_columns] = self.metric_scalers[metric_type].fit_transform(
-                    processed_data[numeric_columns]
+                processed_data[numeric_columns] = self._apply_scaler(
+                    self.metric_scalers[metric_type], processed_data[numeric_columns], fit
                 )
             
-            # Update cache
-            if len(self.preprocessing_cache) >= self.cache_config["max_size"]:
-                self.preprocessing_cache.pop(next(iter(self.preprocessing_cache)))
-            self.preprocessing_cache[cache_key] = (processed_data, quality_metrics)
+            # Scalers emit float64 for integer inputs; keep the whole frame float32
+            float_columns = processed_data.select_dtypes(include=[np.floating]).columns
+            processed_data[float_columns] = processed_data[float_columns].astype(np.float32)
+            
+            # Update cache under the generation in effect after any (first-use) fit, so a
+            # later transform of the same frame hits it
+            if use_cache:
+                cache_key = (metric_type, self.scaler_generations[metric_type],
+                             health_data.shape, fingerprint)
+                if len(self.preprocessing_cache) >= self.cache_config["max_size"]:
+                    self.preprocessing_cache.popitem(last=False)
+                self.preprocessing_cache[cache_key] = (processed_data, quality_metrics)
             
             return processed_data, quality_metrics
             
@@ -136,6 +303,18 @@ class HealthDataPreprocessor(DataPreprocessor):
             self.logger.error(f"Preprocessing failed for {metric_type}: {str(e)}")
             raise
 
+    def _scalers_fitted(self, metric_type: str) -> bool:
+        """Check whether the scaler(s) for a metric hold fitted state."""
+        scalers = self.metric_scalers[metric_type]
+        if isinstance(scalers, dict):
+            return all(hasattr(scaler, "n_features_in_") for scaler in scalers.values())
+        return hasattr(scalers, "n_features_in_")
+
+    @staticmethod
+    def _apply_scaler(scaler, values, fit: bool):
+        """Fit-and-transform during training, transform only otherwise."""
+        return scaler.fit_transform(values) if fit else scaler.transform(values)
+
     def extract_health_features(self, health_data: pd.DataFrame,
                               metric_type: str,
                               feature_params: Optional[Dict] = None) -> Tuple[np.ndarray, Dict]:
@@ -144,20 +323,24 @@ class HealthDataPreprocessor(DataPreprocessor):
             features = []
             feature_metadata = {}
             
-            # Basic statistical features
+            # Basic statistical features, all columns in one fused pass
             numeric_data = health_data.select_dtypes(include=[np.number])
-            features.extend([
-                numeric_data.mean(),
-                numeric_data.std(),
-                numeric_data.skew(),
-                numeric_data.kurtosis(),
-                numeric_data.quantile([0.25, 0.5, 0.75]).T.values.flatten()
-            ])
+            features.extend(_column_statistics(
+                np.asfortranarray(numeric_data.to_numpy(dtype=np.float64))
+            ))
             
             # Temporal features if timestamp available
             if "timestamp" in health_data.columns:
-                health_data["hour"] = pd.to_datetime(health_data["timestamp"]).dt.hour
-                health_data["day_of_week"] = pd.to_datetime(health_data["timestamp"]).dt.dayofweek
+                # Parse once; ISO8601 strings skip per-element format inference
+                timestamps = health_data["timestamp"]
+                if pd.api.types.is_string_dtype(timestamps):
+                    timestamps = pd.to_datetime(timestamps, format="ISO8601")
+                else:
+                    timestamps = pd.to_datetime(timestamps)
+                health_data = health_data.assign(
+                    hour=timestamps.dt.hour,
+                    day_of_week=timestamps.dt.dayofweek
+                )
                 
                 # Calculate time-based statistics
                 temporal_features = self._extract_temporal_features(health_data, metric_type)
@@ -181,6 +364,37 @@ class HealthDataPreprocessor(DataPreprocessor):
             self.logger.error(f"Feature extraction failed: {str(e)}")
             raise
 
+    def extract_health_features_batch(self, health_frames: List[pd.DataFrame],
+                                    metric_type: str,
+                                    feature_params: Optional[Dict] = None
+                                    ) -> Tuple[np.ndarray, List[Dict]]:
+        """Extract features for many patients into one (n_patients, n_features) float32 matrix."""
+        try:
+            feature_matrix = None
+            batch_metadata = []
+            
+            for row, health_data in enumerate(health_frames):
+                features, feature_metadata = self.extract_health_features(
+                    health_data, metric_type, feature_params
+                )
+                if feature_matrix is None:
+                    feature_matrix = np.empty((len(health_frames), features.size), dtype=np.float32)
+                elif features.size != feature_matrix.shape[1]:
+                    raise ValueError(
+                        f"Feature length mismatch for frame {row}: "
+                        f"{features.size} != {feature_matrix.shape[1]}"
+                    )
+                feature_matrix[row] = features
+                batch_metadata.append(feature_metadata)
+            
+            if feature_matrix is None:
+                feature_matrix = np.empty((0, 0), dtype=np.float32)
+            return feature_matrix, batch_metadata
+            
+        except Exception as e:
+            self.logger.error(f"Batch feature extraction failed: {str(e)}")
+            raise
+
     def prepare_sequences(self, health_data: pd.DataFrame,
                          sequence_length: int = DEFAULT_SEQUENCE_LENGTH,
                          sequence_params: Optional[Dict] = None) -> Tuple[np.ndarray, np.ndarray, Dict]:
@@ -200,25 +414,28 @@ class HealthDataPreprocessor(DataPreprocessor):
             gap_threshold = sequence_params.get("max_gap", MAX_SEQUENCE_GAP)
             health_data = self._handle_sequence_gaps(health_data, gap_threshold)
             
-            # Create sequences
-            sequences = []
-            targets = []
+            # Create sequences as zero-copy windows over the frame's values
+            n_windows = max(len(health_data) - sequence_length, 0)
+            n_features = health_data.shape[1]
+            all_numeric = all(pd.api.types.is_numeric_dtype(dtype) for dtype in health_data.dtypes)
+            values = health_data.to_numpy(dtype=SEQUENCE_DTYPE if all_numeric else None)
+            if n_windows:
+                windows = sliding_window_view(values, (sequence_length, n_features))[:n_windows, 0]
+            else:
+                windows = np.empty((0, sequence_length, n_features), dtype=values.dtype)
             
-            for i in range(len(health_data) - sequence_length):
-                seq = health_data.iloc[i:(i + sequence_length)]
-                
-                # Validate sequence continuity
-                if self._validate_sequence(seq, sequence_params):
-                    sequences.append(seq.values)
-                    if "target" in health_data.columns:
-                        targets.append(health_data.iloc[i + sequence_length]["target"])
+            # Validate sequence continuity for all windows at once
+            valid = self._validate_windows(health_data, sequence_length, n_windows, sequence_params)
             
-            # Convert to numpy arrays
-            X = np.array(sequences)
-            y = np.array(targets) if targets else np.array([])
+            # Materialize only the windows that passed validation in one contiguous copy
+            X = np.ascontiguousarray(windows[valid])
+            if "target" in health_data.columns:
+                y = health_data["target"].to_numpy()[sequence_length:][valid]
+            else:
+                y = np.array([])
             
             metadata.update({
-                "sequence_count": len(sequences),
+                "sequence_count": len(X),
                 "sequence_length": sequence_length,
                 "feature_dim": X.shape[-1] if len(X) > 0 else 0
             })
@@ -247,24 +464,58 @@ class HealthDataPreprocessor(DataPreprocessor):
         """Handle outliers using metric-specific strategies."""
         threshold = self.validation_thresholds["outlier_threshold"]
         
-        for column in data.select_dtypes(include=[np.number]).columns:
-            z_scores = np.abs((data[column] - data[column].mean()) / data[column].std())
-            data.loc[z_scores > threshold, column] = np.nan
+        numeric_columns = data.select_dtypes(include=[np.number]).columns
+        if len(numeric_columns):
+            # Work in the widest float dtype present (float32 after the up-front downcast);
+            # integer columns are promoted to it since masking introduces NaN
+            float_dtypes = [dtype for dtype in data[numeric_columns].dtypes
+                            if pd.api.types.is_float_dtype(dtype)]
+            dtype = np.result_type(np.float32, *float_dtypes)
+            
+            # Explicit writable copy, since to_numpy can return a read-only view under
+            # copy-on-write; column-major so each column is a contiguous scan for the kernel
+            values = np.array(data[numeric_columns].to_numpy(dtype=dtype), order="F", copy=True)
+            _mask_outliers_inplace(values, threshold)
+            data[numeric_columns] = values
         
         return self._handle_missing_data(data)
 
-    def _validate_sequence(self, sequence: pd.DataFrame,
-                         params: Dict) -> bool:
-        """Validate sequence quality and continuity."""
-        if sequence.isnull().sum().sum() / sequence.size > self.validation_thresholds["missing_ratio"]:
-            return False
+    def _handle_invalid_sequence(self, data: pd.DataFrame,
+                                 params: Optional[Dict] = None) -> pd.DataFrame:
+        """Drop rows that carry no observed values."""
+        return data.dropna(how="all")
+
+    def _handle_sequence_gaps(self, data: pd.DataFrame, max_gap: float) -> pd.DataFrame:
+        """Impute missing numeric values; windows spanning over-long gaps are rejected later."""
+        numeric_columns = data.select_dtypes(include=[np.number]).columns
+        if len(numeric_columns):
+            data = data.copy()
+            data[numeric_columns] = data[numeric_columns].interpolate(limit_direction="both")
+        return data
+
+    def _validate_windows(self, data: pd.DataFrame, sequence_length: int,
+                          n_windows: int, params: Dict) -> np.ndarray:
+        """Validate quality and continuity of every length-L window in one vectorized pass."""
+        if n_windows == 0:
+            return np.zeros(0, dtype=bool)
+        
+        # Missing-value ratio per window from a prefix sum of per-row missing counts
+        row_missing = data.isnull().to_numpy().sum(axis=1)
+        missing_cumsum = np.concatenate(([0], np.cumsum(row_missing)))
+        missing_counts = (missing_cumsum[sequence_length:sequence_length + n_windows]
+                          - missing_cumsum[:n_windows])
+        missing_ratios = missing_counts / (sequence_length * data.shape[1])
+        valid = missing_ratios <= self.validation_thresholds["missing_ratio"]
         
-        if "timestamp" in sequence.columns:
-            time_diffs = sequence["timestamp"].diff().dropna()
-            if (time_diffs > pd.Timedelta(params.get("max_gap", MAX_SEQUENCE_GAP), unit="H")).any():
-                return False
+        # Gaps between consecutive timestamps inside each window, same prefix-sum lookup
+        if "timestamp" in data.columns and sequence_length > 1:
+            max_gap = pd.Timedelta(params.get("max_gap", MAX_SEQUENCE_GAP), unit="h")
+            has_gap = (data["timestamp"].diff() > max_gap).to_numpy()[1:]
+            gap_cumsum = np.concatenate(([0], np.cumsum(has_gap)))
+            window_gaps = gap_cumsum[sequence_length - 1:sequence_length - 1 + n_windows]
+            valid &= window_gaps == gap_cumsum[:n_windows]
         
-        return True
+        return valid
 
 def validate_health_data(health_data: pd.DataFrame,
                         metric_type: str,
@@ -331,5 +582,9 @@ def _check_value_ranges(values: pd.Series, metric_type: HealthMetricType) -> boo
     
     if metric_type in ranges:
         min_val, max_val = ranges[metric_type]
-        return values.between(min_val, max_val).all()
+        array = values.to_numpy(dtype=np.float64)
+        if array.size == 0:
+            return True
+        # NaN propagates through min/max and fails the check, as with between()
+        return bool(array.min() >= min_val and array.max() <= max_val)
     return True
\ No newline at end of file
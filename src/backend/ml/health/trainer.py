@@ -6,17 +6,51 @@ with automated hyperparameter tuning and comprehensive monitoring.
 Version: 1.0.0
 """
 
+import base64
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from functools import partial
+
 import numpy as np  # numpy v1.23+
 import pandas as pd  # pandas v2.0+
 import tensorflow as tf  # tensorflow v2.13+
+from sklearn.ensemble import (  # scikit-learn v1.2+
+    HistGradientBoostingRegressor,
+    RandomForestRegressor
+)
+from sklearn.metrics import mean_squared_error  # scikit-learn v1.2+
 from sklearn.model_selection import train_test_split  # scikit-learn v1.2+
 import optuna  # optuna v3.0+
+from joblib import Parallel, delayed  # joblib v1.2+
 from prometheus_client import Counter, Gauge, Histogram  # prometheus_client v0.17+
-import mlflow  # mlflow v2.0+
+import mlflow  # mlflow v2.8+
 from typing import Dict, Optional, Tuple, Union
 
+try:
+    import cupy as cp  # cupy v12.0+
+    from cuml.ensemble import RandomForestRegressor as CuMLRandomForestRegressor  # cuml v23.04+
+    from cuml.metrics import mean_squared_error as cuml_mean_squared_error  # cuml v23.04+
+    CUML_AVAILABLE = True
+except ImportError:
+    CUML_AVAILABLE = False
+
+try:
+    import xxhash  # xxhash v3.2+
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
 from ml.health.preprocessor import HealthDataPreprocessor
 from ml.utils.metrics import ModelEvaluator
+from core.config import settings
+from core.security import SecurityManager
 
 # Global constants for model training
 DEFAULT_LSTM_CONFIG = {
@@ -24,16 +58,32 @@ DEFAULT_LSTM_CONFIG = {
     "epochs": 100,
     "early_stopping_patience": 10,
     "validation_split": 0.2,
-    "gpu_memory_limit": 0.8
+    "temporal_split": True,
+    "mixed_precision": True,
+    "predict_batch_size": 1024,
+    "jit_compile": False,
+    "sampler": "tpe"
+}
+
+# Arguments that keep Keras on the fused cuDNN LSTM kernel
+CUDNN_LSTM_KWARGS = {
+    "activation": "tanh",
+    "recurrent_activation": "sigmoid",
+    "recurrent_dropout": 0.0,
+    "unroll": False,
+    "use_bias": True
 }
 
 DEFAULT_RF_CONFIG = {
     "n_trials": 50,
-    "cv_folds": 5,
-    "scoring": "neg_mean_squared_error",
-    "n_jobs": -1
+    "pruning_steps": 4,
+    "n_jobs_inner": 2,
+    "rf_backend": "sklearn",
+    "use_gpu_io": True
 }
 
+MAX_PARALLEL_TRIALS = 8
+
 HYPERPARAMETER_SEARCH_SPACE = {
     "lstm": {
         "units": [32, 256],
@@ -45,50 +95,94 @@ HYPERPARAMETER_SEARCH_SPACE = {
         "n_estimators": [50, 500],
         "max_depth": [5, 30],
         "min_samples_split": [2, 20]
+    },
+    "hgb": {
+        "max_iter": [50, 500],
+        "max_depth": [3, 30],
+        "learning_rate": [1e-2, 3e-1],
+        "l2_regularization": [1e-6, 10.0]
     }
 }
 
+SAMPLER_SEED = 42
+
+PRUNER_CONFIG = {
+    "n_startup_trials": 5,
+    "n_warmup_steps": 3
+}
+
+# Batch size probing for the LSTM search
+BATCH_SIZE_CANDIDATES = (32, 64, 128, 256, 512, 1024)
+BATCH_PROBE_STEPS = 5
+BATCH_PROBE_MIN_GAIN = 0.05
+
+# On-disk cache of preprocessed training arrays (opt-in via "data_cache_dir"); bump the
+# version whenever preprocessing output changes so stale entries are never reused
+PREPROCESSING_CACHE_VERSION = 1
+DATA_CACHE_MAX_ENTRIES = 8
+
 MONITORING_CONFIG = {
     "metrics_port": 9090,
     "log_level": "INFO",
     "enable_tracing": True
 }
 
+# Prometheus collectors register process-wide, so they are created once and shared
+training_duration = Histogram('model_training_duration_seconds', 'Training duration')
+training_loss = Gauge('model_training_loss', 'Training loss value')
+training_accuracy = Gauge('model_accuracy', 'Model accuracy')
+training_iterations = Counter('model_training_iterations', 'Training iterations')
+
 class ModelTrainer:
     """Enhanced base class for training health prediction models with GPU optimization and monitoring."""
     
     def __init__(self, training_config: Dict, enable_gpu: bool = True):
         """Initialize model trainer with enhanced configuration and monitoring."""
         self.training_config = training_config
+        self.logger = logging.getLogger(__name__)
         self.preprocessor = HealthDataPreprocessor()
         self.evaluator = ModelEvaluator(enable_gpu=enable_gpu)
         
+        # Cached arrays are derived from PHI, so entries are encrypted at rest
+        self._security_manager = (SecurityManager(settings)
+                                  if training_config.get("data_cache_dir") else None)
+        
         # Configure GPU settings
         if enable_gpu:
             gpus = tf.config.list_physical_devices('GPU')
             if gpus:
                 try:
-                    for gpu in gpus:
-                        tf.config.experimental.set_memory_growth(gpu, True)
-                    tf.config.experimental.set_virtual_device_configuration(
-                        gpus[0],
-                        [tf.config.experimental.VirtualDeviceConfiguration(
-                            memory_limit=training_config.get("gpu_memory_limit", DEFAULT_LSTM_CONFIG["gpu_memory_limit"])
-                        )]
-                    )
+                    # A logical device limit disables memory growth, so apply exactly one:
+                    # a hard cap (in MB) for shared GPUs, otherwise on-demand growth
+                    memory_limit_mb = training_config.get("gpu_memory_limit_mb")
+                    if memory_limit_mb:
+                        tf.config.set_logical_device_configuration(
+                            gpus[0],
+                            [tf.config.LogicalDeviceConfiguration(memory_limit=memory_limit_mb)]
+                        )
+                    else:
+                        for gpu in gpus:
+                            tf.config.experimental.set_memory_growth(gpu, True)
                 except RuntimeError as e:
-                    print(f"GPU configuration error: {e}")
+                    self.logger.warning(f"GPU configuration error: {e}")
         
         # Initialize monitoring metrics
         self.metrics = {
-            "training_duration": Histogram('model_training_duration_seconds', 'Training duration'),
-            "loss_value": Gauge('model_training_loss', 'Training loss value'),
-            "accuracy": Gauge('model_accuracy', 'Model accuracy'),
-            "training_iterations": Counter('model_training_iterations', 'Training iterations')
+            "training_duration": training_duration,
+            "loss_value": training_loss,
+            "accuracy": training_accuracy,
+            "training_iterations": training_iterations
         }
         
         # Initialize MLflow tracking
-        mlflow.set_tracking_uri(training_config.get("mlflow_tracking_uri", "http://localhost:5000"))
+        # Local file store unless a tracking server is configured; async logging keeps
+        # remote round-trips off the training path
+        mlflow.set_tracking_uri(training_config.get(
+            "mlflow_tracking_uri", f"file://{os.path.abspath('mlruns')}"
+        ))
+        if training_config.get("mlflow_async_logging", True):
+            os.environ.setdefault("MLFLOW_ENABLE_ASYNC_LOGGING", "true")
+        self.quality_metrics: Dict = {}
         mlflow.set_experiment(training_config.get("experiment_name", "health_predictions"))
 
     def prepare_training_data(self, raw_data: pd.DataFrame, metric_type: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
@@ -98,27 +192,51 @@ class ModelTrainer:
             if not isinstance(raw_data, pd.DataFrame):
                 raise TypeError("Input must be a pandas DataFrame")
             
-            # Preprocess health metrics
-            processed_data, quality_metrics = self.preprocessor.preprocess_health_metrics(
-                raw_data,
-                metric_type,
-                preprocessing_params=self.training_config.get("preprocessing_params")
+            # Reuse preprocessed arrays for identical raw data and parameters
+            preprocessing_params = self.training_config.get("preprocessing_params")
+            cache_dir = self._data_cache_dir(
+                self._data_fingerprint(raw_data, metric_type, preprocessing_params)
             )
+            cached = self._load_cached_arrays(cache_dir)
+            
+            if cached is not None:
+                X, y, quality_metrics = cached
+            else:
+                # Preprocess health metrics
+                processed_data, quality_metrics = self.preprocessor.preprocess_health_metrics(
+                    raw_data,
+                    metric_type,
+                    preprocessing_params=preprocessing_params,
+                    fit=True
+                )
+                
+                # Split features and target as float32 to halve memory and host-to-device traffic
+                X = processed_data.drop(columns=['target']).to_numpy(dtype=np.float32)
+                y = processed_data['target'].to_numpy(dtype=np.float32)
+                self._store_cached_arrays(cache_dir, X, y, quality_metrics)
             
-            # Log data quality metrics
-            mlflow.log_metrics(quality_metrics)
+            # No-op for float32 entries; converts any float64 arrays cached before this change
+            X = np.asarray(X, dtype=np.float32)
+            y = np.asarray(y, dtype=np.float32)
             
-            # Split features and target
-            X = processed_data.drop(columns=['target']).values
-            y = processed_data['target'].values
+            # Keep data quality metrics for the single end-of-run metrics batch
+            self.quality_metrics = quality_metrics
             
             # Perform train-test split
-            X_train, X_val, y_train, y_val = train_test_split(
-                X, y,
-                test_size=self.training_config.get("validation_split", DEFAULT_LSTM_CONFIG["validation_split"]),
-                random_state=42,
-                shuffle=True
-            )
+            validation_split = self.training_config.get("validation_split",
+                                                        DEFAULT_LSTM_CONFIG["validation_split"])
+            if self.training_config.get("temporal_split", DEFAULT_LSTM_CONFIG["temporal_split"]):
+                # Hold out the most recent rows; contiguous views, no permutation or copy
+                split = int(len(X) * (1 - validation_split))
+                X_train, X_val = X[:split], X[split:]
+                y_train, y_val = y[:split], y[split:]
+            else:
+                X_train, X_val, y_train, y_val = train_test_split(
+                    X, y,
+                    test_size=validation_split,
+                    random_state=42,
+                    shuffle=True
+                )
             
             return X_train, X_val, y_train, y_val
             
@@ -126,84 +244,148 @@ class ModelTrainer:
             self.logger.error(f"Data preparation failed: {str(e)}")
             raise
 
+    def _log_run_metrics(self, train_metrics: Dict, val_metrics: Dict) -> None:
+        """Log data quality, train and validation metrics in one batched MLflow call."""
+        quality = {
+            f"quality_{k}": v for k, v in self.quality_metrics.items()
+            if isinstance(v, (int, float, np.number))
+        }
+        mlflow.log_metrics({
+            **quality,
+            **{f"train_{k}": v for k, v in train_metrics.items()},
+            **{f"val_{k}": v for k, v in val_metrics.items()}
+        })
+
+    @staticmethod
+    def _data_fingerprint(raw_data: pd.DataFrame, metric_type: str,
+                          preprocessing_params: Optional[Dict]) -> str:
+        """Content hash of a raw frame, its preprocessing settings and the preprocessing version."""
+        hasher = xxhash.xxh64() if XXHASH_AVAILABLE else hashlib.blake2b(digest_size=8)
+        hasher.update(pd.util.hash_pandas_object(raw_data).to_numpy().tobytes())
+        hasher.update(",".join(map(str, raw_data.columns)).encode())
+        hasher.update(json.dumps([PREPROCESSING_CACHE_VERSION, metric_type, preprocessing_params],
+                                 sort_keys=True, default=str).encode())
+        return hasher.hexdigest()
+
+    def _data_cache_dir(self, fingerprint: str) -> Optional[str]:
+        """Cache directory for a data fingerprint, or None when the on-disk cache is disabled."""
+        root = self.training_config.get("data_cache_dir")
+        return os.path.join(root, fingerprint) if root else None
+
+    def _load_cached_arrays(self, cache_dir: Optional[str]
+                            ) -> Optional[Tuple[np.ndarray, np.ndarray, Dict]]:
+        """Decrypt cached (X, y) arrays; quality.json is written last and marks a complete entry."""
+        if cache_dir is None:
+            return None
+        quality_path = os.path.join(cache_dir, "quality.json")
+        if not os.path.exists(quality_path):
+            return None
+        with open(quality_path) as f:
+            quality_metrics = json.load(f)
+        with open(os.path.join(cache_dir, "arrays.enc"), "rb") as f:
+            payload = base64.b64decode(self._security_manager.decrypt_phi(f.read()))
+        with np.load(io.BytesIO(payload)) as arrays:
+            X, y = arrays["X"], arrays["y"]
+        
+        # Mark the entry as recently used for eviction
+        os.utime(cache_dir)
+        return X, y, quality_metrics
+
+    def _store_cached_arrays(self, cache_dir: Optional[str], X: np.ndarray, y: np.ndarray,
+                             quality_metrics: Dict) -> None:
+        """Persist encrypted preprocessed arrays for later runs, keeping the cache bounded."""
+        if cache_dir is None:
+            return
+        buffer = io.BytesIO()
+        np.savez(buffer, X=X, y=y)
+        encrypted = self._security_manager.encrypt_phi(base64.b64encode(buffer.getvalue()).decode())
+        
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(os.path.join(cache_dir, "arrays.enc"), "wb") as f:
+            f.write(encrypted)
+        with open(os.path.join(cache_dir, "quality.json"), "w") as f:
+            json.dump(quality_metrics, f, default=float)
+        self._evict_cached_arrays(os.path.dirname(cache_dir))
+
+    def _evict_cached_arrays(self, root: str) -> None:
+        """Remove the least recently used entries beyond the configured cache size."""
+        max_entries = self.training_config.get("data_cache_max_entries", DATA_CACHE_MAX_ENTRIES)
+        entries = sorted((os.path.join(root, name) for name in os.listdir(root)),
+                         key=os.path.getmtime, reverse=True)
+        for stale in entries[max_entries:]:
+            shutil.rmtree(stale, ignore_errors=True)
+
 class LSTMTrainer(ModelTrainer):
     """GPU-optimized LSTM model trainer for health predictions."""
     
+    def __init__(self, training_config: Dict, enable_gpu: bool = True):
+        """Initialize LSTM trainer, resolving the dtype policy its models are built under."""
+        super().__init__(training_config, enable_gpu)
+        
+        # fp16 Tensor Core GEMMs inside the cuDNN LSTM cell, only on GPU and when enabled
+        use_mixed = (enable_gpu and bool(tf.config.list_physical_devices('GPU'))
+                     and training_config.get("mixed_precision",
+                                             DEFAULT_LSTM_CONFIG["mixed_precision"]))
+        self.precision_policy = 'mixed_float16' if use_mixed else 'float32'
+        # Distinguishes the dataset cache files of concurrent study workers
+        self.worker_id = 0
+        # Tuned per run when the caller leaves it unset; the caller's config is never written
+        self.batch_size = training_config.get("batch_size", DEFAULT_LSTM_CONFIG["batch_size"])
+
+    @contextmanager
+    def _precision_scope(self):
+        """Apply the trainer's dtype policy while building models, then restore the previous one."""
+        # Layers capture the policy at construction, so it must not leak to other models
+        previous_policy = tf.keras.mixed_precision.global_policy()
+        tf.keras.mixed_precision.set_global_policy(self.precision_policy)
+        try:
+            yield
+        finally:
+            tf.keras.mixed_precision.set_global_policy(previous_policy)
+    
     def train(self, raw_data: pd.DataFrame, metric_type: str) -> Tuple[tf.keras.Model, Dict]:
         """Train LSTM model with hyperparameter optimization and monitoring."""
         try:
-            with mlflow.start_run():
+            with mlflow.start_run(log_system_metrics=False):
                 # Log training parameters
                 mlflow.log_params(self.training_config)
                 
                 # Prepare data
                 X_train, X_val, y_train, y_val = self.prepare_training_data(raw_data, metric_type)
                 
-                # Define hyperparameter optimization
-                def objective(trial):
-                    # Define model architecture
-                    model = tf.keras.Sequential()
-                    n_layers = trial.suggest_int('n_layers', 
-                                               HYPERPARAMETER_SEARCH_SPACE["lstm"]["layers"][0],
-                                               HYPERPARAMETER_SEARCH_SPACE["lstm"]["layers"][1])
-                    
-                    for i in range(n_layers):
-                        units = trial.suggest_int(f'units_l{i}',
-                                                HYPERPARAMETER_SEARCH_SPACE["lstm"]["units"][0],
-                                                HYPERPARAMETER_SEARCH_SPACE["lstm"]["units"][1])
-                        dropout = trial.suggest_float(f'dropout_l{i}',
-                                                    HYPERPARAMETER_SEARCH_SPACE["lstm"]["dropout"][0],
-                                                    HYPERPARAMETER_SEARCH_SPACE["lstm"]["dropout"][1])
-                        
-                        if i == 0:
-                            model.add(tf.keras.layers.LSTM(units, input_shape=(X_train.shape[1:]), return_sequences=i < n_layers-1))
-                        else:
-                            model.add(tf.keras.layers.LSTM(units, return_sequences=i < n_layers-1))
-                        model.add(tf.keras.layers.Dropout(dropout))
-                    
-                    model.add(tf.keras.layers.Dense(1))
-                    
-                    # Compile model
-                    lr = trial.suggest_float('learning_rate',
-                                           HYPERPARAMETER_SEARCH_SPACE["lstm"]["learning_rate"][0],
-                                           HYPERPARAMETER_SEARCH_SPACE["lstm"]["learning_rate"][1],
-                                           log=True)
-                    model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=lr),
-                                loss='mse',
-                                metrics=['mae'])
-                    
-                    # Train model
-                    history = model.fit(
-                        X_train, y_train,
-                        batch_size=self.training_config.get("batch_size", DEFAULT_LSTM_CONFIG["batch_size"]),
-                        epochs=self.training_config.get("epochs", DEFAULT_LSTM_CONFIG["epochs"]),
-                        validation_data=(X_val, y_val),
-                        callbacks=[
-                            tf.keras.callbacks.EarlyStopping(
-                                patience=self.training_config.get("early_stopping_patience",
-                                                               DEFAULT_LSTM_CONFIG["early_stopping_patience"]),
-                                restore_best_weights=True
-                            )
-                        ],
-                        verbose=0
-                    )
-                    
-                    return history.history['val_loss'][-1]
+                # Perform hyperparameter optimization over datasets built once for all
+                # trials, one worker per GPU when a shared study storage is configured
+                data = (X_train, y_train, X_val, y_val)
+                n_trials = self.training_config.get("n_trials", DEFAULT_RF_CONFIG["n_trials"])
+                n_gpus = len(tf.config.list_physical_devices('GPU'))
                 
-                # Perform hyperparameter optimization
-                study = optuna.create_study(direction='minimize')
-                study.optimize(objective, n_trials=self.training_config.get("n_trials", DEFAULT_RF_CONFIG["n_trials"]))
+                # Size batches to the GPU unless the caller fixed one
+                if n_gpus and "batch_size" not in self.training_config:
+                    self.batch_size = self._tune_batch_size(X_train, y_train)
+                    mlflow.log_param("tuned_batch_size", self.batch_size)
+                if self.training_config.get("optuna_storage") and n_gpus > 1:
+                    self._optimize_across_gpus(n_gpus, data, n_trials, metric_type)
+                    study = self._create_study(metric_type)
+                else:
+                    study = self._create_study(metric_type)
+                    study.optimize(self._make_objective(*data), n_trials=n_trials)
                 
                 # Train final model with best parameters
                 best_params = study.best_params
                 final_model = self._train_final_model(X_train, y_train, X_val, y_val, best_params)
                 
-                # Calculate and log metrics
-                train_metrics = self.evaluator.calculate_regression_metrics(y_train, final_model.predict(X_train))
-                val_metrics = self.evaluator.calculate_regression_metrics(y_val, final_model.predict(X_val))
+                # Calculate and log metrics with large inference batches
+                predict_batch_size = self.training_config.get(
+                    "predict_batch_size", DEFAULT_LSTM_CONFIG["predict_batch_size"]
+                )
+                train_metrics = self.evaluator.calculate_regression_metrics(
+                    y_train, final_model.predict(X_train, batch_size=predict_batch_size, verbose=0)
+                )
+                val_metrics = self.evaluator.calculate_regression_metrics(
+                    y_val, final_model.predict(X_val, batch_size=predict_batch_size, verbose=0)
+                )
                 
-                mlflow.log_metrics({f"train_{k}": v for k, v in train_metrics.items()})
-                mlflow.log_metrics({f"val_{k}": v for k, v in val_metrics.items()})
+                self._log_run_metrics(train_metrics, val_metrics)
                 
                 # Save model artifacts
                 mlflow.tensorflow.log_model(final_model, "model")
@@ -214,57 +396,345 @@ class LSTMTrainer(ModelTrainer):
             self.logger.error(f"LSTM training failed: {str(e)}")
             raise
 
+    def _tune_batch_size(self, X_train: np.ndarray, y_train: np.ndarray) -> int:
+        """Double the batch size while per-sample step time keeps improving and memory allows."""
+        # Probe with the widest LSTM in the search space so the chosen size fits every trial
+        with self._precision_scope():
+            model = tf.keras.Sequential([
+                tf.keras.layers.LSTM(HYPERPARAMETER_SEARCH_SPACE["lstm"]["units"][1],
+                                     input_shape=X_train.shape[1:], **CUDNN_LSTM_KWARGS),
+                tf.keras.layers.Dense(1, dtype='float32')
+            ])
+        model.compile(optimizer=tf.keras.optimizers.Adam(), loss='mse')
+        
+        best_size, best_time = BATCH_SIZE_CANDIDATES[0], np.inf
+        for batch_size in BATCH_SIZE_CANDIDATES:
+            if batch_size > len(X_train):
+                break
+            x, y = X_train[:batch_size], y_train[:batch_size]
+            try:
+                model.train_on_batch(x, y)  # trace and allocate before timing
+                start = time.perf_counter()
+                for _ in range(BATCH_PROBE_STEPS):
+                    model.train_on_batch(x, y)
+                per_sample = (time.perf_counter() - start) / (BATCH_PROBE_STEPS * batch_size)
+            except tf.errors.ResourceExhaustedError:
+                break
+            
+            if per_sample > best_time * (1 - BATCH_PROBE_MIN_GAIN):
+                break
+            best_size, best_time = batch_size, per_sample
+        
+        return best_size
+
+    def _create_study(self, metric_type: str) -> optuna.Study:
+        """Create the pruned LSTM study, shared through RDB storage when configured."""
+        storage = self.training_config.get("optuna_storage")
+        experiment_name = self.training_config.get('experiment_name', 'health_predictions')
+        return optuna.create_study(
+            direction='minimize',
+            sampler=self._create_sampler(seed=None if storage else SAMPLER_SEED),
+            pruner=optuna.pruners.MedianPruner(**PRUNER_CONFIG),
+            storage=storage,
+            study_name=f"{experiment_name}_{metric_type}" if storage else None,
+            load_if_exists=bool(storage)
+        )
+
+    def _create_sampler(self, seed: Optional[int]) -> optuna.samplers.BaseSampler:
+        """Build the configured sampler; workers sharing a study must not share a seed."""
+        sampler = self.training_config.get("sampler", DEFAULT_LSTM_CONFIG["sampler"])
+        # The per-layer units/dropout only exist for some n_layers, so TPE models them jointly
+        tpe = optuna.samplers.TPESampler(multivariate=True, group=True, seed=seed)
+        if sampler == "tpe":
+            return tpe
+        if sampler == "cmaes":
+            # CMA-ES covers the shared continuous dimensions; conditional ones fall back to TPE
+            return optuna.samplers.CmaEsSampler(seed=seed, consider_pruned_trials=True,
+                                                independent_sampler=tpe)
+        if sampler == "gp":
+            return optuna.samplers.GPSampler(seed=seed, independent_sampler=tpe)
+        raise ValueError(f"Unsupported sampler: {sampler}")
+
+    def _optimize_across_gpus(self, n_gpus: int, data: Tuple, n_trials: int,
+                              metric_type: str) -> None:
+        """Run the study in one spawned worker per GPU, each pinned before CUDA initializes."""
+        context = multiprocessing.get_context("spawn")
+        trials_per_gpu = -(-n_trials // n_gpus)
+        visible_devices = os.environ.get("CUDA_VISIBLE_DEVICES")
+        workers = []
+        try:
+            for gpu_id in range(n_gpus):
+                # Spawned children inherit the environment at start()
+                os.environ["CUDA_VISIBLE_DEVICES"] = str(gpu_id)
+                worker = context.Process(
+                    target=_optimize_lstm_worker,
+                    args=(self.training_config, data, trials_per_gpu, metric_type,
+                          gpu_id, self.batch_size)
+                )
+                worker.start()
+                workers.append(worker)
+        finally:
+            if visible_devices is None:
+                os.environ.pop("CUDA_VISIBLE_DEVICES", None)
+            else:
+                os.environ["CUDA_VISIBLE_DEVICES"] = visible_devices
+        
+        for worker in workers:
+            worker.join()
+        failed = [gpu_id for gpu_id, worker in enumerate(workers) if worker.exitcode != 0]
+        if failed:
+            raise RuntimeError(f"Optuna workers failed on GPUs: {failed}")
+
+    def _build_datasets(self, X_train: np.ndarray, y_train: np.ndarray,
+                        X_val: np.ndarray, y_val: np.ndarray
+                        ) -> Tuple[tf.data.Dataset, tf.data.Dataset]:
+        """Build cached, batched and prefetched train/validation pipelines reused by every trial."""
+        batch_size = self.batch_size
+        train_cache, val_cache = self._dataset_cache_paths((X_train, y_train, X_val, y_val),
+                                                           batch_size)
+        
+        train_ds = (tf.data.Dataset.from_tensor_slices((X_train, y_train))
+                    .cache(train_cache)
+                    .shuffle(len(X_train), reshuffle_each_iteration=True)
+                    .batch(batch_size)
+                    .prefetch(tf.data.AUTOTUNE))
+        val_ds = (tf.data.Dataset.from_tensor_slices((X_val, y_val))
+                  .batch(batch_size)
+                  .cache(val_cache)
+                  .prefetch(tf.data.AUTOTUNE))
+        return train_ds, val_ds
+
+    def _dataset_cache_paths(self, data: Tuple, batch_size: int) -> Tuple[str, str]:
+        """On-disk tf.data cache files keyed by data, batch size and worker, or in-memory ("")."""
+        cache_path = self.training_config.get("dataset_cache_path", "")
+        if not cache_path:
+            return "", ""
+        
+        # tf.data replays an existing cache file without checking it, so stale or shared
+        # files would silently train on other data; hashing the split arrays themselves
+        # also separates runs that differ only in validation_split or temporal_split
+        hasher = hashlib.blake2b(digest_size=8)
+        for array in data:
+            hasher.update(np.ascontiguousarray(array).tobytes())
+        prefix = f"{cache_path}_{hasher.hexdigest()}_w{self.worker_id}"
+        # Validation batches are cached after batching, so the batch size is part of the key
+        return f"{prefix}_train", f"{prefix}_val_b{batch_size}"
+
+    def _make_objective(self, X_train: np.ndarray, y_train: np.ndarray,
+                        X_val: np.ndarray, y_val: np.ndarray):
+        """Resolve everything that is invariant across trials once and bind it to the objective."""
+        train_ds, val_ds = self._build_datasets(X_train, y_train, X_val, y_val)
+        fit_settings = {
+            "epochs": self.training_config.get("epochs", DEFAULT_LSTM_CONFIG["epochs"]),
+            "patience": self.training_config.get("early_stopping_patience",
+                                                 DEFAULT_LSTM_CONFIG["early_stopping_patience"]),
+            "jit_compile": self.training_config.get("jit_compile",
+                                                    DEFAULT_LSTM_CONFIG["jit_compile"]),
+            "mixed_precision": self.precision_policy == 'mixed_float16'
+        }
+        return partial(self._objective, train_ds=train_ds, val_ds=val_ds,
+                       input_shape=tuple(X_train.shape[1:]), fit_settings=fit_settings)
+
+    def _objective(self, trial: optuna.Trial, train_ds: tf.data.Dataset, val_ds: tf.data.Dataset,
+                   input_shape: Tuple[int, ...], fit_settings: Dict) -> float:
+        """Build, train and score one LSTM candidate for an Optuna trial."""
+        model, optimizer = self._build_candidate(trial, input_shape)
+        return self._fit_trial(trial, model, optimizer, train_ds, val_ds, fit_settings)
+
+    def _build_candidate(self, trial: optuna.Trial,
+                         input_shape: Tuple[int, ...]) -> Tuple[tf.keras.Model, object]:
+        """Build the LSTM and optimizer described by a trial under the trainer's dtype policy."""
+        space = HYPERPARAMETER_SEARCH_SPACE["lstm"]
+        
+        with self._precision_scope():
+            # Define model architecture
+            model = tf.keras.Sequential()
+            n_layers = trial.suggest_int('n_layers', *space["layers"])
+            
+            for i in range(n_layers):
+                units = trial.suggest_int(f'units_l{i}', *space["units"])
+                dropout = trial.suggest_float(f'dropout_l{i}', *space["dropout"])
+                
+                if i == 0:
+                    model.add(tf.keras.layers.LSTM(units, input_shape=input_shape,
+                                                   return_sequences=i < n_layers-1,
+                                                   **CUDNN_LSTM_KWARGS))
+                else:
+                    model.add(tf.keras.layers.LSTM(units, return_sequences=i < n_layers-1,
+                                                   **CUDNN_LSTM_KWARGS))
+                model.add(tf.keras.layers.Dropout(dropout))
+            
+            # Output stays float32 under mixed precision for a stable loss
+            model.add(tf.keras.layers.Dense(1, dtype='float32'))
+        
+        # Configure optimizer
+        lr = trial.suggest_float('learning_rate', *space["learning_rate"], log=True)
+        optimizer = tf.keras.optimizers.Adam(learning_rate=lr)
+        if self.precision_policy == 'mixed_float16':
+            optimizer = tf.keras.mixed_precision.LossScaleOptimizer(optimizer)
+        
+        return model, optimizer
+
+    def _train_final_model(self, X_train: np.ndarray, y_train: np.ndarray, X_val: np.ndarray,
+                           y_val: np.ndarray, best_params: Dict) -> tf.keras.Model:
+        """Retrain the best trial's architecture with the same loop and early stopping."""
+        objective = self._make_objective(X_train, y_train, X_val, y_val)
+        trial = optuna.trial.FixedTrial(best_params)
+        model, optimizer = self._build_candidate(trial, tuple(X_train.shape[1:]))
+        self._fit_trial(trial, model, optimizer, objective.keywords["train_ds"],
+                        objective.keywords["val_ds"], objective.keywords["fit_settings"])
+        model.compile(optimizer=optimizer, loss='mse', metrics=['mae'])
+        return model
+
+    def _fit_trial(self, trial: optuna.Trial, model: tf.keras.Model, optimizer,
+                   train_ds: tf.data.Dataset, val_ds: tf.data.Dataset, fit_settings: Dict) -> float:
+        """Train a trial model with graph-compiled steps, early stopping and per-epoch pruning."""
+        jit_compile = fit_settings["jit_compile"]
+        loss_scaled = fit_settings["mixed_precision"]
+        
+        @tf.function(jit_compile=jit_compile)
+        def train_step(x, y):
+            with tf.GradientTape() as tape:
+                predictions = model(x, training=True)
+                loss = tf.reduce_mean(tf.square(predictions - tf.reshape(y, (-1, 1))))
+                scaled_loss = optimizer.get_scaled_loss(loss) if loss_scaled else loss
+            gradients = tape.gradient(scaled_loss, model.trainable_variables)
+            if loss_scaled:
+                gradients = optimizer.get_unscaled_gradients(gradients)
+            optimizer.apply_gradients(zip(gradients, model.trainable_variables))
+            return loss
+        
+        @tf.function(jit_compile=jit_compile)
+        def val_step(x, y):
+            predictions = model(x, training=False)
+            return tf.reduce_sum(tf.square(predictions - tf.reshape(y, (-1, 1))))
+        
+        patience = fit_settings["patience"]
+        best_loss, best_weights, epochs_without_improvement = np.inf, None, 0
+        
+        for epoch in range(fit_settings["epochs"]):
+            for x, y in train_ds:
+                train_step(x, y)
+            
+            squared_error, count = 0.0, 0
+            for x, y in val_ds:
+                squared_error += val_step(x, y)
+                count += int(x.shape[0])
+            val_loss = float(squared_error) / max(count, 1)
+            
+            # Early stopping on val_loss, restoring the best weights at the end
+            if val_loss < best_loss:
+                best_loss, best_weights = val_loss, model.get_weights()
+                epochs_without_improvement = 0
+            else:
+                epochs_without_improvement += 1
+            
+            trial.report(val_loss, epoch)
+            if trial.should_prune():
+                raise optuna.TrialPruned(f"Trial pruned at epoch {epoch}")
+            if epochs_without_improvement >= patience:
+                break
+        
+        if best_weights is not None:
+            model.set_weights(best_weights)
+        return best_loss
+
+def _optimize_lstm_worker(training_config: Dict, data: Tuple, n_trials: int, metric_type: str,
+                          worker_id: int, batch_size: int) -> None:
+    """Worker entry point: run a share of the LSTM study on the GPU pinned by the parent."""
+    X_train, y_train, X_val, y_val = data
+    trainer = LSTMTrainer(training_config)
+    trainer.worker_id = worker_id
+    trainer.batch_size = batch_size
+    study = trainer._create_study(metric_type)
+    study.optimize(trainer._make_objective(X_train, y_train, X_val, y_val), n_trials=n_trials)
+
 class RandomForestTrainer(ModelTrainer):
     """Enhanced Random Forest model trainer for health predictions."""
     
     def train(self, raw_data: pd.DataFrame, metric_type: str) -> Tuple[object, Dict]:
         """Train Random Forest model with hyperparameter optimization and monitoring."""
         try:
-            with mlflow.start_run():
+            with mlflow.start_run(log_system_metrics=False):
                 # Log training parameters
                 mlflow.log_params(self.training_config)
                 
                 # Prepare data
                 X_train, X_val, y_train, y_val = self.prepare_training_data(raw_data, metric_type)
+                backend = self.training_config.get("rf_backend", DEFAULT_RF_CONFIG["rf_backend"])
+                model_class = self._resolve_model_class(backend)
+                
+                # GPU fits must not be multiplexed across processes or threads
+                inner_jobs = 1 if backend == "cuml" else self.training_config.get(
+                    "n_jobs_inner", DEFAULT_RF_CONFIG["n_jobs_inner"]
+                )
+                pruning_steps = self.training_config.get("pruning_steps",
+                                                         DEFAULT_RF_CONFIG["pruning_steps"])
                 
-                # Define hyperparameter optimization
+                # cuML copies host arrays to the device on every fit and predict; upload
+                # the split once so all trials and the final fit reuse device memory
+                use_gpu_io = self.training_config.get("use_gpu_io", DEFAULT_RF_CONFIG["use_gpu_io"])
+                if backend == "cuml" and use_gpu_io:
+                    device_data = tuple(cp.asarray(a) for a in (X_train, y_train, X_val, y_val))
+                else:
+                    device_data = (X_train, y_train, X_val, y_val)
+                
+                # Define hyperparameter optimization on a single holdout split
                 def objective(trial):
-                    params = {
-                        "n_estimators": trial.suggest_int("n_estimators",
-                                                        HYPERPARAMETER_SEARCH_SPACE["rf"]["n_estimators"][0],
-                                                        HYPERPARAMETER_SEARCH_SPACE["rf"]["n_estimators"][1]),
-                        "max_depth": trial.suggest_int("max_depth",
-                                                     HYPERPARAMETER_SEARCH_SPACE["rf"]["max_depth"][0],
-                                                     HYPERPARAMETER_SEARCH_SPACE["rf"]["max_depth"][1]),
-                        "min_samples_split": trial.suggest_int("min_samples_split",
-                                                             HYPERPARAMETER_SEARCH_SPACE["rf"]["min_samples_split"][0],
-                                                             HYPERPARAMETER_SEARCH_SPACE["rf"]["min_samples_split"][1])
-                    }
+                    params = self._suggest_params(trial, backend)
+                    if backend == "cuml":
+                        d_X_train, d_y_train, d_X_val, d_y_val = device_data
+                        model = model_class(**params)
+                        model.fit(d_X_train, d_y_train)
+                        return -float(cuml_mean_squared_error(d_y_val, model.predict(d_X_val)))
+                    
+                    # Grow the ensemble in warm-started increments, reporting after each
+                    size_param = "max_iter" if backend == "hgb" else "n_estimators"
+                    target_size = params[size_param]
+                    if backend == "sklearn":
+                        params["n_jobs"] = inner_jobs
+                    model = model_class(**params, warm_start=True)
                     
-                    model = RandomForestRegressor(**params)
-                    scores = cross_val_score(
-                        model, X_train, y_train,
-                        cv=self.training_config.get("cv_folds", DEFAULT_RF_CONFIG["cv_folds"]),
-                        scoring=self.training_config.get("scoring", DEFAULT_RF_CONFIG["scoring"]),
-                        n_jobs=self.training_config.get("n_jobs", DEFAULT_RF_CONFIG["n_jobs"])
-                    )
+                    for step in range(1, pruning_steps + 1):
+                        model.set_params(**{size_param: -(-target_size * step // pruning_steps)})
+                        model.fit(X_train, y_train)
+                        score = -mean_squared_error(y_val, model.predict(X_val))
+                        trial.report(score, step)
+                        if step < pruning_steps and trial.should_prune():
+                            raise optuna.TrialPruned(
+                                f"Trial pruned at {size_param}={model.get_params()[size_param]}"
+                            )
                     
-                    return scores.mean()
+                    return score
                 
-                # Perform hyperparameter optimization
-                study = optuna.create_study(direction='maximize')
-                study.optimize(objective, n_trials=self.training_config.get("n_trials", DEFAULT_RF_CONFIG["n_trials"]))
+                # Perform hyperparameter optimization, trials in parallel threads (the
+                # sklearn fits release the GIL) with fewer jobs each to avoid oversubscription
+                trial_jobs = 1 if backend == "cuml" else max(
+                    1, min((os.cpu_count() or 1) // inner_jobs, MAX_PARALLEL_TRIALS)
+                )
+                study = optuna.create_study(
+                    direction='maximize',
+                    pruner=optuna.pruners.SuccessiveHalvingPruner()
+                )
+                n_trials = self.training_config.get("n_trials", DEFAULT_RF_CONFIG["n_trials"])
+                study.optimize(objective, n_trials=n_trials, n_jobs=trial_jobs)
                 
                 # Train final model with best parameters
-                final_model = RandomForestRegressor(**study.best_params)
-                final_model.fit(X_train, y_train)
+                final_model = model_class(**study.best_params)
+                final_model.fit(*device_data[:2])
                 
                 # Calculate and log metrics
-                train_metrics = self.evaluator.calculate_regression_metrics(y_train, final_model.predict(X_train))
-                val_metrics = self.evaluator.calculate_regression_metrics(y_val, final_model.predict(X_val))
+                predict_batch_size = self.training_config.get(
+                    "predict_batch_size", DEFAULT_LSTM_CONFIG["predict_batch_size"]
+                )
+                train_metrics = self.evaluator.calculate_regression_metrics(
+                    y_train, self._predict_final(final_model, X_train, backend, predict_batch_size)
+                )
+                val_metrics = self.evaluator.calculate_regression_metrics(
+                    y_val, self._predict_final(final_model, X_val, backend, predict_batch_size)
+                )
                 
-                mlflow.log_metrics({f"train_{k}": v for k, v in train_metrics.items()})
-                mlflow.log_metrics({f"val_{k}": v for k, v in val_metrics.items()})
+                self._log_run_metrics(train_metrics, val_metrics)
                 
                 # Save model artifacts
                 mlflow.sklearn.log_model(final_model, "model")
@@ -273,4 +743,56 @@ class RandomForestTrainer(ModelTrainer):
                 
         except Exception as e:
             self.logger.error(f"Random Forest training failed: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    @staticmethod
+    def _resolve_model_class(backend: str):
+        """Map the rf_backend setting to an estimator class."""
+        if backend == "hgb":
+            return HistGradientBoostingRegressor
+        if backend == "cuml":
+            if not CUML_AVAILABLE:
+                raise ImportError("rf_backend 'cuml' requires RAPIDS cuML")
+            return CuMLRandomForestRegressor
+        if backend == "sklearn":
+            return RandomForestRegressor
+        raise ValueError(f"Unsupported rf_backend: {backend}")
+
+    @staticmethod
+    def _suggest_params(trial: optuna.Trial, backend: str) -> Dict:
+        """Sample estimator hyperparameters for the configured backend."""
+        if backend == "hgb":
+            space = HYPERPARAMETER_SEARCH_SPACE["hgb"]
+            return {
+                "max_iter": trial.suggest_int("max_iter", *space["max_iter"]),
+                "max_depth": trial.suggest_int("max_depth", *space["max_depth"]),
+                "learning_rate": trial.suggest_float("learning_rate", *space["learning_rate"],
+                                                     log=True),
+                "l2_regularization": trial.suggest_float("l2_regularization",
+                                                         *space["l2_regularization"], log=True)
+            }
+        
+        space = HYPERPARAMETER_SEARCH_SPACE["rf"]
+        return {
+            "n_estimators": trial.suggest_int("n_estimators", *space["n_estimators"]),
+            "max_depth": trial.suggest_int("max_depth", *space["max_depth"]),
+            "min_samples_split": trial.suggest_int("min_samples_split", *space["min_samples_split"])
+        }
+
+    @classmethod
+    def _predict_final(cls, model, X: np.ndarray, backend: str, chunk_size: int) -> np.ndarray:
+        """Score the final model, chunking across threads only for the sklearn forest."""
+        # cuML estimators must not be shared across host threads, and HistGradientBoosting
+        # prediction is already OpenMP-parallel, so both predict in a single call
+        if backend == "sklearn":
+            return cls._predict_chunked(model, X, chunk_size)
+        return model.predict(X)
+
+    @staticmethod
+    def _predict_chunked(model, X: np.ndarray, chunk_size: int) -> np.ndarray:
+        """Predict row chunks concurrently; sklearn forest traversal releases the GIL."""
+        chunks = np.array_split(X, max(1, -(-len(X) // chunk_size)))
+        predictions = Parallel(n_jobs=-1, prefer="threads")(
+            delayed(model.predict)(chunk) for chunk in chunks
+        )
+        return np.concatenate(predictions)
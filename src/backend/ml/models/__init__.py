@@ -8,8 +8,11 @@ Version: 1.0.0
 
 import logging
 import json
+import os
+import pathlib
+from functools import lru_cache, wraps
 from typing import Dict, Optional
-from jsonschema import validate, ValidationError  # jsonschema v4.0.0
+from jsonschema import Draft202012Validator, ValidationError  # jsonschema v4.0.0
 import semver  # semver v3.0.0
 
 from .document_classifier import DocumentClassifier
@@ -18,10 +21,9 @@ from .health_predictor import (
     LSTMHealthPredictor,
     RandomForestHealthPredictor
 )
-from core.logging import setup_logging
 
 # Configure logging
-logger = setup_logging()
+logger = logging.getLogger(__name__)
 
 # Model version configuration
 MODEL_VERSIONS = {
@@ -30,12 +32,25 @@ MODEL_VERSIONS = {
     "min_compatible_version": "0.9.0"
 }
 
-# Default model paths configuration
+def _parse_version(version: str) -> Optional[semver.Version]:
+    """Parse a semver string once, returning None when it is malformed."""
+    return semver.Version.parse(version) if semver.Version.is_valid(version) else None
+
+# Versions parsed once at import so checks compare Version objects directly
+_PARSED_VERSIONS = {name: _parse_version(version) for name, version in MODEL_VERSIONS.items()}
+
+# Default model paths configuration, relative to ALLOWED_ROOT
 DEFAULT_MODEL_PATHS = {
-    "document_classifier": "models/document_classifier",
-    "health_predictor": "models/health_predictor"
+    "document_classifier": "document_classifier",
+    "health_predictor": "health_predictor"
 }
 
+# Root directory that every resolved model path must stay within. Resolved once, at
+# import: a relative PHRSAT_MODEL_ROOT (or the "models" default) is taken against the
+# working directory of that moment, and later chdir calls or environment changes do not
+# move it. Model paths are not cached, so they always follow the current ALLOWED_ROOT
+ALLOWED_ROOT = pathlib.Path(os.environ.get("PHRSAT_MODEL_ROOT", "models")).resolve()
+
 # Model configuration schema
 MODEL_CONFIG_SCHEMA = {
     "type": "object",
@@ -56,8 +71,12 @@ MODEL_CONFIG_SCHEMA = {
     "required": ["version", "parameters"]
 }
 
+# Validator compiled once and reused for every config check
+_CONFIG_VALIDATOR = Draft202012Validator(MODEL_CONFIG_SCHEMA)
+
 def validate_model_name(func):
     """Decorator to validate model name against supported models."""
+    @wraps(func)
     def wrapper(model_name: str, *args, **kwargs):
         if model_name not in MODEL_VERSIONS:
             raise ValueError(f"Unsupported model: {model_name}")
@@ -66,6 +85,7 @@ def validate_model_name(func):
 
 def log_version_check(func):
     """Decorator to log version checking operations."""
+    @wraps(func)
     def wrapper(*args, **kwargs):
         logger.debug(f"Checking version for args: {args}, kwargs: {kwargs}")
         result = func(*args, **kwargs)
@@ -74,14 +94,18 @@ def log_version_check(func):
     return wrapper
 
 def validate_path_security(func):
-    """Decorator to validate path security."""
+    """Decorator to anchor a returned path at ALLOWED_ROOT and reject escapes from it."""
+    @wraps(func)
     def wrapper(*args, **kwargs):
-        path = func(*args, **kwargs)
-        if "../" in path or "~" in path:
+        # Joined onto the root rather than resolved against the CWD; absolute paths and
+        # ".." segments that leave the root fail the containment check
+        resolved = (ALLOWED_ROOT / func(*args, **kwargs)).resolve()
+        if not resolved.is_relative_to(ALLOWED_ROOT):
             raise SecurityError("Invalid path detected")
-        return path
+        return str(resolved)
     return wrapper
 
+@lru_cache(maxsize=16)
 @validate_model_name
 @log_version_check
 def get_model_version(model_name: str) -> str:
@@ -102,11 +126,12 @@ def get_model_version(model_name: str) -> str:
         min_version = MODEL_VERSIONS["min_compatible_version"]
         
         # Validate version format
-        if not semver.VersionInfo.isvalid(version):
+        parsed_version = _PARSED_VERSIONS[model_name]
+        if parsed_version is None:
             raise ValueError(f"Invalid version format for {model_name}: {version}")
             
         # Check version compatibility
-        if semver.compare(version, min_version) < 0:
+        if parsed_version < _PARSED_VERSIONS["min_compatible_version"]:
             raise ValueError(
                 f"Model version {version} is below minimum compatible version {min_version}"
             )
@@ -127,7 +152,7 @@ def get_model_path(model_name: str) -> str:
         model_name: Name of the model
         
     Returns:
-        Validated model path
+        Validated absolute model path beneath ALLOWED_ROOT
         
     Raises:
         ValueError: If model path is invalid
@@ -164,13 +189,13 @@ def validate_model_config(config: Dict, model_name: str) -> bool:
     """
     try:
         # Validate against schema
-        validate(instance=config, schema=MODEL_CONFIG_SCHEMA)
+        _CONFIG_VALIDATOR.validate(config)
         
         # Validate version compatibility
         version = config.get("version")
         if version:
             min_version = MODEL_VERSIONS["min_compatible_version"]
-            if semver.compare(version, min_version) < 0:
+            if semver.Version.parse(version) < _PARSED_VERSIONS["min_compatible_version"]:
                 raise ValidationError(
                     f"Configuration version {version} is below minimum compatible version {min_version}"
                 )
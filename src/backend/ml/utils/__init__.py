@@ -14,7 +14,8 @@ from ml.utils.data import DataPreprocessor, clean_data, create_feature_matrix  #
 from ml.utils.metrics import (  # v1.0.0
     ModelEvaluator,
     calculate_confidence_score,
-    calculate_prediction_intervals
+    calculate_prediction_intervals,
+    bootstrap_intervals
 )
 from ml.utils.visualization import (  # v1.0.0
     HealthMetricsVisualizer,
@@ -86,8 +87,9 @@ class MLUtilsManager:
         if metric_type not in SUPPORTED_METRIC_TYPES:
             raise ValueError(f"Unsupported metric type: {metric_type}")
             
+        # asarray is a no-op for float32 ndarrays; pass float32 to avoid the cast copy
         processed_data = self.preprocessor.normalize_health_metrics(
-            np.array(data),
+            np.asarray(data, dtype=np.float32),
             metric_type
         )
         
@@ -184,6 +186,7 @@ __all__ = [
     'create_feature_matrix',
     'calculate_confidence_score',
     'calculate_prediction_intervals',
+    'bootstrap_intervals',
     'create_prediction_plot',
     'VERSION',
     'SUPPORTED_METRIC_TYPES',
@@ -7,16 +7,30 @@ Version: 1.0.0
 """
 
 import logging
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, List, Optional, Set, Tuple, Union
 import numpy as np  # numpy v1.23+
+from numpy.lib.stride_tricks import sliding_window_view  # numpy v1.20+
 import pandas as pd  # pandas v2.0+
+from joblib import Parallel, delayed  # joblib v1.2+
 from sklearn.preprocessing import StandardScaler, MinMaxScaler, RobustScaler  # scikit-learn v1.2+
 
-from core.logging import setup_logging
+try:
+    from numba import njit, prange  # numba v0.57+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+try:
+    import cupy as cp  # cupy v12.0+
+    from cuml import preprocessing as cuml_preprocessing  # cuml v23.04+
+    CUML_AVAILABLE = True
+except ImportError:
+    CUML_AVAILABLE = False
+
 from core.config import Settings
 
 # Configure logging
-logger = setup_logging()
+logger = logging.getLogger(__name__)
 settings = Settings.get_settings()
 
 # Global constants
@@ -24,44 +38,135 @@ SUPPORTED_METRIC_TYPES = ["heart_rate", "blood_pressure", "steps", "weight", "sl
 DEFAULT_SEQUENCE_LENGTH = 24
 OUTLIER_THRESHOLD = 3.0
 DEFAULT_MISSING_STRATEGY = "forward_fill"
+FORWARD_FILL_STRATEGIES = ("forward_fill", "ffill", "pad")
+BACKWARD_FILL_STRATEGIES = ("backward_fill", "bfill", "backfill")
+GPU_MIN_ROWS = 100_000
+INT8_MAX = 127
+# Codes stay within +/-INT8_MAX, leaving the int8 minimum free to mark missing values
+INT8_NAN_CODE = -INT8_MAX - 1
+CORRELATION_SAMPLE_ROWS = 50_000
 DATA_QUALITY_THRESHOLDS = {
     "missing_ratio": 0.1,
     "outlier_ratio": 0.05,
     "correlation_threshold": 0.95
 }
 
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _ffill_columns_inplace(values: np.ndarray) -> None:
+        """Carry the last observed value forward down each column, one thread per column."""
+        n_rows, n_cols = values.shape
+        for j in prange(n_cols):
+            last = values[0, j]
+            for i in range(n_rows):
+                if np.isnan(values[i, j]):
+                    values[i, j] = last
+                else:
+                    last = values[i, j]
+
+    # Load (or compile) the kernel at import rather than on the first request, in the
+    # layouts _fill_missing passes: numba types a column-major copy as F-contiguous,
+    # except single-column copies, which are C-contiguous as well
+    for _shape in ((2, 1), (2, 2)):
+        _ffill_columns_inplace(np.zeros(_shape, order="F"))
+
+def _fill_missing(df: pd.DataFrame, strategy: str) -> pd.DataFrame:
+    """Fill missing values forward or backward without modifying the input frame."""
+    if strategy in BACKWARD_FILL_STRATEGIES:
+        return df.bfill()
+    if strategy not in FORWARD_FILL_STRATEGIES:
+        raise ValueError(f"Unsupported missing value strategy: {strategy}")
+    if not NUMBA_AVAILABLE:
+        return df.ffill()
+    if len(df) == 0:
+        # Nothing to fill, and the kernel reads the first row without bounds checking
+        return df.copy(deep=False)
+    
+    # Float columns through the column-parallel kernel on a column-major copy;
+    # integer columns cannot hold NaN, anything else goes through pandas
+    float_columns = df.select_dtypes(include=[np.floating]).columns
+    other_columns = df.columns.difference(float_columns, sort=False)
+    filled = df.copy(deep=False)
+    if len(float_columns):
+        # Explicit writable copy: under copy-on-write to_numpy can return a read-only view
+        values = np.array(df[float_columns].to_numpy(dtype=np.float64), order="F", copy=True)
+        _ffill_columns_inplace(values)
+        for k, column in enumerate(float_columns):
+            filled[column] = values[:, k].astype(df[column].dtype, copy=False)
+    if len(other_columns) and df[other_columns].isna().to_numpy().any():
+        filled[other_columns] = df[other_columns].ffill()
+    return filled
+
+def quantize_int8(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Quantize to int8 with one symmetric scale per column (last axis); returns (codes, scales)."""
+    values = np.asarray(values, dtype=np.float32)
+    if np.isinf(values).any():
+        raise ValueError("Cannot quantize infinite values")
+    
+    # NaN (e.g. leading gaps that forward filling cannot reach) is excluded from the
+    # scale and stored as INT8_NAN_CODE, which dequantize_int8 turns back into NaN
+    max_abs = np.nanmax(np.abs(values.reshape(-1, values.shape[-1])), axis=0, initial=0)
+    scales = np.divide(INT8_MAX, max_abs, out=np.ones_like(max_abs), where=max_abs > 0)
+    scaled = np.rint(values * scales)
+    missing = np.isnan(scaled)
+    has_missing = missing.any()
+    if has_missing:
+        scaled[missing] = 0.0
+    codes = scaled.clip(-INT8_MAX, INT8_MAX).astype(np.int8)
+    if has_missing:
+        codes[missing] = INT8_NAN_CODE
+    return codes, scales
+
+def dequantize_int8(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """Invert quantize_int8 back to float32 values, restoring NaN from INT8_NAN_CODE."""
+    values = codes.astype(np.float32) / scales
+    values[codes == INT8_NAN_CODE] = np.nan
+    return values
+
 class DataPreprocessor:
     """Base class for data preprocessing operations with enhanced error handling and type safety."""
     
     def __init__(self, config: Optional[Dict] = None) -> None:
         """Initialize data preprocessor with configuration and setup monitoring."""
         self.scalers: Dict[str, Union[StandardScaler, MinMaxScaler, RobustScaler]] = {}
+        self._fitted: Set[str] = set()
         self.transformers: Dict[str, callable] = {}
         self.config = config or {}
         self.data_quality_metrics: Dict[str, float] = {}
+        self.quantization_scales: Dict[str, np.ndarray] = {}
+        self.quantization_columns: Dict[str, List[str]] = {}
         
         # Initialize logging
         self.logger = logging.getLogger(__name__)
         
+        # GPU scalers only when requested and RAPIDS is installed
+        self.use_gpu = bool(self.config.get("use_gpu", False)) and CUML_AVAILABLE
+        
         # Setup metric-specific scalers
         self._initialize_scalers()
 
     def _initialize_scalers(self) -> None:
         """Initialize scalers for different metric types with validation."""
         try:
+            scaler_module = cuml_preprocessing if self.use_gpu else None
+            robust = scaler_module.RobustScaler if scaler_module else RobustScaler
+            min_max = scaler_module.MinMaxScaler if scaler_module else MinMaxScaler
+            standard = scaler_module.StandardScaler if scaler_module else StandardScaler
+            
             for metric_type in SUPPORTED_METRIC_TYPES:
                 if metric_type in ["heart_rate", "steps"]:
-                    self.scalers[metric_type] = RobustScaler()
+                    self.scalers[metric_type] = robust()
                 elif metric_type == "blood_pressure":
-                    self.scalers[metric_type] = MinMaxScaler()
+                    self.scalers[metric_type] = min_max()
                 else:
-                    self.scalers[metric_type] = StandardScaler()
+                    self.scalers[metric_type] = standard()
         except Exception as e:
             self.logger.error(f"Failed to initialize scalers: {str(e)}")
             raise RuntimeError("Scaler initialization failed")
 
-    def normalize_health_metrics(self, data: np.ndarray, metric_type: str) -> np.ndarray:
-        """Normalize health metric values with enhanced validation."""
+    def normalize_health_metrics(self, data: np.ndarray, metric_type: str,
+                                 fit: Optional[bool] = None) -> np.ndarray:
+        """Normalize health metric values; the scaler is fitted on first use unless fit is set."""
         try:
             # Input validation
             if not isinstance(data, np.ndarray):
@@ -69,17 +174,33 @@ class DataPreprocessor:
             if metric_type not in SUPPORTED_METRIC_TYPES:
                 raise ValueError(f"Unsupported metric type: {metric_type}")
             
-            # Handle missing values
-            if np.isnan(data).any():
+            # Handle missing values: one mask serves both the mean and the fill, and the
+            # fill goes into a copy since callers may share the buffer
+            mask = np.isnan(data)
+            if mask.any():
                 self.logger.warning(f"Missing values detected in {metric_type} data")
-                data = np.nan_to_num(data, nan=np.nanmean(data))
+                mean = data[~mask].mean()
+                data = data.copy()
+                np.copyto(data, mean, where=mask)
             
             # Apply scaling
             scaler = self.scalers[metric_type]
             if len(data.shape) == 1:
                 data = data.reshape(-1, 1)
             
-            normalized_data = scaler.fit_transform(data)
+            # Stage large arrays on the device once and copy back only the result;
+            # cuML handles small NumPy inputs itself, where transfer cost dominates
+            on_device = self.use_gpu and len(data) >= GPU_MIN_ROWS
+            if on_device:
+                data = cp.asarray(data)
+            
+            if fit or (fit is None and metric_type not in self._fitted):
+                scaler.fit(data)
+                self._fitted.add(metric_type)
+            normalized_data = scaler.transform(data)
+            
+            if on_device:
+                normalized_data = cp.asnumpy(normalized_data)
             
             # Quality check
             self.data_quality_metrics[f"{metric_type}_range"] = np.ptp(normalized_data)
@@ -90,6 +211,28 @@ class DataPreprocessor:
             self.logger.error(f"Normalization failed for {metric_type}: {str(e)}")
             raise
 
+    def normalize_batch(self, arrays: List[np.ndarray], metric_type: str) -> List[np.ndarray]:
+        """Normalize many independent arrays (e.g. one per patient) in parallel."""
+        if not arrays:
+            return []
+        
+        # The first array goes through alone so a still-unfitted scaler is fitted exactly
+        # once, as in a sequential loop; the rest only read the fitted statistics
+        first = self.normalize_health_metrics(arrays[0], metric_type)
+        rest = Parallel(n_jobs=-1, prefer='threads')(
+            delayed(self.normalize_health_metrics)(data, metric_type, fit=False)
+            for data in arrays[1:]
+        )
+        return [first, *rest]
+
+    def update_scaler(self, data: np.ndarray, metric_type: str) -> None:
+        """Fold a streamed batch into the running scaler statistics without revisiting past data."""
+        scaler = self.scalers[metric_type]
+        if not hasattr(scaler, "partial_fit"):
+            raise ValueError(f"Scaler for {metric_type} does not support incremental fitting")
+        scaler.partial_fit(data.reshape(-1, 1) if data.ndim == 1 else data)
+        self._fitted.add(metric_type)
+
     def prepare_time_series(self, df: pd.DataFrame, sequence_length: int = DEFAULT_SEQUENCE_LENGTH,
                           target_column: str = None) -> Tuple[np.ndarray, np.ndarray]:
         """Prepare time series data with sequence validation."""
@@ -111,21 +254,30 @@ class DataPreprocessor:
             if missing_ratio > DATA_QUALITY_THRESHOLDS['missing_ratio']:
                 self.logger.warning(f"High missing value ratio: {missing_ratio:.2f}")
             
-            df = df.fillna(method=DEFAULT_MISSING_STRATEGY)
-            
-            # Create sequences
-            sequences = []
-            targets = []
-            
-            for i in range(len(df) - sequence_length):
-                seq = df.iloc[i:(i + sequence_length)].values
-                if target_column:
-                    target = df[target_column].iloc[i + sequence_length]
-                    targets.append(target)
-                sequences.append(seq)
+            df = _fill_missing(df, DEFAULT_MISSING_STRATEGY)
             
-            X = np.array(sequences)
-            y = np.array(targets) if targets else np.array([])
+            # Create sequences as a read-only strided view (no per-window copies); each
+            # window is followed by the target row, so the last full window is dropped.
+            # Column-major storage keeps each window's time axis contiguous per feature
+            # (free for homogeneous frames, whose values already come back that way)
+            quantize = self.config.get("quantize", False)
+            features = df
+            if quantize:
+                # int8 codes only exist for numeric features, so timestamps and labels are
+                # left out of quantized windows; the kept column order is recorded
+                features = df.select_dtypes(include=[np.number])
+                self.quantization_columns["time_series"] = list(features.columns)
+            values = np.asfortranarray(features.to_numpy())
+            if quantize:
+                # Quantize rows once before windowing; windows then share the int8 buffer
+                values, self.quantization_scales["time_series"] = quantize_int8(values)
+            n_windows = max(len(df) - sequence_length, 0)
+            if n_windows:
+                windows = sliding_window_view(values, sequence_length, axis=0)[:n_windows]
+                X = windows.transpose(0, 2, 1)
+            else:
+                X = np.empty((0, sequence_length, values.shape[1]), dtype=values.dtype)
+            y = df[target_column].to_numpy()[sequence_length:] if target_column else np.array([])
             
             return X, y
             
@@ -147,18 +299,22 @@ def clean_data(df: pd.DataFrame, cleaning_params: Dict) -> pd.DataFrame:
         
         # Handle missing values
         strategy = cleaning_params.get('missing_strategy', DEFAULT_MISSING_STRATEGY)
-        df = df.fillna(method=strategy)
+        df = _fill_missing(df, strategy)
         
-        # Remove outliers
-        if cleaning_params.get('remove_outliers', True):
-            for column in df.select_dtypes(include=[np.number]).columns:
-                z_scores = np.abs((df[column] - df[column].mean()) / df[column].std())
-                df = df[z_scores < OUTLIER_THRESHOLD]
+        # Remove outliers: one row mask over all numeric columns at once; constant
+        # columns have no outliers, and rows with missing numeric values are dropped
+        numeric_columns = df.select_dtypes(include=[np.number]).columns
+        if cleaning_params.get('remove_outliers', True) and len(numeric_columns):
+            values = df[numeric_columns].to_numpy(dtype=np.float64)
+            mean = np.nanmean(values, axis=0)
+            std = np.nanstd(values, axis=0, ddof=1)
+            inliers = (np.abs(values - mean) < OUTLIER_THRESHOLD * std) | (std == 0)
+            df = df[inliers.all(axis=1) & ~np.isnan(values).any(axis=1)]
         
-        # Validate data quality
+        # Validate data quality; the missing ratio is the mean over one boolean block
         quality_metrics = {
             'duplicate_ratio': duplicate_ratio,
-            'missing_ratio': df.isnull().sum().mean() / len(df),
+            'missing_ratio': df.isna().to_numpy().mean(),
             'row_count': len(df)
         }
         
@@ -169,32 +325,43 @@ def clean_data(df: pd.DataFrame, cleaning_params: Dict) -> pd.DataFrame:
         logger.error(f"Data cleaning failed: {str(e)}")
         raise
 
-def create_feature_matrix(df: pd.DataFrame, feature_columns: List[str]) -> np.ndarray:
-    """Create optimized feature matrix for model training."""
+def create_feature_matrix(df: pd.DataFrame, feature_columns: List[str],
+                          quantize: bool = False
+                          ) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+    """Create optimized feature matrix for model training; quantize returns (int8 codes, scales)."""
     try:
         # Validate inputs
         if not all(col in df.columns for col in feature_columns):
             missing_cols = set(feature_columns) - set(df.columns)
             raise ValueError(f"Missing columns: {missing_cols}")
         
-        # Select features
-        feature_df = df[feature_columns].copy()
-        
-        # Handle categorical variables
-        categorical_columns = feature_df.select_dtypes(include=['object']).columns
-        for col in categorical_columns:
-            feature_df[col] = pd.Categorical(feature_df[col]).codes
-        
-        # Convert to numpy array
-        feature_matrix = feature_df.values
+        # Fill a preallocated float32 matrix column by column (column-major to match the
+        # writes); numeric columns are copied directly, anything else is encoded as
+        # categorical codes straight into its slot
+        feature_matrix = np.empty((len(df), len(feature_columns)), dtype=np.float32, order='F')
+        for k, col in enumerate(feature_columns):
+            column = df[col]
+            if pd.api.types.is_numeric_dtype(column):
+                np.copyto(feature_matrix[:, k], column.to_numpy(), casting='unsafe')
+            else:
+                feature_matrix[:, k] = pd.Categorical(column).codes
         
-        # Check for multicollinearity
+        # Check for multicollinearity on a fixed-seed row sample; the screen only drives
+        # a warning, and self-correlations on the diagonal are excluded
         if len(feature_columns) > 1:
-            correlation_matrix = np.corrcoef(feature_matrix.T)
+            sample = feature_matrix
+            if len(sample) > CORRELATION_SAMPLE_ROWS:
+                rng = np.random.default_rng(0)
+                rows = rng.integers(0, len(sample), size=CORRELATION_SAMPLE_ROWS)
+                sample = sample[rows]
+            correlation_matrix = np.corrcoef(sample, rowvar=False, dtype=np.float32)
+            np.fill_diagonal(correlation_matrix, 0)
             high_correlation = np.abs(correlation_matrix) > DATA_QUALITY_THRESHOLDS['correlation_threshold']
             if high_correlation.any():
                 logger.warning("High correlation detected between features")
         
+        if quantize:
+            return quantize_int8(feature_matrix)
         return feature_matrix
         
     except Exception as e:
@@ -205,5 +372,7 @@ def create_feature_matrix(df: pd.DataFrame, feature_columns: List[str]) -> np.nd
 __all__ = [
     'DataPreprocessor',
     'clean_data',
-    'create_feature_matrix'
+    'create_feature_matrix',
+    'quantize_int8',
+    'dequantize_int8'
 ]
\ No newline at end of file
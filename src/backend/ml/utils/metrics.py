@@ -5,6 +5,7 @@ Provides comprehensive evaluation metrics for health predictions and document cl
 Version: 1.0.0
 """
 
+import logging
 import numpy as np  # numpy v1.23+
 from sklearn.metrics import (  # scikit-learn v1.2+
     mean_squared_error, mean_absolute_error, r2_score,
@@ -12,9 +13,15 @@ from sklearn.metrics import (  # scikit-learn v1.2+
     roc_auc_score, confusion_matrix
 )
 import tensorflow as tf  # tensorflow v2.13+
+from scipy.special import logsumexp  # scipy v1.9+
+from scipy.stats import norm  # scipy v1.9+
 from typing import Dict, Tuple, Optional, Union, List
 
-from core.logging import setup_logging
+try:
+    from numba import njit, prange  # numba v0.57+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 # Default configuration for metrics calculation
 DEFAULT_METRICS_CONFIG = {
@@ -31,6 +38,38 @@ ERROR_ESTIMATION_PARAMS = {
     "robust_scaling": True
 }
 
+# Guards the MAPE/SMAPE denominators against zero
+TIME_SERIES_EPSILON = 1e-10
+
+if NUMBA_AVAILABLE:
+    # Reassociation lets LLVM vectorize the reductions; NaN/inf semantics are kept
+    @njit(parallel=True, fastmath={"reassoc", "contract"}, cache=True)
+    def _time_series_sums(y_true: np.ndarray, y_pred: np.ndarray, epsilon: float):
+        """Absolute/symmetric percentage error sums, error sum and direction matches in one pass."""
+        ape = 0.0
+        sape = 0.0
+        bias = 0.0
+        hits = 0
+        for i in prange(y_true.shape[0]):
+            error = y_pred[i] - y_true[i]
+            ape += abs(error / (y_true[i] + epsilon))
+            sape += 2 * abs(error) / (abs(y_true[i]) + abs(y_pred[i]) + epsilon)
+            bias += error
+            if i > 0 and (y_true[i] - y_true[i - 1] > 0) == (y_pred[i] - y_pred[i - 1] > 0):
+                hits += 1
+        return ape, sape, bias, hits
+
+    # Load (or compile) the kernel at import rather than on the first request
+    _time_series_sums(np.zeros(2), np.zeros(2), TIME_SERIES_EPSILON)
+else:
+    def _time_series_sums(y_true: np.ndarray, y_pred: np.ndarray, epsilon: float):
+        """Absolute/symmetric percentage error sums, error sum and direction matches."""
+        error = y_pred - y_true
+        ape = np.sum(np.abs(error / (y_true + epsilon)))
+        sape = np.sum(2 * np.abs(error) / (np.abs(y_true) + np.abs(y_pred) + epsilon))
+        hits = np.count_nonzero((np.diff(y_true) > 0) == (np.diff(y_pred) > 0))
+        return ape, sape, np.sum(error), hits
+
 class ModelEvaluator:
     """Enhanced model evaluator with comprehensive metrics support for health predictions."""
     
@@ -49,7 +88,7 @@ class ModelEvaluator:
         }
         
         # Setup logging
-        self.logger = setup_logging()
+        self.logger = logging.getLogger(__name__)
         
         # Configure TensorFlow metrics
         if enable_gpu:
@@ -156,7 +195,7 @@ class ModelEvaluator:
                 
             # Calculate confidence scores
             if y_prob is not None:
-                confidence_scores = calculate_confidence_score(y_prob)
+                confidence_scores, _ = calculate_confidence_score(y_prob)
                 metrics["confidence_scores"] = {
                     "mean": np.mean(confidence_scores),
                     "std": np.std(confidence_scores),
@@ -189,32 +228,28 @@ class ModelEvaluator:
         """
         try:
             metrics = {}
+            y_true = np.ascontiguousarray(y_true, dtype=np.float64).ravel()
+            y_pred = np.ascontiguousarray(y_pred, dtype=np.float64).ravel()
+            n = len(y_true)
             
-            # MAPE calculation with zero handling
-            epsilon = 1e-10
-            mape = np.mean(np.abs((y_true - y_pred) / (y_true + epsilon))) * 100
-            metrics["mape"] = mape
-            
-            # Symmetric MAPE
-            smape = np.mean(2 * np.abs(y_pred - y_true) / (np.abs(y_true) + np.abs(y_pred) + epsilon)) * 100
-            metrics["smape"] = smape
-            
-            # Directional accuracy
-            direction_true = np.diff(y_true) > 0
-            direction_pred = np.diff(y_pred) > 0
-            metrics["directional_accuracy"] = np.mean(direction_true == direction_pred)
-            
-            # Forecast bias
-            metrics["forecast_bias"] = np.mean(y_pred - y_true)
+            # MAPE (with zero handling), symmetric MAPE, directional accuracy and
+            # forecast bias from a single fused pass over both series
+            # Empty series yield NaN, as the per-metric means did
+            ape, sape, bias, hits = _time_series_sums(y_true, y_pred, TIME_SERIES_EPSILON)
+            metrics["mape"] = ape / n * 100 if n else np.nan
+            metrics["smape"] = sape / n * 100 if n else np.nan
+            metrics["directional_accuracy"] = hits / (n - 1) if n > 1 else np.nan
+            metrics["forecast_bias"] = bias / n if n else np.nan
             
             # Seasonality analysis if parameters provided
             if seasonality_params:
                 period = seasonality_params.get("period", 24)  # default daily seasonality
-                seasonal_error = np.zeros(period)
-                for i in range(period):
-                    indices = np.arange(i, len(y_true), period)
-                    if len(indices) > 0:
-                        seasonal_error[i] = np.mean(y_true[indices] - y_pred[indices])
+                # Zero-pad the residuals to whole periods and reduce each phase column at once
+                residuals = np.concatenate([y_true - y_pred, np.zeros(-n % period)])
+                phase_sums = residuals.reshape(-1, period).sum(axis=0)
+                phase_counts = n // period + (np.arange(period) < n % period)
+                seasonal_error = np.divide(phase_sums, phase_counts,
+                                           out=np.zeros(period), where=phase_counts > 0)
                 metrics["seasonal_error"] = seasonal_error.tolist()
                 
             self.logger.info(f"Time series metrics calculated successfully: {metrics}")
@@ -227,7 +262,7 @@ class ModelEvaluator:
 def calculate_confidence_score(
     probabilities: np.ndarray,
     temperature: float = 1.0
-) -> Tuple[np.ndarray, float]:
+) -> Tuple[np.ndarray, np.ndarray]:
     """
     Calculate enhanced confidence score with uncertainty estimation.
     
@@ -236,16 +271,17 @@ def calculate_confidence_score(
         temperature: Temperature scaling parameter
         
     Returns:
-        Tuple of (confidence_scores, uncertainty_estimate)
+        Tuple of per-sample (confidence_scores, normalized_entropy_uncertainty)
     """
-    # Apply temperature scaling
-    scaled_probs = probabilities ** (1 / temperature)
-    scaled_probs /= np.sum(scaled_probs, axis=1, keepdims=True)
+    # Apply temperature scaling to the log-probabilities (logits up to a constant)
+    # and renormalize in log space, which cannot underflow for small temperatures
+    log_probs = np.log(probabilities + 1e-10) / temperature
+    log_probs -= logsumexp(log_probs, axis=1, keepdims=True)
+    scaled_probs = np.exp(log_probs)
     
-    # Calculate entropy-based uncertainty
-    entropy = -np.sum(scaled_probs * np.log(scaled_probs + 1e-10), axis=1)
-    max_entropy = -np.log(1/scaled_probs.shape[1])
-    uncertainty = entropy / max_entropy
+    # Calculate entropy-based uncertainty; einsum fuses the product and row sum
+    entropy = -np.einsum('ij,ij->i', scaled_probs, log_probs)
+    uncertainty = entropy / np.log(scaled_probs.shape[1])
     
     # Calculate confidence scores
     confidence_scores = np.max(scaled_probs, axis=1)
@@ -268,14 +304,11 @@ def calculate_prediction_intervals(
     Returns:
         Tuple of (lower_bounds, upper_bounds, error_estimates)
     """
-    params = error_params or ERROR_ESTIMATION_PARAMS
-    
     # Calculate standard error
     std_error = np.std(predictions, axis=0) if predictions.ndim > 1 else np.std(predictions)
     
-    # Calculate z-score for confidence level
-    z_score = abs(np.percentile(np.random.standard_normal(params["bootstrap_iterations"]),
-                              (1 - confidence_level) * 100))
+    # Two-sided z-score for the confidence level from the normal quantile function
+    z_score = abs(norm.ppf((1 - confidence_level) / 2))
     
     # Calculate bounds
     mean_pred = np.mean(predictions, axis=0) if predictions.ndim > 1 else predictions
@@ -290,4 +323,51 @@ def calculate_prediction_intervals(
         "confidence_level": confidence_level
     }
     
-    return lower_bound, upper_bound, error_estimates
\ No newline at end of file
+    return lower_bound, upper_bound, error_estimates
+
+def bootstrap_intervals(
+    predictions: np.ndarray,
+    n_bootstrap: int = ERROR_ESTIMATION_PARAMS["bootstrap_iterations"],
+    confidence_level: float = DEFAULT_CONFIDENCE_LEVEL,
+    seed: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray, Dict]:
+    """
+    Calculate bootstrap prediction intervals from the spread of the predictions.
+    
+    All resamples are drawn as one (n_bootstrap, n) index matrix and reduced with a
+    single quantile call, so there is no per-iteration Python loop.
+    
+    Args:
+        predictions: Model predictions, shape (n,) or (n, k)
+        n_bootstrap: Number of bootstrap resamples
+        confidence_level: Confidence level for intervals
+        seed: Optional seed for reproducible resampling
+        
+    Returns:
+        Tuple of (lower_bounds, upper_bounds, error_estimates)
+    """
+    predictions = np.asarray(predictions)
+    if len(predictions) == 0:
+        return predictions.copy(), predictions.copy(), {
+            "std_error": 0.0,
+            "margin": 0.0,
+            "confidence_level": confidence_level
+        }
+    
+    rng = np.random.default_rng(seed)
+    deviations = predictions - np.mean(predictions, axis=0)
+    samples = deviations[rng.integers(0, len(deviations), size=(n_bootstrap, len(deviations)))]
+    
+    # Quantiles of each resample's deviations, averaged over resamples
+    alpha = (1 - confidence_level) / 2
+    quantiles = np.quantile(samples, [alpha, 1 - alpha], axis=1)
+    lower_offset, upper_offset = np.mean(quantiles, axis=1)
+    
+    error_estimates = {
+        "std_error": np.std(predictions, axis=0),
+        "margin": (upper_offset - lower_offset) / 2,
+        "bound_std_error": np.std(quantiles, axis=1),
+        "confidence_level": confidence_level
+    }
+    
+    return predictions + lower_offset, predictions + upper_offset, error_estimates
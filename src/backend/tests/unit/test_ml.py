@@ -8,9 +8,18 @@ Version: 1.0.0
 import pytest  # pytest v7.4+
 import numpy as np  # numpy v1.23+
 import pandas as pd  # pandas v2.0+
+import base64
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from unittest.mock import MagicMock
 
-from ml.models.document_classifier import DocumentClassifier
+import ml.models as models_module
+from ml.models import SecurityError, get_model_path, get_model_version
+from ml.models import document_classifier as classifier_module
+from ml.models.document_classifier import DocumentClassifier, secure_inference
 from ml.models.health_predictor import LSTMHealthPredictor, RandomForestHealthPredictor
 
 # Test configuration constants
@@ -33,6 +42,13 @@ SECURITY_CONFIG = {
     "audit_logging": True,
     "hipaa_validation": True
 }
+SMALL_MODEL_CONFIG = {
+    "input_shape": [32, 32, 3],
+    "num_classes": 9,
+    "learning_rate": 0.001,
+    "backbone_weights": None,
+    "precision_policy": "float32"
+}
 
 def setup_module():
     """Set up secure test module configuration."""
@@ -234,4 +250,344 @@ class TestHealthPredictor:
         # Validate prediction intervals
         assert "predictions" in prediction_result
         assert "prediction_intervals" in prediction_result
-        assert prediction_result["statistical_validation"]["intervals_validated"]
\ No newline at end of file
+        assert prediction_result["statistical_validation"]["intervals_validated"]
+
+class TestModelPaths:
+    """Test suite for anchoring default model paths at the allowed model root."""
+
+    @pytest.fixture(autouse=True)
+    def model_root(self, tmp_path, monkeypatch):
+        """Point the allowed model root at a temporary directory."""
+        root = (tmp_path / "models").resolve()
+        monkeypatch.setattr(models_module, "ALLOWED_ROOT", root)
+        return root
+
+    def test_path_anchored_at_root(self, model_root):
+        """Test that default paths resolve beneath the model root."""
+        assert get_model_path("document_classifier") == str(model_root / "document_classifier")
+
+    def test_path_independent_of_cwd(self, model_root, tmp_path, monkeypatch):
+        """Test that the resolved path does not change with the working directory."""
+        before = get_model_path("health_predictor")
+        monkeypatch.chdir(tmp_path)
+
+        assert get_model_path("health_predictor") == before
+
+    @pytest.mark.parametrize("path", ["../outside", "/etc/passwd", "nested/../../outside"])
+    def test_escaping_path_rejected(self, path, monkeypatch):
+        """Test that paths leaving the model root are rejected."""
+        monkeypatch.setitem(models_module.DEFAULT_MODEL_PATHS, "health_predictor", path)
+
+        with pytest.raises(SecurityError):
+            get_model_path("health_predictor")
+
+class TestModelVersions:
+    """Test suite for the memoized model version check."""
+
+    def test_cache_bounded(self):
+        """Test that version lookups are memoized in a small bounded cache."""
+        assert get_model_version.cache_info().maxsize == 16
+
+    def test_repeat_lookup_cached(self):
+        """Test that a repeated lookup is served from the cache."""
+        get_model_version.cache_clear()
+
+        assert get_model_version("document_classifier") == get_model_version("document_classifier")
+        assert get_model_version.cache_info().hits == 1
+
+class TestSecureInference:
+    """Test suite for the audit trail kept by the inference guard."""
+
+    @pytest.fixture
+    def audit_logger(self, monkeypatch):
+        """Capture the classifier module's audit logger."""
+        audit_logger = MagicMock()
+        monkeypatch.setattr(classifier_module, "logger", audit_logger)
+        return audit_logger
+
+    def test_module_logger_configured(self):
+        """Test that audit records go through a standard module logger."""
+        assert isinstance(classifier_module.logger, logging.Logger)
+
+    def test_one_info_record_per_call(self, audit_logger):
+        """Test that every successful inference call leaves exactly one INFO audit record."""
+        guarded = secure_inference(lambda document: {"category": "lab_report"})
+
+        for _ in range(3):
+            assert guarded("document") == {"category": "lab_report"}
+
+        assert audit_logger.info.call_count == 3
+
+    def test_failure_recorded(self, audit_logger):
+        """Test that failed inference is recorded as an error and re-raised."""
+        def failing(document):
+            raise ValueError("unreadable")
+
+        with pytest.raises(ValueError):
+            secure_inference(failing)("document")
+
+        audit_logger.error.assert_called_once()
+        audit_logger.info.assert_not_called()
+
+@pytest.fixture
+def small_classifier():
+    """Fixture for a randomly initialized classifier on small document images."""
+    return DocumentClassifier(model_config=SMALL_MODEL_CONFIG, security_config=SECURITY_CONFIG)
+
+class TestBatchClassification:
+    """Test suite for classifying several documents in one forward pass."""
+
+    @pytest.fixture
+    def documents(self, small_classifier, monkeypatch):
+        """Documents whose extracted features are fixed random images."""
+        rng = np.random.default_rng(42)
+        shape = SMALL_MODEL_CONFIG["input_shape"]
+        images = {
+            f"document_{i}": rng.uniform(0, 255, shape).astype(np.float32) for i in range(5)
+        }
+        monkeypatch.setattr(small_classifier, "_extract_document_features", images.__getitem__)
+        return list(images)
+
+    def test_empty_batch(self, small_classifier):
+        """Test that an empty batch returns no results without a forward pass."""
+        small_classifier._predict_batched = MagicMock()
+
+        assert small_classifier.predict_batch([]) == []
+        small_classifier._predict_batched.assert_not_called()
+
+    def test_results_follow_document_order(self, small_classifier, documents):
+        """Test that each result is formatted from its own row of probabilities."""
+        num_classes = SMALL_MODEL_CONFIG["num_classes"]
+        probabilities = np.full((len(documents), num_classes), 0.01, dtype=np.float32)
+        for row, predicted in enumerate([3, 0, 8, 3, 5]):
+            probabilities[row, predicted] = 0.92
+        small_classifier._predict_batched = MagicMock(return_value=probabilities)
+
+        results = small_classifier.predict_batch(documents)
+
+        batch = small_classifier._predict_batched.call_args.args[0]
+        assert batch.shape == (len(documents), *SMALL_MODEL_CONFIG["input_shape"])
+        assert [result["class"] for result in results] == [
+            classifier_module.DOCUMENT_CATEGORIES[i] for i in [3, 0, 8, 3, 5]
+        ]
+        for result, row in zip(results, probabilities):
+            assert result["confidence"] == pytest.approx(0.92)
+            assert list(result["predictions"].values()) == pytest.approx(row.tolist())
+            assert not result["security_metadata"]["confidence_verified"]
+
+    def test_matches_single_prediction(self, small_classifier, documents):
+        """Test that batched results agree with classifying each document alone."""
+        results = small_classifier.predict_batch(documents)
+
+        for document, result in zip(documents, results):
+            single = small_classifier.predict(document)
+            assert result["class"] == single["class"]
+            assert result["confidence"] == pytest.approx(single["confidence"], abs=1e-5)
+
+class TestConcurrentPrediction:
+    """Test suite for single-document inference from concurrent request threads."""
+
+    def test_forward_passes_overlap(self, small_classifier, monkeypatch):
+        """Test that concurrent predictions are not serialized on a shared buffer."""
+        shape = SMALL_MODEL_CONFIG["input_shape"]
+        monkeypatch.setattr(small_classifier, "_extract_document_features",
+                            lambda document: np.zeros(shape, dtype=np.float32))
+        probs = np.eye(SMALL_MODEL_CONFIG["num_classes"], dtype=np.float32)[2]
+        # Each forward pass waits for the other; a global critical section would deadlock
+        barrier = threading.Barrier(2, timeout=5)
+
+        def predict_fn(input_buffer):
+            barrier.wait()
+            return MagicMock(numpy=lambda: probs), 2, 1.0
+
+        small_classifier._predict_fn = predict_fn
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(small_classifier.predict, ["first", "second"]))
+
+        assert [result["class"] for result in results] == [
+            classifier_module.DOCUMENT_CATEGORIES[2]
+        ] * 2
+
+    def test_buffer_reused_per_thread(self, small_classifier):
+        """Test that each thread reuses its own input buffer across requests."""
+        main_buffer = small_classifier._input_buffer()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            other_buffer = executor.submit(small_classifier._input_buffer).result()
+
+        assert small_classifier._input_buffer() is main_buffer
+        assert other_buffer is not main_buffer
+
+class TestTrainingCheckpoint:
+    """Test suite for keeping the best weights of each training run."""
+
+    @pytest.fixture
+    def fitting(self, small_classifier, monkeypatch):
+        """Mock model whose fit writes a best-weights checkpoint, recording its path."""
+        checkpoint = MagicMock()
+        monkeypatch.setattr(classifier_module.tf.keras.callbacks, "ModelCheckpoint", checkpoint)
+        paths = []
+
+        def fit(*args, **kwargs):
+            path = checkpoint.call_args.args[0]
+            with open(path, "wb") as f:
+                f.write(b"best weights")
+            paths.append(path)
+            return MagicMock(history={"loss": [0.5]})
+
+        small_classifier.model = MagicMock()
+        small_classifier.model.fit.side_effect = fit
+        small_classifier.security_manager = MagicMock()
+        small_classifier.security_manager.encrypt_phi.return_value = b"ciphertext"
+        return paths
+
+    def test_best_weights_restored(self, small_classifier, fitting):
+        """Test that the returned model carries the best epoch's weights, not the last."""
+        small_classifier._fit(MagicMock(), MagicMock())
+
+        assert fitting[0].endswith(".weights.h5")
+        small_classifier.model.load_weights.assert_called_once_with(fitting[0])
+
+    def test_runs_use_separate_files(self, small_classifier, fitting):
+        """Test that every run checkpoints to its own file, removed after training."""
+        for _ in range(2):
+            small_classifier._fit(MagicMock(), MagicMock())
+
+        assert fitting[0] != fitting[1]
+        assert not any(os.path.exists(path) for path in fitting)
+
+    def test_best_weights_encrypted(self, small_classifier, fitting, tmp_path):
+        """Test that the best weights are kept only as encrypted checkpoint files."""
+        small_classifier.model_config = {**SMALL_MODEL_CONFIG, "checkpoint_dir": str(tmp_path)}
+
+        small_classifier._fit(MagicMock(), MagicMock())
+
+        (encrypted,) = tmp_path.iterdir()
+        assert encrypted.name.endswith(".weights.h5.enc")
+        assert encrypted.read_bytes() == b"ciphertext"
+        payload = small_classifier.security_manager.encrypt_phi.call_args.args[0]
+        assert base64.b64decode(payload) == b"best weights"
+
+    def test_no_checkpoint_dir_keeps_nothing(self, small_classifier, fitting):
+        """Test that nothing is encrypted or kept without a checkpoint directory."""
+        small_classifier._fit(MagicMock(), MagicMock())
+
+        small_classifier.security_manager.encrypt_phi.assert_not_called()
+
+class TestTensorRTExport:
+    """Test suite for the TF-TRT export guards and engine build."""
+
+    @pytest.fixture
+    def trt(self, small_classifier, monkeypatch):
+        """Mock TF-TRT converter module on a host with a Tensor Core GPU."""
+        trt = MagicMock()
+        monkeypatch.setattr(classifier_module, "trt", trt, raising=False)
+        monkeypatch.setattr(classifier_module, "TENSORRT_AVAILABLE", True)
+        monkeypatch.setattr(DocumentClassifier, "_tensor_core_gpu_present",
+                            staticmethod(lambda: True))
+        monkeypatch.setattr(classifier_module.tf.saved_model, "save", MagicMock())
+        small_classifier._load_tensorrt = MagicMock()
+        return trt
+
+    def test_unavailable_raises(self, small_classifier, monkeypatch):
+        """Test that export fails clearly without a TF-TRT enabled TensorFlow build."""
+        monkeypatch.setattr(classifier_module, "TENSORRT_AVAILABLE", False)
+
+        with pytest.raises(ImportError):
+            small_classifier.export_tensorrt()
+
+    def test_no_tensor_cores_keeps_tensorflow(self, small_classifier, trt, monkeypatch, tmp_path):
+        """Test that reduced precision is skipped on GPUs without Tensor Cores."""
+        monkeypatch.setattr(DocumentClassifier, "_tensor_core_gpu_present",
+                            staticmethod(lambda: False))
+        predict_fn = small_classifier._batch_predict_fn
+
+        assert small_classifier.export_tensorrt("FP16", str(tmp_path)) == ""
+        assert small_classifier._batch_predict_fn is predict_fn
+        trt.TrtGraphConverterV2.assert_not_called()
+
+    def test_int8_requires_calibration(self, small_classifier, trt, tmp_path):
+        """Test that INT8 export is refused without calibration images."""
+        with pytest.raises(ValueError):
+            small_classifier.export_tensorrt("INT8", str(tmp_path))
+
+        small_classifier._load_tensorrt.assert_not_called()
+
+    def test_int8_calibrates_on_images(self, small_classifier, trt, tmp_path):
+        """Test that INT8 conversion is calibrated on the supplied images."""
+        images = np.zeros((3, *SMALL_MODEL_CONFIG["input_shape"]), dtype=np.float32)
+
+        small_classifier.export_tensorrt_int8(images, str(tmp_path))
+
+        converter = trt.TrtGraphConverterV2.return_value
+        assert trt.TrtGraphConverterV2.call_args.kwargs["use_calibration"]
+        calibration_input_fn = converter.convert.call_args.kwargs["calibration_input_fn"]
+        assert len(list(calibration_input_fn())) == len(images)
+
+    def test_fp16_engine_built_and_loaded(self, small_classifier, trt, tmp_path):
+        """Test that the engine is built for single documents and served from output_dir."""
+        assert small_classifier.export_tensorrt("FP16", str(tmp_path)) == str(tmp_path)
+
+        converter_kwargs = trt.TrtGraphConverterV2.call_args.kwargs
+        assert converter_kwargs["precision_mode"] is trt.TrtPrecisionMode.FP16
+        assert not converter_kwargs["use_calibration"]
+        converter = trt.TrtGraphConverterV2.return_value
+        converter.convert.assert_called_once_with()
+        converter.build.assert_called_once()
+        converter.save.assert_called_once_with(str(tmp_path))
+        small_classifier._load_tensorrt.assert_called_once_with(str(tmp_path))
+
+    @pytest.mark.parametrize("capability, expected", [((6, 1), False), ((7, 5), True)])
+    def test_tensor_core_detection(self, capability, expected, monkeypatch):
+        """Test that Tensor Cores are detected from the GPU compute capability."""
+        tf = classifier_module.tf
+        monkeypatch.setattr(tf.config, "list_physical_devices", lambda kind: ["GPU:0"])
+        monkeypatch.setattr(tf.config.experimental, "get_device_details",
+                            lambda gpu: {"compute_capability": capability})
+
+        assert DocumentClassifier._tensor_core_gpu_present() is expected
+
+class TestTFRecordTraining:
+    """Test suite for training from sharded TFRecord files."""
+
+    @pytest.fixture
+    def shards(self, small_classifier, tmp_path):
+        """Images tagged with their label, written across several shards."""
+        labels = np.arange(20) % SMALL_MODEL_CONFIG["num_classes"]
+        images = np.stack([
+            np.full(SMALL_MODEL_CONFIG["input_shape"], label, dtype=np.float32)
+            for label in labels
+        ])
+        pattern = small_classifier.write_tfrecord_shards(images, labels, str(tmp_path),
+                                                         num_shards=3)
+        return pattern, labels
+
+    def test_shards_round_trip(self, small_classifier, shards, tmp_path):
+        """Test that every image comes back from the shards with its one-hot label."""
+        pattern, labels = shards
+        assert len(list(tmp_path.glob("*.tfrecord"))) == 3
+
+        recovered = []
+        for X_batch, y_batch in small_classifier._build_tfrecord_dataset(pattern):
+            assert X_batch.shape[1:] == tuple(SMALL_MODEL_CONFIG["input_shape"])
+            for image, one_hot in zip(X_batch.numpy(), y_batch.numpy()):
+                assert np.all(image == np.argmax(one_hot))
+                recovered.append(int(np.argmax(one_hot)))
+
+        assert sorted(recovered) == sorted(labels.tolist())
+
+    def test_evaluates_on_validation_shards(self, small_classifier, shards, monkeypatch):
+        """Test that validation labels from the shards reach the evaluator."""
+        pattern, labels = shards
+        history = MagicMock(history={"loss": [0.5]})
+        monkeypatch.setattr(small_classifier, "_fit", MagicMock(return_value=history))
+        small_classifier.evaluator = MagicMock()
+        small_classifier.evaluator.calculate_classification_metrics.return_value = {"accuracy": 1.0}
+
+        result = small_classifier.train_from_tfrecords(pattern, pattern)
+
+        small_classifier._fit.assert_called_once()
+        y_true, y_pred = small_classifier.evaluator.calculate_classification_metrics.call_args.args
+        assert sorted(y_true.tolist()) == sorted(labels.tolist())
+        assert len(y_pred) == len(labels)
+        assert result["history"] == {"loss": [0.5]}
+        assert result["metrics"] == {"accuracy": 1.0}
@@ -0,0 +1,204 @@
+"""
+Unit tests for medical document image preprocessing covering enhancement parameters,
+GPU resource handling and image quality validation.
+
+Version: 1.0.0
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest  # pytest v7.4+
+import numpy as np  # numpy v1.23+
+from PIL import Image  # Pillow v9.5.0
+from pydicom.dataset import Dataset, FileMetaDataset  # pydicom v2.4+
+from pydicom.uid import ExplicitVRLittleEndian
+
+from ml.document import preprocessor as preprocessor_module
+from ml.document.preprocessor import (
+    QUALITY_THRESHOLDS,
+    DocumentPreprocessor,
+    validate_image_quality
+)
+
+# Test configuration constants
+TEST_IMAGE_SIZE = 64
+
+@pytest.fixture
+def preprocessor():
+    """Fixture for a CPU-only document preprocessor."""
+    return DocumentPreprocessor(use_gpu=False)
+
+@pytest.fixture
+def document_image():
+    """Fixture for a grayscale document image with a mid-gray gradient."""
+    gradient = np.tile(np.linspace(64, 192, TEST_IMAGE_SIZE, dtype=np.uint8), (TEST_IMAGE_SIZE, 1))
+    return Image.fromarray(gradient)
+
+@pytest.fixture
+def enhance_kernels(preprocessor):
+    """Record the fused kernel passed to the enhancement filter."""
+    kernels = []
+
+    def record(img_array, ddepth, kernel, delta, borderType):
+        kernels.append(kernel)
+        return img_array.astype(np.float32)
+
+    preprocessor.image_processors['enhance'] = MagicMock(side_effect=record)
+    return kernels
+
+def dicom_dataset(pixels, **elements):
+    """Build an in-memory 12-bit grayscale DICOM dataset holding the given stored values."""
+    dataset = Dataset()
+    dataset.file_meta = FileMetaDataset()
+    dataset.file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    dataset.Rows, dataset.Columns = pixels.shape
+    dataset.SamplesPerPixel = 1
+    dataset.BitsAllocated = 16
+    dataset.BitsStored = 12
+    dataset.HighBit = 11
+    dataset.PixelRepresentation = 0
+    dataset.PhotometricInterpretation = "MONOCHROME2"
+    for keyword, value in elements.items():
+        setattr(dataset, keyword, value)
+    dataset.PixelData = pixels.astype(np.uint16).tobytes()
+    return dataset
+
+class TestEnhancementFactors:
+    """Test suite for overriding enhancement factors through preprocessing params."""
+
+    def test_unrelated_params_ignored(self, preprocessor, document_image, enhance_kernels):
+        """Test that generic preprocessing params never leak into enhancement factors."""
+        preprocessor._enhance_document_image(document_image)
+        preprocessor._enhance_document_image(
+            document_image, {'phi_protection': True, 'contrast': 5.0}
+        )
+
+        np.testing.assert_array_equal(enhance_kernels[0], enhance_kernels[1])
+
+    def test_dedicated_key_overrides(self, preprocessor, document_image, enhance_kernels):
+        """Test that the enhancement_factors key overrides the defaults."""
+        preprocessor._enhance_document_image(document_image)
+        preprocessor._enhance_document_image(
+            document_image, {'enhancement_factors': {'contrast': 2.0}}
+        )
+
+        assert not np.array_equal(enhance_kernels[0], enhance_kernels[1])
+
+class TestGpuResources:
+    """Test suite for per-thread CUDA upload buffers and streams."""
+
+    @pytest.fixture(autouse=True)
+    def fake_cuda(self, monkeypatch):
+        """Replace OpenCV CUDA objects with plain host objects."""
+        monkeypatch.setattr(preprocessor_module.cv2, "cuda_GpuMat", object, raising=False)
+        monkeypatch.setattr(preprocessor_module.cv2, "cuda_Stream", object, raising=False)
+
+    def test_reused_within_thread(self, preprocessor):
+        """Test that a thread keeps its buffer and stream across calls."""
+        assert preprocessor._gpu_resources() == preprocessor._gpu_resources()
+
+    def test_not_shared_between_threads(self, preprocessor):
+        """Test that concurrent batch workers never share a buffer or stream."""
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            worker_input, worker_stream = executor.submit(preprocessor._gpu_resources).result()
+        main_input, main_stream = preprocessor._gpu_resources()
+
+        assert worker_input is not main_input
+        assert worker_stream is not main_stream
+
+class TestImageQuality:
+    """Test suite for image quality validation across PIL image modes."""
+
+    @pytest.fixture
+    def checkerboard(self):
+        """Fixture for a high-contrast page-sized checkerboard."""
+        size = preprocessor_module.MIN_IMAGE_RESOLUTION[0]
+        return (np.indices((size, size)).sum(axis=0) % 2).astype(bool)
+
+    def test_bilevel_image(self, checkerboard):
+        """Regression: mode "1" scans must be measured instead of raising."""
+        image = Image.fromarray(checkerboard).convert("1")
+
+        _, metrics, _ = validate_image_quality(image, QUALITY_THRESHOLDS)
+
+        assert metrics['brightness'] == pytest.approx(0.5)
+        assert metrics['contrast'] == pytest.approx(0.5)
+
+    @pytest.mark.parametrize("mode", ["L", "RGB", "RGBA", "P"])
+    def test_modes_agree_on_gray_page(self, checkerboard, mode):
+        """Test that a gray page yields the same metrics in every supported mode."""
+        gray = Image.fromarray(checkerboard.astype(np.uint8) * 255)
+
+        _, metrics, _ = validate_image_quality(gray.convert(mode), QUALITY_THRESHOLDS)
+
+        assert metrics['brightness'] == pytest.approx(0.5, abs=1e-2)
+
+class TestBatchPreprocessing:
+    """Test suite for preprocessing several document images in one call."""
+
+    @pytest.fixture
+    def pages(self, document_image):
+        """Fixture for two distinct grayscale pages."""
+        return [document_image, document_image.transpose(Image.Transpose.FLIP_LEFT_RIGHT)]
+
+    def test_matches_single_image_calls(self, preprocessor, pages):
+        """Test that batch results equal one preprocess_image call per page, in order."""
+        batch = preprocessor.preprocess_images(pages)
+
+        assert len(batch) == len(pages)
+        for (image, metrics), page in zip(batch, pages):
+            expected_image, expected_metrics = preprocessor.preprocess_image(page)
+            np.testing.assert_array_equal(np.asarray(image), np.asarray(expected_image))
+            assert metrics == expected_metrics
+
+    def test_dicom_paths_routed_to_pydicom(self, preprocessor, document_image, monkeypatch):
+        """Test that DICOM file paths are decoded by the DICOM loader, not PIL."""
+        load_dicom = MagicMock(return_value=document_image)
+        monkeypatch.setattr(preprocessor_module, "_load_dicom_image", load_dicom)
+
+        batch = preprocessor.preprocess_images(["scan.DCM", document_image])
+
+        load_dicom.assert_called_once_with("scan.DCM")
+        np.testing.assert_array_equal(np.asarray(batch[0][0]), np.asarray(batch[1][0]))
+
+    def test_rejects_unsupported_input(self, preprocessor, document_image):
+        """Test that one invalid entry fails the whole batch."""
+        with pytest.raises(ValueError, match="PIL Image or a DICOM file path"):
+            preprocessor.preprocess_images([document_image, "page.png"])
+
+
+class TestDicomLoading:
+    """Test suite for converting DICOM pixel data to 8-bit document images."""
+
+    @pytest.fixture
+    def load(self, monkeypatch):
+        """Load a given dataset through the DICOM loader, returning its pixels."""
+        def load(dataset):
+            monkeypatch.setattr(preprocessor_module.pydicom, "dcmread", lambda path: dataset)
+            return np.asarray(preprocessor_module._load_dicom_image("scan.dcm"))
+        return load
+
+    @pytest.mark.parametrize("photometric, expected", [
+        ("MONOCHROME2", [[0, 255]]),
+        ("MONOCHROME1", [[255, 0]])
+    ])
+    def test_photometric_interpretation(self, load, photometric, expected):
+        """Test that MONOCHROME1 images, stored with low values as white, are inverted."""
+        dataset = dicom_dataset(np.array([[0, 4095]]), PhotometricInterpretation=photometric)
+
+        np.testing.assert_array_equal(load(dataset), expected)
+
+    def test_window_applied_in_modality_units(self, load):
+        """Test that the display window is applied after RescaleSlope/RescaleIntercept."""
+        # Stored values 824..4000 are -200..2976 in Hounsfield units; the window is -200..200
+        dataset = dicom_dataset(np.array([[824, 1024], [1224, 4000]]),
+                                RescaleSlope=1, RescaleIntercept=-1024,
+                                WindowCenter=0, WindowWidth=400)
+
+        pixels = load(dataset)
+
+        assert pixels.dtype == np.uint8
+        assert pixels[0, 0] == 0
+        assert 100 < pixels[0, 1] < 155
+        np.testing.assert_array_equal(pixels[1], [255, 255])
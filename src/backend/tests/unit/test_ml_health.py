@@ -0,0 +1,1292 @@
+"""
+Unit tests for the health machine learning pipeline covering preprocessing, outlier
+handling, scaler state, trend analysis and training utilities.
+
+Version: 1.0.0
+"""
+
+import asyncio
+import logging
+from unittest.mock import MagicMock, call, patch
+
+import pytest  # pytest v7.4+
+import numpy as np  # numpy v1.23+
+import pandas as pd  # pandas v2.0+
+import scipy.stats as stats  # scipy v1.9+
+from sklearn.ensemble import (  # scikit-learn v1.2+
+    HistGradientBoostingRegressor,
+    RandomForestRegressor
+)
+
+from ml.health import ENSEMBLE_WEIGHTS, HealthAnalyzerFacade
+from ml.health import analyzer as analyzer_module
+from ml.health.analyzer import ANOMALY_THRESHOLD, HealthAnalyzer
+from ml.health import predictor as predictor_module
+from ml.health.predictor import (
+    LSTMHealthPredictor,
+    PredictionBatcher,
+    RandomForestHealthPredictor
+)
+from ml.health import preprocessor as preprocessor_module
+from ml.health.preprocessor import (
+    HealthDataPreprocessor,
+    _check_value_ranges,
+    _column_statistics,
+    _frame_fingerprint
+)
+from core.constants import HealthMetricType
+from ml.health import trainer as trainer_module
+from ml.health.trainer import LSTMTrainer, ModelTrainer, RandomForestTrainer
+
+# Test configuration constants
+TEST_ROWS = 64
+TEST_OUTLIER_VALUE = 300.0
+
+@pytest.fixture
+def preprocessor():
+    """Fixture for a fresh health data preprocessor."""
+    return HealthDataPreprocessor()
+
+@pytest.fixture
+def trainer_config(tmp_path):
+    """Fixture for a trainer configuration tracking into a temporary MLflow store."""
+    return {
+        "mlflow_tracking_uri": tmp_path.as_uri(),
+        "experiment_name": "unit_tests"
+    }
+
+class _MarkingSecurityManager:
+    """Stand-in for SecurityManager that tags payloads instead of encrypting them."""
+
+    def __init__(self, settings):
+        """Accept settings like SecurityManager."""
+
+    def encrypt_phi(self, data: str) -> bytes:
+        """Tag the payload so tests can tell it went through the manager."""
+        return b"encrypted:" + data.encode()
+
+    def decrypt_phi(self, encrypted_data: bytes) -> str:
+        """Strip the tag added by encrypt_phi."""
+        assert encrypted_data.startswith(b"encrypted:")
+        return encrypted_data[len(b"encrypted:"):].decode()
+
+@pytest.fixture
+def cached_trainer(trainer_config, tmp_path, monkeypatch):
+    """Fixture for a trainer with the on-disk array cache enabled."""
+    monkeypatch.setattr(trainer_module, "SecurityManager", _MarkingSecurityManager)
+    config = {**trainer_config, "data_cache_dir": str(tmp_path / "cache"),
+              "data_cache_max_entries": 2}
+    return ModelTrainer(config, enable_gpu=False)
+
+@pytest.fixture
+def heart_rate_frame():
+    """Fixture for a heart rate series with a single gross outlier in the last row."""
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({
+        "heart_rate": np.r_[rng.normal(70.0, 5.0, TEST_ROWS - 1), TEST_OUTLIER_VALUE],
+        "steps": rng.integers(0, 1000, TEST_ROWS)
+    })
+
+class TestOutlierHandling:
+    """Test suite for outlier masking in the health preprocessor."""
+
+    @pytest.mark.parametrize("dtype", [np.float32, np.float64])
+    def test_outlier_replaced(self, preprocessor, heart_rate_frame, dtype):
+        """Test that outliers are masked and imputed for float32 and float64 frames."""
+        data = heart_rate_frame.astype({"heart_rate": dtype})
+
+        handled = preprocessor._handle_outliers(data, "heart_rate")
+
+        assert handled["heart_rate"].max() < TEST_OUTLIER_VALUE
+        assert not handled.isna().any().any()
+
+    @pytest.mark.parametrize("dtype", [np.float32, np.float64])
+    def test_float_dtype_preserved(self, preprocessor, heart_rate_frame, dtype):
+        """Test that float columns keep their dtype through outlier handling."""
+        data = heart_rate_frame.astype({"heart_rate": dtype})
+
+        handled = preprocessor._handle_outliers(data, "heart_rate")
+
+        assert handled["heart_rate"].dtype == dtype
+
+    def test_constant_column_untouched(self, preprocessor):
+        """Test that zero-variance columns are never flagged."""
+        data = pd.DataFrame({"heart_rate": np.full(TEST_ROWS, 60.0)})
+
+        handled = preprocessor._handle_outliers(data, "heart_rate")
+
+        np.testing.assert_array_equal(handled["heart_rate"].to_numpy(), 60.0)
+
+    @pytest.mark.parametrize("dtype", [np.float32, np.float64])
+    @pytest.mark.parametrize("n_columns", [1, 3])
+    def test_kernel_warmed_for_runtime_layout(self, dtype, n_columns):
+        """Test that the import-time warm-up compiled the layout outlier handling passes."""
+        numba = pytest.importorskip("numba")
+        if not preprocessor_module.NUMBA_AVAILABLE:
+            pytest.skip("numba kernel disabled")
+        values = np.zeros((TEST_ROWS, n_columns), dtype=dtype, order="F")
+
+        compiled = [signature[0] for signature in
+                    preprocessor_module._mask_outliers_inplace.signatures]
+
+        assert numba.typeof(values) in compiled
+
+    def test_mask_matches_nan_omitting_zscore(self):
+        """Test the masking kernel against scipy's NaN-omitting sample z-scores."""
+        rng = np.random.default_rng(4)
+        values = rng.normal(70.0, 5.0, (TEST_ROWS, 3))
+        values[[2, 30], 0] = np.nan
+        values[[7, 50], 1] = [200.0, -100.0]
+        values[:, 2] = np.r_[np.full(TEST_ROWS - 1, np.nan), 1.0]
+        with np.errstate(invalid="ignore"):
+            z_scores = np.abs(stats.zscore(values, axis=0, ddof=1, nan_policy="omit"))
+        expected = np.where(z_scores > 3.0, np.nan, values)
+
+        masked = np.array(values, order="F")
+        preprocessor_module._mask_outliers_inplace(masked, 3.0)
+
+        np.testing.assert_array_equal(masked, expected)
+        assert np.isnan(masked[[7, 50], 1]).all()
+
+    def test_preprocess_health_metrics_float32_output(self, preprocessor, heart_rate_frame):
+        """Regression: preprocessing float64 input must succeed and emit float32 columns."""
+        processed, quality_metrics = preprocessor.preprocess_health_metrics(
+            heart_rate_frame, "heart_rate", fit=True
+        )
+
+        assert quality_metrics["metric_type"] == "heart_rate"
+        assert (processed.dtypes == np.float32).all()
+
+class TestFrameFingerprint:
+    """Test suite for the in-place frame fingerprint used as a cache key."""
+
+    def test_equal_frames_match(self, heart_rate_frame):
+        """Test that equal frames built from separate buffers share a fingerprint."""
+        assert _frame_fingerprint(heart_rate_frame) == _frame_fingerprint(heart_rate_frame.copy())
+
+    def test_value_change_detected(self, heart_rate_frame):
+        """Test that changing a single value changes the fingerprint."""
+        changed = heart_rate_frame.copy()
+        changed.loc[5, "heart_rate"] += 1.0
+
+        assert _frame_fingerprint(changed) != _frame_fingerprint(heart_rate_frame)
+
+    def test_index_and_names_hashed(self, heart_rate_frame):
+        """Test that the index and column names are part of the fingerprint."""
+        shifted = heart_rate_frame.set_axis(heart_rate_frame.index + 1)
+        renamed = heart_rate_frame.rename(columns={"steps": "step_count"})
+
+        assert _frame_fingerprint(shifted) != _frame_fingerprint(heart_rate_frame)
+        assert _frame_fingerprint(renamed) != _frame_fingerprint(heart_rate_frame)
+
+    def test_object_columns_hash_contents(self):
+        """Test that object columns are hashed by value rather than by pointer."""
+        first = pd.DataFrame({"unit": pd.Series(["bpm", "bpm"], dtype=object)})
+        second = pd.DataFrame({"unit": pd.Series(["".join("bpm"), "bp" + "m"], dtype=object)})
+        other = pd.DataFrame({"unit": pd.Series(["bpm", "kg"], dtype=object)})
+
+        assert _frame_fingerprint(first) == _frame_fingerprint(second)
+        assert _frame_fingerprint(first) != _frame_fingerprint(other)
+
+class TestPreprocessingCache:
+    """Test suite for least-recently-used eviction of preprocessed frames."""
+
+    @pytest.fixture
+    def frames(self, heart_rate_frame):
+        """Fixture for three distinct heart rate frames."""
+        return [heart_rate_frame.assign(heart_rate=heart_rate_frame["heart_rate"] + offset)
+                for offset in (0.0, 1.0, 2.0)]
+
+    @pytest.fixture
+    def small_cache(self, frames):
+        """Fixture for a two-entry cache holding the first two frames, fitted on the first."""
+        preprocessor = HealthDataPreprocessor(cache_config={"max_size": 2})
+        preprocessor.preprocess_health_metrics(frames[0], "heart_rate", fit=True)
+        for frame in frames[:2]:
+            preprocessor.preprocess_health_metrics(frame, "heart_rate")
+        return preprocessor
+
+    def test_bounded_by_max_size(self, small_cache, frames):
+        """Test that inserting past the limit keeps the cache at its maximum size."""
+        small_cache.preprocess_health_metrics(frames[2], "heart_rate")
+
+        assert len(small_cache.preprocessing_cache) == 2
+
+    def test_hit_refreshes_entry(self, small_cache, frames):
+        """Test that a cache hit protects the entry from the next eviction."""
+        first_result = small_cache.preprocess_health_metrics(frames[0], "heart_rate")
+        small_cache.preprocess_health_metrics(frames[2], "heart_rate")
+
+        with patch.object(small_cache, "_handle_outliers",
+                          wraps=small_cache._handle_outliers) as handle_outliers:
+            again = small_cache.preprocess_health_metrics(frames[0], "heart_rate")
+            small_cache.preprocess_health_metrics(frames[1], "heart_rate")
+
+        assert again[0] is first_result[0]
+        assert handle_outliers.call_count == 1
+
+class TestFeatureExtraction:
+    """Test suite for fused statistical feature extraction."""
+
+    @pytest.fixture
+    def weight_frame(self):
+        """Fixture for a weight frame with gaps and an integer column."""
+        rng = np.random.default_rng(9)
+        frame = pd.DataFrame({
+            "weight": rng.normal(70.0, 4.0, TEST_ROWS),
+            "body_fat": rng.gamma(2.0, 5.0, TEST_ROWS),
+            "steps": rng.integers(0, 1000, TEST_ROWS)
+        })
+        frame.loc[[3, 17], "weight"] = np.nan
+        return frame
+
+    def test_column_statistics_match_pandas(self, weight_frame):
+        """Test the single-pass moments and quartiles against the pandas reductions."""
+        mean, std, skew, kurt, quartiles = _column_statistics(
+            np.asfortranarray(weight_frame.to_numpy(dtype=np.float64))
+        )
+
+        np.testing.assert_allclose(mean, weight_frame.mean())
+        np.testing.assert_allclose(std, weight_frame.std())
+        np.testing.assert_allclose(skew, weight_frame.skew())
+        np.testing.assert_allclose(kurt, weight_frame.kurt())
+        np.testing.assert_allclose(quartiles, weight_frame.quantile([0.25, 0.5, 0.75]).T)
+
+    @pytest.mark.parametrize("rows", [1, 2, 3])
+    def test_short_columns_match_pandas(self, weight_frame, rows):
+        """Test that moments undefined for short columns are NaN as in pandas."""
+        frame = weight_frame.dropna().head(rows)
+
+        _, std, skew, kurt, _ = _column_statistics(
+            np.asfortranarray(frame.to_numpy(dtype=np.float64))
+        )
+
+        for values, expected in zip([std, skew, kurt], [frame.std(), frame.skew(), frame.kurt()]):
+            np.testing.assert_allclose(values, expected)
+
+    def test_constant_column(self):
+        """Test that a constant column has zero skew and kurtosis like pandas."""
+        frame = pd.DataFrame({"weight": np.full(8, 70.0)})
+
+        _, std, skew, kurt, _ = _column_statistics(frame.to_numpy())
+
+        assert std[0] == 0.0
+        assert skew[0] == frame["weight"].skew() == 0.0
+        assert kurt[0] == frame["weight"].kurt() == 0.0
+
+    def test_feature_vector_layout(self, preprocessor, weight_frame):
+        """Test that extracted features concatenate the statistics block by block."""
+        features, metadata = preprocessor.extract_health_features(weight_frame, "weight")
+
+        expected = np.concatenate([
+            weight_frame.mean(), weight_frame.std(), weight_frame.skew(), weight_frame.kurt(),
+            weight_frame.quantile([0.25, 0.5, 0.75]).T.to_numpy().ravel()
+        ])
+        np.testing.assert_allclose(features, expected)
+        assert metadata == {}
+
+    @pytest.mark.parametrize("as_strings", [True, False])
+    def test_temporal_columns_from_one_conversion(self, preprocessor, weight_frame, as_strings):
+        """Test that ISO strings and datetimes yield the same hour and weekday columns."""
+        timestamps = pd.date_range("2024-01-05 22:00", periods=TEST_ROWS, freq="37min")
+        frame = weight_frame.assign(
+            timestamp=timestamps.strftime("%Y-%m-%dT%H:%M:%S") if as_strings else timestamps
+        )
+
+        with patch.object(preprocessor, "_extract_temporal_features", create=True,
+                          return_value=[]) as extract_temporal:
+            _, metadata = preprocessor.extract_health_features(frame, "weight")
+
+        temporal_frame = extract_temporal.call_args.args[0]
+        np.testing.assert_array_equal(temporal_frame["hour"], timestamps.hour)
+        np.testing.assert_array_equal(temporal_frame["day_of_week"], timestamps.dayofweek)
+        assert "hour" not in frame.columns
+        assert metadata["temporal_features"] is True
+
+class TestBatchFeatures:
+    """Test suite for per-patient feature batches in a single matrix."""
+
+    @pytest.fixture
+    def patient_frames(self, heart_rate_frame):
+        """Fixture for three patients' frames of different lengths."""
+        return [heart_rate_frame.head(rows) for rows in (TEST_ROWS, 48, 40)]
+
+    def test_rows_match_single_extraction(self, preprocessor, patient_frames):
+        """Test that each matrix row equals the patient's own feature vector."""
+        matrix, metadata = preprocessor.extract_health_features_batch(patient_frames, "weight")
+
+        expected = [preprocessor.extract_health_features(frame, "weight")[0]
+                    for frame in patient_frames]
+        assert matrix.dtype == np.float32
+        assert matrix.flags.c_contiguous
+        np.testing.assert_allclose(matrix, np.stack(expected), rtol=1e-6)
+        assert len(metadata) == len(patient_frames)
+
+    def test_feature_length_mismatch(self, preprocessor, patient_frames):
+        """Test that frames with different feature layouts are rejected."""
+        frames = [patient_frames[0], patient_frames[1][["heart_rate"]]]
+
+        with pytest.raises(ValueError, match="Feature length mismatch for frame 1"):
+            preprocessor.extract_health_features_batch(frames, "weight")
+
+    def test_empty_batch(self, preprocessor):
+        """Test that an empty batch yields an empty matrix."""
+        matrix, metadata = preprocessor.extract_health_features_batch([], "weight")
+
+        assert matrix.shape == (0, 0)
+        assert metadata == []
+
+    def test_random_forest_predict_batch(self, patient_frames):
+        """Test that one forest traversal matches per-patient predictions."""
+        predictor = RandomForestHealthPredictor({"n_estimators": 5})
+        width = predictor.preprocessor.extract_health_features(patient_frames[0], "weight")[0].size
+        rng = np.random.default_rng(1)
+        predictor.model = RandomForestRegressor(n_estimators=5, random_state=0).fit(
+            rng.normal(size=(32, width)), rng.normal(size=32)
+        )
+
+        result = predictor.predict_batch(patient_frames, metric_type="weight")
+
+        expected = []
+        for frame in patient_frames:
+            processed, _ = predictor.preprocessor.preprocess_health_metrics(frame, "weight")
+            features, _ = predictor.preprocessor.extract_health_features(processed, "weight")
+            expected.append(features.astype(np.float32))
+        expected_predictions = predictor.model.predict(np.stack(expected))
+        np.testing.assert_allclose(result["predictions"], expected_predictions)
+
+class TestRandomForestThreads:
+    """Test suite for multithreaded forest training and inference."""
+
+    def test_all_cores_by_default(self):
+        """Test that forests are built and traversed on every core by default."""
+        predictor = RandomForestHealthPredictor()
+
+        assert predictor.config["n_jobs"] == -1
+        assert RandomForestRegressor(**predictor.config).n_jobs == -1
+
+    def test_override_kept(self):
+        """Test that an explicit n_jobs overrides the default without dropping the rest."""
+        predictor = RandomForestHealthPredictor({"n_jobs": 2})
+
+        assert predictor.config["n_jobs"] == 2
+        defaults = predictor_module.RF_DEFAULT_CONFIG
+        assert predictor.config["n_estimators"] == defaults["n_estimators"]
+
+class TestValueRanges:
+    """Test suite for the vectorized realistic-range check."""
+
+    @pytest.mark.parametrize("values", [
+        [30.0, 120.0, 220.0],
+        [29.9, 120.0],
+        [120.0, 220.5],
+        [72.0, np.nan],
+        [],
+        [60, 180]
+    ])
+    def test_matches_between(self, values):
+        """Test agreement with the inclusive Series.between().all() check."""
+        series = pd.Series(values, dtype=None if values else np.float64)
+
+        result = _check_value_ranges(series, HealthMetricType.HEART_RATE)
+
+        assert result is bool(series.between(30, 220).all())
+
+    def test_metric_without_range(self):
+        """Test that metrics without a configured range always pass."""
+        assert _check_value_ranges(pd.Series([-1.0]), HealthMetricType.BLOOD_GLUCOSE)
+
+class TestSequencePreparation:
+    """Test suite for strided sequence windows and their validation."""
+
+    SEQUENCE_LENGTH = 8
+
+    def test_windows_match_slicing_loop(self, preprocessor, heart_rate_frame):
+        """Test that strided windows equal the per-window slices of the old loop."""
+        frame = heart_rate_frame.assign(target=np.arange(TEST_ROWS, dtype=np.float64))
+
+        X, y, metadata = preprocessor.prepare_sequences(frame, self.SEQUENCE_LENGTH)
+
+        values = frame.to_numpy(dtype=np.float32)
+        expected = np.stack([values[i:i + self.SEQUENCE_LENGTH]
+                             for i in range(TEST_ROWS - self.SEQUENCE_LENGTH)])
+        np.testing.assert_array_equal(X, expected)
+        np.testing.assert_array_equal(y, frame["target"].to_numpy()[self.SEQUENCE_LENGTH:])
+        assert metadata["sequence_count"] == TEST_ROWS - self.SEQUENCE_LENGTH
+
+    def test_output_contiguous_float32(self, preprocessor, heart_rate_frame):
+        """Test that kept windows are materialized once as a contiguous float32 block."""
+        X, _, _ = preprocessor.prepare_sequences(heart_rate_frame, self.SEQUENCE_LENGTH)
+
+        assert X.dtype == np.float32
+        assert X.flags.c_contiguous
+        assert X.flags.writeable
+
+    def test_window_validation_matches_loop(self, preprocessor, heart_rate_frame):
+        """Test prefix-sum missing ratios and gap checks against a per-window loop."""
+        frame = heart_rate_frame.assign(
+            timestamp=pd.date_range("2024-01-01", periods=TEST_ROWS, freq="h")
+        )
+        frame.loc[10:13, "heart_rate"] = np.nan
+        frame.loc[40:, "timestamp"] += pd.Timedelta(hours=12)
+        n_windows = TEST_ROWS - self.SEQUENCE_LENGTH
+
+        valid = preprocessor._validate_windows(frame, self.SEQUENCE_LENGTH, n_windows, {})
+
+        expected = []
+        for i in range(n_windows):
+            window = frame.iloc[i:i + self.SEQUENCE_LENGTH]
+            missing_ratio = window.isnull().sum().sum() / window.size
+            max_gap = window["timestamp"].diff().max()
+            expected.append(missing_ratio <= 0.2 and max_gap <= pd.Timedelta(hours=6))
+        np.testing.assert_array_equal(valid, expected)
+        assert not valid.all() and valid.any()
+
+    def test_too_short_for_a_window(self, preprocessor, heart_rate_frame):
+        """Test that frames no longer than the sequence length yield no windows."""
+        X, y, metadata = preprocessor.prepare_sequences(
+            heart_rate_frame.head(self.SEQUENCE_LENGTH), self.SEQUENCE_LENGTH
+        )
+
+        assert X.shape == (0, self.SEQUENCE_LENGTH, 2)
+        assert len(y) == 0
+        assert metadata["feature_dim"] == 0
+
+class TestHealthAnalyzerFacade:
+    """Test suite for isolation of fitted state between analyzer facades."""
+
+    def test_fitted_components_not_shared(self):
+        """Test that scalers and models are never shared between facades."""
+        first = HealthAnalyzerFacade()
+        second = HealthAnalyzerFacade()
+
+        assert first.preprocessor is not second.preprocessor
+        assert first.lstm_predictor is not second.lstm_predictor
+        assert first.rf_predictor is not second.rf_predictor
+
+    def test_core_analyzer_reuses_facade_preprocessor(self):
+        """Test that the core analyzer works on the facade's own preprocessor."""
+        facade = HealthAnalyzerFacade()
+
+        assert facade.analyzer.preprocessor is facade.preprocessor
+
+    def test_delegates_to_core_analyzer(self, heart_rate_frame):
+        """Test that the facade forwards to the core analyzer instead of recursing."""
+        facade = HealthAnalyzerFacade()
+        facade.analyzer = MagicMock(spec=HealthAnalyzer)
+
+        result = facade.analyze_trends(heart_rate_frame, "heart_rate")
+
+        facade.analyzer.analyze_trends.assert_called_once_with(heart_rate_frame, "heart_rate")
+        assert result is facade.analyzer.analyze_trends.return_value
+
+    def test_unsupported_metric(self, heart_rate_frame):
+        """Test that unsupported metrics are rejected before delegation."""
+        facade = HealthAnalyzerFacade()
+        facade.analyzer = MagicMock(spec=HealthAnalyzer)
+
+        with pytest.raises(ValueError, match="Unsupported metric type"):
+            facade.analyze_trends(heart_rate_frame, "glucose")
+        facade.analyzer.analyze_trends.assert_not_called()
+
+    def test_ensemble_combination(self, heart_rate_frame):
+        """Test the weighted ensemble and widest interval against a float64 reference."""
+        lstm = {
+            "predictions": np.array([70.0, 72.0, 74.0]),
+            "confidence_intervals": {"lower": np.array([65.0, 68.0, 71.0]),
+                                     "upper": np.array([75.0, 76.0, 77.0])},
+            "error_estimates": {"mae": 1.5}
+        }
+        rf = {
+            "predictions": np.array([68.0, 73.0, 71.0]),
+            "confidence_intervals": {"lower": np.array([66.0, 67.0, 69.0]),
+                                     "upper": np.array([74.0, 78.0, 73.0])}
+        }
+        facade = HealthAnalyzerFacade()
+        facade.lstm_predictor = MagicMock(**{"predict.return_value": lstm})
+        facade.rf_predictor = MagicMock(**{"predict.return_value": rf})
+
+        result = facade.predict_metrics(heart_rate_frame, "heart_rate", prediction_horizon=3)
+
+        expected = (ENSEMBLE_WEIGHTS["lstm"] * lstm["predictions"]
+                    + ENSEMBLE_WEIGHTS["random_forest"] * rf["predictions"])
+        assert result["predictions"].dtype == np.float32
+        np.testing.assert_allclose(result["predictions"], expected, rtol=1e-6)
+        np.testing.assert_array_equal(result["confidence_intervals"]["lower"], [65.0, 67.0, 69.0])
+        np.testing.assert_array_equal(result["confidence_intervals"]["upper"], [75.0, 78.0, 77.0])
+        assert result["model_metadata"] == {"lstm_metrics": {"mae": 1.5}, "rf_metrics": {}}
+
+class TestLSTMInference:
+    """Test suite for the traced LSTM inference graph."""
+
+    def test_predict_fn_traced_once(self):
+        """Test that the batch-polymorphic graph is warmed with a single call."""
+        predictor = LSTMHealthPredictor()
+        predictor.model = MagicMock()
+
+        with patch.object(predictor_module.tf, "function") as function:
+            predictor._compile_predict_fn((4, 1))
+
+        function.return_value.assert_called_once()
+
+    def test_forward_batches_rows(self):
+        """Test that forward passes split long inputs into fixed-size batches."""
+        predictor = LSTMHealthPredictor()
+        predictor._predict_fn = MagicMock(
+            side_effect=lambda x: MagicMock(numpy=lambda: np.zeros((len(x), 1), np.float32))
+        )
+        X = np.zeros((predictor_module.PREDICT_BATCH_SIZE + 3, 4, 1))
+
+        outputs = predictor._forward(X)
+
+        assert outputs.shape == (len(X), 1)
+        assert predictor._predict_fn.call_count == 2
+
+class TestPredictionBatcher:
+    """Test suite for coalescing concurrent LSTM forward passes."""
+
+    @pytest.fixture
+    def forward(self):
+        """Batched forward pass returning each row's first value, recording batch sizes."""
+        return MagicMock(side_effect=lambda X: X[:, :1].copy())
+
+    @staticmethod
+    def gather(batcher, *requests):
+        """Submit requests concurrently and collect their outputs."""
+        async def run():
+            return await asyncio.gather(*(batcher.submit(X) for X in requests))
+        return asyncio.run(run())
+
+    def test_requests_coalesced(self, forward):
+        """Test that requests within the wait window share one forward pass."""
+        batcher = PredictionBatcher(forward, max_wait=0.05)
+        first, second = np.arange(3.0).reshape(3, 1), np.arange(3.0, 5.0).reshape(2, 1)
+
+        outputs = self.gather(batcher, first, second)
+
+        forward.assert_called_once()
+        assert len(forward.call_args.args[0]) == 5
+        np.testing.assert_array_equal(outputs[0], first)
+        np.testing.assert_array_equal(outputs[1], second)
+
+    def test_full_batch_flushed_without_waiting(self, forward):
+        """Test that reaching the batch size flushes before the wait window ends."""
+        batcher = PredictionBatcher(forward, max_wait=60.0, max_batch_size=4)
+
+        async def run():
+            return await asyncio.wait_for(batcher.submit(np.ones((4, 1))), timeout=5)
+
+        np.testing.assert_array_equal(asyncio.run(run()), np.ones((4, 1)))
+
+    def test_failure_reaches_every_request(self):
+        """Test that a failed forward pass is raised to all coalesced requests."""
+        batcher = PredictionBatcher(MagicMock(side_effect=RuntimeError("device lost")))
+
+        async def run():
+            return await asyncio.gather(batcher.submit(np.ones((1, 1))),
+                                        batcher.submit(np.ones((2, 1))),
+                                        return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in asyncio.run(run()))
+
+    def test_predict_async_matches_predict(self):
+        """Test that batched async predictions match the synchronous path."""
+        predictor = LSTMHealthPredictor()
+        predictor.model = MagicMock()
+        X = np.arange(6, dtype=np.float32).reshape(3, 2, 1)
+        predictor._prepare_input = MagicMock(return_value=(X, {"sequence_length": 2}))
+        predictor._forward = MagicMock(side_effect=lambda X: X[:, -1, :])
+        predictor.batcher = PredictionBatcher(predictor._forward)
+        frame = pd.DataFrame({"heart_rate": [70.0]})
+
+        async def run():
+            return await asyncio.gather(predictor.predict_async(frame, "heart_rate"),
+                                        predictor.predict_async(frame, "heart_rate"))
+
+        results = asyncio.run(run())
+
+        assert predictor._forward.call_count == 1
+        expected = predictor.predict(frame, metric_type="heart_rate")
+        for result in results:
+            assert result["predictions"] == expected["predictions"]
+
+class TestLSTMMixedPrecision:
+    """Test suite for opt-in fp16 mixed precision in the LSTM predictor."""
+
+    @pytest.fixture
+    def keras(self, monkeypatch):
+        """Stand in for TensorFlow with a single visible GPU and device setup done."""
+        tf_mock = MagicMock()
+        tf_mock.config.experimental.list_physical_devices.return_value = ["GPU:0"]
+        tf_mock.keras.mixed_precision.global_policy.return_value.name = "float32"
+        monkeypatch.setattr(predictor_module, "tf", tf_mock)
+        monkeypatch.setattr(predictor_module, "_gpu_configured", True)
+        return tf_mock.keras
+
+    def test_float32_by_default(self, keras):
+        """Test that the global policy is left alone unless mixed precision is requested."""
+        LSTMHealthPredictor()
+
+        keras.mixed_precision.set_global_policy.assert_not_called()
+
+    def test_opt_in_scoped_to_build(self, keras):
+        """Test that opting in builds under mixed_float16 and then restores the previous policy."""
+        previous = keras.mixed_precision.global_policy.return_value
+        predictor = LSTMHealthPredictor({"mixed_precision": True})
+        keras.mixed_precision.set_global_policy.assert_not_called()
+
+        predictor._build_model((4, 1))
+
+        assert keras.mixed_precision.set_global_policy.call_args_list == [
+            call("mixed_float16"), call(previous)
+        ]
+
+    def test_policy_restored_when_build_fails(self, keras):
+        """Test that a failed build does not leave fp16 as the process-wide policy."""
+        previous = keras.mixed_precision.global_policy.return_value
+        keras.Sequential.side_effect = RuntimeError("build failed")
+        predictor = LSTMHealthPredictor({"mixed_precision": True})
+
+        with pytest.raises(RuntimeError):
+            predictor._build_model((4, 1))
+
+        keras.mixed_precision.set_global_policy.assert_called_with(previous)
+
+    @pytest.mark.parametrize("policy, loss_scaled", [("float32", False), ("mixed_float16", True)])
+    def test_loss_scaling_and_float32_output(self, keras, policy, loss_scaled):
+        """Test that fp16 models get a loss-scaling optimizer and a float32 output layer."""
+        keras.mixed_precision.global_policy.return_value.name = policy
+        predictor = LSTMHealthPredictor()
+
+        predictor._build_model((4, 1))
+
+        keras.layers.Dense.assert_called_once_with(1, dtype="float32")
+        optimizer = keras.Sequential.return_value.compile.call_args.kwargs["optimizer"]
+        if loss_scaled:
+            keras.mixed_precision.LossScaleOptimizer.assert_called_once_with(
+                keras.optimizers.Adam.return_value
+            )
+            assert optimizer is keras.mixed_precision.LossScaleOptimizer.return_value
+        else:
+            assert optimizer is keras.optimizers.Adam.return_value
+
+class TestMonitorPerformance:
+    """Test suite for the prediction monitoring decorator."""
+
+    @pytest.fixture
+    def metrics(self, monkeypatch):
+        """Replace the Prometheus metrics and their bound-child caches with mocks."""
+        latency, requests = MagicMock(), MagicMock()
+        monkeypatch.setattr(predictor_module, "prediction_latency", latency)
+        monkeypatch.setattr(predictor_module, "prediction_requests", requests)
+        monkeypatch.setattr(predictor_module, "_latency_children", {})
+        monkeypatch.setattr(predictor_module, "_request_children", {})
+        return latency, requests
+
+    def test_children_bound_once(self, metrics, heart_rate_frame):
+        """Test that label lookups happen once per model and metric, not per call."""
+        latency, requests = metrics
+        predictor = RandomForestHealthPredictor()
+        predictor.model = MagicMock(**{"predict.return_value": np.zeros(2)})
+        predictor.preprocessor = MagicMock(**{
+            "preprocess_health_metrics.return_value": (heart_rate_frame, {}),
+            "extract_health_features_batch.return_value": (np.zeros((2, 3)), [{}, {}])
+        })
+
+        for _ in range(3):
+            predictor.predict_batch([heart_rate_frame] * 2, metric_type="heart_rate")
+
+        latency.labels.assert_called_once_with("RandomForestHealthPredictor")
+        requests.labels.assert_called_once_with("RandomForestHealthPredictor", "heart_rate")
+        assert latency.labels.return_value.observe.call_count == 3
+        assert requests.labels.return_value.inc.call_count == 3
+
+    def test_error_logged_and_reraised(self, metrics, heart_rate_frame, caplog):
+        """Test that failures are logged once through the module logger and re-raised."""
+        latency, requests = metrics
+        predictor = RandomForestHealthPredictor()
+
+        with caplog.at_level(logging.ERROR, logger=predictor_module.__name__), \
+                pytest.raises(RuntimeError, match="Model not trained"):
+            predictor.predict_batch([heart_rate_frame], metric_type="heart_rate")
+
+        assert "Prediction error in predict_batch" in caplog.text
+        latency.labels.return_value.observe.assert_called_once()
+        requests.labels.assert_not_called()
+
+class TestScalerState:
+    """Test suite for fit-once, transform-at-inference scaler handling."""
+
+    def test_transform_does_not_refit(self, preprocessor, heart_rate_frame):
+        """Test that fit=False reuses the scaler fitted at training time."""
+        preprocessor.preprocess_health_metrics(heart_rate_frame, "heart_rate", fit=True)
+        center = preprocessor.metric_scalers["heart_rate"].center_.copy()
+
+        shifted = heart_rate_frame.assign(heart_rate=heart_rate_frame["heart_rate"] + 50.0)
+        preprocessor.preprocess_health_metrics(shifted, "heart_rate", fit=False)
+
+        np.testing.assert_array_equal(preprocessor.metric_scalers["heart_rate"].center_, center)
+
+    def test_first_use_fits(self, preprocessor, heart_rate_frame):
+        """Test that an unfitted scaler is fitted on first use even with fit=False."""
+        preprocessor.preprocess_health_metrics(heart_rate_frame, "heart_rate", fit=False)
+
+        assert preprocessor._scalers_fitted("heart_rate")
+
+    def test_cached_fit_still_refits(self, preprocessor, heart_rate_frame):
+        """Regression: a cached result must not stand in for an explicit refit."""
+        shifted = heart_rate_frame.assign(heart_rate=heart_rate_frame["heart_rate"] + 50.0)
+        preprocessor.preprocess_health_metrics(heart_rate_frame, "heart_rate", fit=True,
+                                               use_cache=True)
+        center = preprocessor.metric_scalers["heart_rate"].center_.copy()
+        preprocessor.preprocess_health_metrics(shifted, "heart_rate", fit=True)
+
+        preprocessor.preprocess_health_metrics(heart_rate_frame, "heart_rate", fit=True,
+                                               use_cache=True)
+
+        np.testing.assert_array_equal(preprocessor.metric_scalers["heart_rate"].center_, center)
+
+    def test_first_use_fit_cached_for_transform(self, preprocessor, heart_rate_frame):
+        """Test that a first-use fit is cached under the generation it produced."""
+        first, _ = preprocessor.preprocess_health_metrics(heart_rate_frame, "heart_rate")
+
+        second, _ = preprocessor.preprocess_health_metrics(heart_rate_frame, "heart_rate")
+
+        assert second is first
+
+    def test_analyzer_does_not_refit(self, heart_rate_frame):
+        """Test that trend analysis preprocesses without refitting the scalers."""
+        preprocessor = MagicMock(spec=HealthDataPreprocessor)
+        preprocessor.preprocess_health_metrics.return_value = (
+            heart_rate_frame, {"quality_score": 1.0}
+        )
+        preprocessor.extract_health_features.return_value = (np.zeros(1), {})
+
+        with patch("ml.health.analyzer.SecurityValidator"), \
+                patch("ml.health.analyzer.PerformanceMonitor") as monitor:
+            monitor.return_value.__enter__.return_value.execution_time = 0
+            analyzer = HealthAnalyzer(
+                config={}, logger=logging.getLogger(__name__), preprocessor=preprocessor
+            )
+            analyzer.analyze_trends(heart_rate_frame, "heart_rate")
+
+        assert preprocessor.preprocess_health_metrics.call_args.kwargs["fit"] is False
+
+@pytest.fixture
+def analyzer():
+    """Fixture for a core analyzer with security validation and monitoring stubbed out."""
+    with patch("ml.health.analyzer.SecurityValidator"), \
+            patch("ml.health.analyzer.PerformanceMonitor"):
+        yield HealthAnalyzer(config={}, logger=logging.getLogger(__name__),
+                             preprocessor=MagicMock(spec=HealthDataPreprocessor))
+
+class TestTrendCalculation:
+    """Test suite for the closed-form trend statistics against scipy.stats.linregress."""
+
+    @pytest.mark.parametrize("n", [3, 10, 500])
+    def test_matches_linregress(self, analyzer, n):
+        """Test slope, intercept, fit and significance against linregress."""
+        rng = np.random.default_rng(n)
+        values = (np.linspace(60.0, 65.0, n) + rng.normal(0.0, 2.0, n)).astype(np.float32)
+
+        trend = analyzer._calculate_trends(values)["trend"]
+        expected = stats.linregress(np.arange(n), values.astype(np.float64))
+
+        assert trend["slope"] == pytest.approx(expected.slope, rel=1e-9)
+        assert trend["intercept"] == pytest.approx(expected.intercept, rel=1e-9)
+        assert trend["r_squared"] == pytest.approx(expected.rvalue ** 2, rel=1e-9)
+        assert trend["p_value"] == pytest.approx(expected.pvalue, rel=1e-6, abs=1e-12)
+
+    def test_float32_precision_on_large_values(self, analyzer):
+        """Regression: float32 cross-products lost the slope of long, high-magnitude series."""
+        n = 100_000
+        values = (10_000.0 + 1e-3 * np.arange(n)).astype(np.float32)
+
+        trend = analyzer._calculate_trends(values)["trend"]
+        expected = stats.linregress(np.arange(n), values.astype(np.float64))
+
+        assert trend["slope"] == pytest.approx(expected.slope, rel=1e-9)
+
+    @pytest.mark.parametrize("values", [[70.0, 75.0], [70.0, 70.0]])
+    def test_two_points_match_linregress(self, analyzer, values):
+        """Test the two-point p-value convention of linregress."""
+        values = np.asarray(values, dtype=np.float32)
+
+        trend = analyzer._calculate_trends(values)["trend"]
+
+        assert trend["p_value"] == stats.linregress(np.arange(2), values).pvalue
+
+    @pytest.mark.parametrize("n", [0, 1])
+    def test_too_few_points(self, analyzer, n):
+        """Test that fewer than two points are rejected instead of dividing by zero."""
+        with pytest.raises(ValueError):
+            analyzer._calculate_trends(np.ones(n, dtype=np.float32))
+
+class TestConfidenceIntervals:
+    """Test suite for trend confidence intervals."""
+
+    @pytest.mark.parametrize("confidence_level, n", [(0.95, 24), (0.99, 7), (0.9, 500)])
+    def test_t_value_matches_scipy(self, confidence_level, n):
+        """Test the cached critical value against a direct stats.t.ppf lookup."""
+        expected = stats.t.ppf((1 + confidence_level) / 2, n - 1)
+
+        assert analyzer_module._t_critical_value(confidence_level, n) == pytest.approx(expected)
+
+    def test_interval_margin(self, analyzer):
+        """Test that the interval spans the critical value times the standard error."""
+        trends = {"mean": 70.0, "std": 4.0}
+
+        interval = analyzer._calculate_confidence_intervals(np.zeros(16), trends)
+
+        margin = stats.t.ppf(0.975, 15) * 4.0 / np.sqrt(16)
+        assert interval["lower_bound"] == pytest.approx(70.0 - margin)
+        assert interval["upper_bound"] == pytest.approx(70.0 + margin)
+
+class TestAnomalyDetection:
+    """Test suite for z-score anomaly detection."""
+
+    @pytest.fixture
+    def spiky_values(self):
+        """Fixture for a float32 heart rate series with medium and high severity spikes."""
+        values = np.random.default_rng(3).normal(70.0, 2.0, 500).astype(np.float32)
+        values[[40, 310]] = [140.0, 82.0]
+        return values
+
+    def test_matches_naive_loop(self, analyzer, spiky_values):
+        """Test flagged points, z-scores and severities against a per-element loop."""
+        mean = spiky_values.astype(np.float64).mean()
+        std = spiky_values.astype(np.float64).std()
+        expected = []
+        for i, value in enumerate(spiky_values):
+            z_score = abs((value - mean) / std)
+            if z_score > ANOMALY_THRESHOLD:
+                severity = "high" if z_score > 2 * ANOMALY_THRESHOLD else "medium"
+                expected.append((i, z_score, severity))
+
+        anomalies = analyzer._detect_anomalies(spiky_values, pd.RangeIndex(len(spiky_values)))
+
+        assert [a["index"] for a in anomalies] == [i for i, _, _ in expected]
+        assert [a["severity"] for a in anomalies] == [s for _, _, s in expected]
+        np.testing.assert_allclose([a["z_score"] for a in anomalies],
+                                   [z for _, z, _ in expected], rtol=1e-5)
+
+    def test_datetime_index_timestamps(self, analyzer, spiky_values):
+        """Test that anomalies on a datetime index carry ISO timestamps."""
+        index = pd.date_range("2024-01-01", periods=len(spiky_values), freq="h")
+
+        anomalies = analyzer._detect_anomalies(spiky_values, index)
+
+        assert anomalies[0]["timestamp"] == index[40].isoformat()
+
+    @pytest.mark.parametrize("offset", [0.0, 1e4])
+    def test_single_pass_mean_std(self, spiky_values, offset):
+        """Test the one-pass mean and population std against NumPy's two-pass result."""
+        values = spiky_values + np.float32(offset)
+
+        mean, std = analyzer_module._mean_std(values)
+
+        assert mean == pytest.approx(values.astype(np.float64).mean(), rel=1e-9)
+        assert std == pytest.approx(values.astype(np.float64).std(), rel=1e-4)
+
+    def test_flags_strictly_above_threshold(self):
+        """Test that the whole-vector compare flags only |z| strictly above the threshold."""
+        values = np.array([-3.0, -2.5, 0.0, 2.5, 2.6], dtype=np.float32)
+
+        indices, z_scores = analyzer_module._zscore_flags(values, 0.0, 1.0, ANOMALY_THRESHOLD)
+
+        np.testing.assert_array_equal(indices, [0, 4])
+        np.testing.assert_allclose(z_scores, [3.0, 2.6], rtol=1e-6)
+
+    @pytest.mark.parametrize("values", [[], [72.0] * 10])
+    def test_empty_or_constant(self, analyzer, values):
+        """Test that empty and constant series have no anomalies."""
+        values = np.asarray(values, dtype=np.float32)
+
+        assert analyzer._detect_anomalies(values, pd.RangeIndex(len(values))) == []
+
+class TestModelTrainer:
+    """Test suite for trainer construction and error reporting."""
+
+    def test_logger_configured(self, trainer_config):
+        """Test that the trainer logs through a standard module logger."""
+        trainer = ModelTrainer(trainer_config, enable_gpu=False)
+
+        assert isinstance(trainer.logger, logging.Logger)
+
+    def test_errors_surface_unchanged(self, trainer_config):
+        """Test that failures propagate as the original exception after logging."""
+        trainer = ModelTrainer(trainer_config, enable_gpu=False)
+
+        with pytest.raises(TypeError):
+            trainer.prepare_training_data([72.0, 75.0], "heart_rate")
+
+    def test_repeated_construction(self, trainer_config):
+        """Test that several trainers can coexist in one process."""
+        first = ModelTrainer(trainer_config, enable_gpu=False)
+        second = ModelTrainer(trainer_config, enable_gpu=False)
+
+        assert first.metrics["training_duration"] is second.metrics["training_duration"]
+
+class TestPrecisionPolicy:
+    """Test suite for scoping the mixed precision policy to LSTM model builds."""
+
+    def test_base_trainer_leaves_global_policy(self, trainer_config):
+        """Test that constructing a non-LSTM trainer never changes the global dtype policy."""
+        mixed_precision = trainer_module.tf.keras.mixed_precision
+        with patch.object(mixed_precision, "set_global_policy") as set_policy:
+            ModelTrainer({**trainer_config, "mixed_precision": True})
+
+        set_policy.assert_not_called()
+
+    def test_cpu_trainer_builds_float32(self, trainer_config):
+        """Test that the LSTM trainer only opts into mixed precision on GPU."""
+        trainer = LSTMTrainer({**trainer_config, "mixed_precision": True}, enable_gpu=False)
+
+        assert trainer.precision_policy == "float32"
+
+    def test_scope_restores_previous_policy(self, trainer_config):
+        """Test that the previous policy is restored even when the build fails."""
+        trainer = LSTMTrainer(trainer_config, enable_gpu=False)
+        trainer.precision_policy = "mixed_float16"
+        mixed_precision = trainer_module.tf.keras.mixed_precision
+
+        with patch.object(mixed_precision, "global_policy", return_value="previous"), \
+                patch.object(mixed_precision, "set_global_policy") as set_policy:
+            with pytest.raises(RuntimeError):
+                with trainer._precision_scope():
+                    raise RuntimeError("build failed")
+
+        assert set_policy.call_args_list == [call("mixed_float16"), call("previous")]
+
+class TestDatasetCachePaths:
+    """Test suite for keying the tf.data cache files of LSTM studies."""
+
+    @pytest.fixture
+    def lstm_trainer(self, trainer_config, tmp_path):
+        """Fixture for an LSTM trainer caching its datasets to disk."""
+        config = {**trainer_config, "dataset_cache_path": str(tmp_path / "ds")}
+        return LSTMTrainer(config, enable_gpu=False)
+
+    @pytest.fixture
+    def arrays(self):
+        """Fixture for a small (X_train, y_train, X_val, y_val) tuple."""
+        return (np.zeros((4, 2, 1), dtype=np.float32), np.zeros(4, dtype=np.float32),
+                np.ones((2, 2, 1), dtype=np.float32), np.ones(2, dtype=np.float32))
+
+    def test_in_memory_without_path(self, trainer_config, arrays):
+        """Test that datasets cache in memory unless a cache path is configured."""
+        trainer = LSTMTrainer(trainer_config, enable_gpu=False)
+
+        assert trainer._dataset_cache_paths(arrays, 32) == ("", "")
+
+    def test_keyed_by_arrays(self, lstm_trainer, arrays):
+        """Test that different training data never reuses another run's cache files."""
+        changed = (arrays[0] + 1.0,) + arrays[1:]
+
+        assert set(lstm_trainer._dataset_cache_paths(arrays, 32)).isdisjoint(
+            lstm_trainer._dataset_cache_paths(changed, 32)
+        )
+
+    def test_keyed_by_split(self, lstm_trainer):
+        """Test that resplitting the same raw data does not replay the old split's cache."""
+        X = np.arange(10, dtype=np.float32).reshape(10, 1, 1)
+        y = np.arange(10, dtype=np.float32)
+        first = lstm_trainer._dataset_cache_paths((X[:8], y[:8], X[8:], y[8:]), 32)
+        second = lstm_trainer._dataset_cache_paths((X[:6], y[:6], X[6:], y[6:]), 32)
+
+        assert set(first).isdisjoint(second)
+
+    def test_keyed_by_worker(self, lstm_trainer, arrays):
+        """Test that concurrent study workers write separate cache files."""
+        first = lstm_trainer._dataset_cache_paths(arrays, 32)
+        lstm_trainer.worker_id = 1
+
+        assert set(first).isdisjoint(lstm_trainer._dataset_cache_paths(arrays, 32))
+
+    def test_validation_keyed_by_batch_size(self, lstm_trainer, arrays):
+        """Test that batched validation caches are not replayed at another batch size."""
+        _, val_small = lstm_trainer._dataset_cache_paths(arrays, 32)
+        _, val_large = lstm_trainer._dataset_cache_paths(arrays, 64)
+
+        assert val_small != val_large
+
+class TestBatchSizeTuning:
+    """Test suite for keeping the tuned LSTM batch size out of the caller's config."""
+
+    def test_tuned_size_not_written_to_config(self, trainer_config, heart_rate_frame):
+        """Test that a tuned batch size is kept on the trainer, not in training_config."""
+        trainer = LSTMTrainer(trainer_config, enable_gpu=False)
+        arrays = (np.zeros((4, 2, 1)), np.zeros((2, 2, 1)), np.zeros(4), np.zeros(2))
+
+        with patch.object(trainer_module, "mlflow"), \
+                patch.object(trainer_module.tf.config, "list_physical_devices",
+                             return_value=["GPU:0"]), \
+                patch.object(trainer, "prepare_training_data", return_value=arrays), \
+                patch.object(trainer, "_tune_batch_size", return_value=256), \
+                patch.object(trainer, "_create_study"), \
+                patch.object(trainer, "_make_objective"), \
+                patch.object(trainer, "_train_final_model"), \
+                patch.object(trainer, "evaluator"), \
+                patch.object(trainer, "_log_run_metrics"):
+            trainer.train(heart_rate_frame, "heart_rate")
+
+        assert trainer.batch_size == 256
+        assert "batch_size" not in trainer_config
+        assert "batch_size" not in trainer.training_config
+
+    def test_caller_batch_size_kept(self, trainer_config):
+        """Test that an explicit batch size is used as given."""
+        trainer = LSTMTrainer({**trainer_config, "batch_size": 48}, enable_gpu=False)
+
+        assert trainer.batch_size == 48
+
+class TestTrainingDataCache:
+    """Test suite for the opt-in encrypted cache of preprocessed training arrays."""
+
+    def test_disabled_by_default(self, trainer_config):
+        """Test that nothing is cached unless a cache directory is configured."""
+        trainer = ModelTrainer(trainer_config, enable_gpu=False)
+
+        assert trainer._data_cache_dir("fingerprint") is None
+        assert trainer._load_cached_arrays(None) is None
+
+    def test_round_trip_encrypted(self, cached_trainer, tmp_path):
+        """Test that cached arrays are stored encrypted and load back unchanged."""
+        X = np.arange(12, dtype=np.float32).reshape(4, 3)
+        y = np.arange(4, dtype=np.float32)
+        cache_dir = cached_trainer._data_cache_dir("entry")
+
+        cached_trainer._store_cached_arrays(cache_dir, X, y, {"missing_ratio": 0.0})
+        X_cached, y_cached, quality_metrics = cached_trainer._load_cached_arrays(cache_dir)
+
+        np.testing.assert_array_equal(X_cached, X)
+        np.testing.assert_array_equal(y_cached, y)
+        assert quality_metrics == {"missing_ratio": 0.0}
+        assert sorted(p.name for p in (tmp_path / "cache" / "entry").iterdir()) == [
+            "arrays.enc", "quality.json"
+        ]
+        assert (tmp_path / "cache" / "entry" / "arrays.enc").read_bytes().startswith(b"encrypted:")
+
+    def test_fingerprint_tracks_preprocessing_version(self, heart_rate_frame, monkeypatch):
+        """Test that bumping the preprocessing version invalidates cache keys."""
+        before = ModelTrainer._data_fingerprint(heart_rate_frame, "heart_rate", None)
+        monkeypatch.setattr(trainer_module, "PREPROCESSING_CACHE_VERSION",
+                            trainer_module.PREPROCESSING_CACHE_VERSION + 1)
+
+        assert ModelTrainer._data_fingerprint(heart_rate_frame, "heart_rate", None) != before
+
+    def test_cache_bounded(self, cached_trainer, tmp_path):
+        """Test that the cache keeps at most the configured number of entries."""
+        X = np.zeros((2, 2), dtype=np.float32)
+        y = np.zeros(2, dtype=np.float32)
+
+        for name in ("first", "second", "third"):
+            cached_trainer._store_cached_arrays(cached_trainer._data_cache_dir(name), X, y, {})
+
+        assert len(list((tmp_path / "cache").iterdir())) == 2
+
+class TestBatchedPrediction:
+    """Test suite for large-batch inference when scoring trained models."""
+
+    @pytest.mark.parametrize("chunk_size", [7, 16, 1000])
+    def test_chunked_matches_single_call(self, chunk_size):
+        """Test that concurrent chunked forest inference keeps row order and values."""
+        rng = np.random.default_rng(2)
+        X = rng.normal(size=(50, 4)).astype(np.float32)
+        model = RandomForestRegressor(n_estimators=5, random_state=0).fit(X, rng.normal(size=50))
+
+        predictions = RandomForestTrainer._predict_chunked(model, X, chunk_size)
+
+        np.testing.assert_array_equal(predictions, model.predict(X))
+
+    @pytest.mark.parametrize("backend", ["hgb", "cuml"])
+    def test_single_call_outside_sklearn(self, backend):
+        """Test that GPU and OpenMP-parallel backends are not split across threads."""
+        model = MagicMock()
+        X = np.zeros((50, 4), dtype=np.float32)
+
+        predictions = RandomForestTrainer._predict_final(model, X, backend, 7)
+
+        model.predict.assert_called_once_with(X)
+        assert predictions is model.predict.return_value
+
+    def test_sklearn_forest_chunked(self):
+        """Test that the sklearn forest is scored in concurrent chunks."""
+        model = MagicMock()
+        model.predict.side_effect = lambda chunk: np.zeros(len(chunk))
+
+        predictions = RandomForestTrainer._predict_final(model, np.zeros((50, 4)), "sklearn", 7)
+
+        assert model.predict.call_count == 8
+        assert predictions.shape == (50,)
+
+    def test_lstm_scored_in_large_batches(self, trainer_config, heart_rate_frame):
+        """Test that the final LSTM is scored with the configured inference batch size."""
+        trainer = LSTMTrainer({**trainer_config, "predict_batch_size": 512}, enable_gpu=False)
+        arrays = (np.zeros((4, 2, 1)), np.zeros((2, 2, 1)), np.zeros(4), np.zeros(2))
+
+        with patch.object(trainer_module, "mlflow"), \
+                patch.object(trainer_module.tf.config, "list_physical_devices", return_value=[]), \
+                patch.object(trainer, "prepare_training_data", return_value=arrays), \
+                patch.object(trainer, "_create_study"), \
+                patch.object(trainer, "_make_objective"), \
+                patch.object(trainer, "_train_final_model") as train_final, \
+                patch.object(trainer, "evaluator"), \
+                patch.object(trainer, "_log_run_metrics"):
+            trainer.train(heart_rate_frame, "heart_rate")
+
+        for predict_call in train_final.return_value.predict.call_args_list:
+            assert predict_call.kwargs["batch_size"] == 512
+        assert train_final.return_value.predict.call_count == 2
+
+class TestForestBackend:
+    """Test suite for selecting the tree ensemble backend."""
+
+    @pytest.mark.parametrize("backend, model_class", [
+        ("sklearn", RandomForestRegressor),
+        ("hgb", HistGradientBoostingRegressor)
+    ])
+    def test_cpu_backends(self, backend, model_class):
+        """Test that CPU backends resolve to their scikit-learn estimators."""
+        assert RandomForestTrainer._resolve_model_class(backend) is model_class
+
+    def test_cuml_requires_rapids(self, monkeypatch):
+        """Test that the cuML backend fails clearly when RAPIDS is not installed."""
+        monkeypatch.setattr(trainer_module, "CUML_AVAILABLE", False)
+
+        with pytest.raises(ImportError, match="cuML"):
+            RandomForestTrainer._resolve_model_class("cuml")
+
+    def test_unknown_backend(self):
+        """Test that unknown backends are rejected."""
+        with pytest.raises(ValueError, match="Unsupported rf_backend"):
+            RandomForestTrainer._resolve_model_class("xgboost")
+
+    @pytest.mark.parametrize("backend, size_param", [("sklearn", "n_estimators"),
+                                                     ("hgb", "max_iter")])
+    def test_suggested_params_fit_backend(self, backend, size_param):
+        """Test that sampled hyperparameters are accepted by the resolved estimator."""
+        trial = MagicMock(**{"suggest_int.side_effect": lambda name, low, high: low,
+                             "suggest_float.side_effect": lambda name, low, high, log: low})
+
+        params = RandomForestTrainer._suggest_params(trial, backend)
+
+        model = RandomForestTrainer._resolve_model_class(backend)(**params)
+        assert size_param in params
+        assert model.get_params()[size_param] == params[size_param]
+
+class TestTrainingArrays:
+    """Test suite for the arrays handed to training by prepare_training_data."""
+
+    @pytest.fixture
+    def processed_frame(self):
+        """Fixture for a preprocessed float64 frame whose target is the row number."""
+        return pd.DataFrame({
+            "heart_rate": np.linspace(60.0, 90.0, TEST_ROWS),
+            "steps": np.arange(TEST_ROWS) * 10,
+            "target": np.arange(TEST_ROWS, dtype=np.float64)
+        })
+
+    @pytest.fixture
+    def make_trainer(self, trainer_config, processed_frame):
+        """Build a trainer whose preprocessor returns the processed frame."""
+        def make(**config):
+            trainer = ModelTrainer({**trainer_config, **config}, enable_gpu=False)
+            trainer.preprocessor = MagicMock(**{
+                "preprocess_health_metrics.return_value": (processed_frame, {"missing_ratio": 0.0})
+            })
+            return trainer
+        return make
+
+    def test_float32_features_and_target(self, make_trainer, heart_rate_frame):
+        """Test that every split is float32 regardless of the preprocessed dtypes."""
+        splits = make_trainer().prepare_training_data(heart_rate_frame, "heart_rate")
+
+        assert [array.dtype for array in splits] == [np.float32] * 4
+
+    def test_temporal_split_holds_out_latest_rows(self, make_trainer, heart_rate_frame):
+        """Test that the default split keeps time order and validates on the newest rows."""
+        X_train, X_val, y_train, y_val = make_trainer().prepare_training_data(
+            heart_rate_frame, "heart_rate"
+        )
+
+        split = int(TEST_ROWS * 0.8)
+        np.testing.assert_array_equal(y_train, np.arange(split))
+        np.testing.assert_array_equal(y_val, np.arange(split, TEST_ROWS))
+        assert X_train.base is not None and X_train.base is X_val.base
+
+    def test_shuffled_split_reproducible(self, make_trainer, heart_rate_frame):
+        """Test that disabling the temporal split gives a seeded random partition."""
+        first = make_trainer(temporal_split=False).prepare_training_data(
+            heart_rate_frame, "heart_rate"
+        )
+        second = make_trainer(temporal_split=False).prepare_training_data(
+            heart_rate_frame, "heart_rate"
+        )
+
+        np.testing.assert_array_equal(first[3], second[3])
+        assert sorted(np.r_[first[2], first[3]]) == list(range(TEST_ROWS))
+        assert not np.array_equal(first[2], np.sort(first[2]))
+
+class TestRunMetricsLogging:
+    """Test suite for the single batched MLflow metrics call per run."""
+
+    def test_one_batched_call(self, trainer_config, monkeypatch):
+        """Test that quality, train and validation metrics go out in one prefixed batch."""
+        mlflow = MagicMock()
+        monkeypatch.setattr(trainer_module, "mlflow", mlflow)
+        trainer = ModelTrainer(trainer_config, enable_gpu=False)
+        trainer.quality_metrics = {"metric_type": "heart_rate", "missing_ratio": 0.1}
+
+        trainer._log_run_metrics({"mse": 1.0, "r2": 0.9}, {"mse": 2.0})
+
+        mlflow.log_metrics.assert_called_once_with({
+            "quality_missing_ratio": 0.1,
+            "train_mse": 1.0,
+            "train_r2": 0.9,
+            "val_mse": 2.0
+        })
+        mlflow.log_metric.assert_not_called()
+
+class TestSamplerSelection:
+    """Test suite for the configurable LSTM search sampler."""
+
+    @pytest.fixture
+    def samplers(self, monkeypatch):
+        """Replace Optuna's samplers with mocks."""
+        samplers = MagicMock()
+        monkeypatch.setattr(trainer_module.optuna, "samplers", samplers)
+        return samplers
+
+    def test_multivariate_tpe_by_default(self, trainer_config, samplers):
+        """Test that the default sampler models conditional parameters jointly."""
+        trainer = LSTMTrainer(trainer_config, enable_gpu=False)
+
+        sampler = trainer._create_sampler(seed=7)
+
+        samplers.TPESampler.assert_called_once_with(multivariate=True, group=True, seed=7)
+        assert sampler is samplers.TPESampler.return_value
+
+    @pytest.mark.parametrize("name, sampler_class", [("cmaes", "CmaEsSampler"),
+                                                      ("gp", "GPSampler")])
+    def test_continuous_samplers_fall_back_to_tpe(self, trainer_config, samplers,
+                                                  name, sampler_class):
+        """Test that CMA-ES and GP samplers hand conditional parameters to TPE."""
+        trainer = LSTMTrainer({**trainer_config, "sampler": name}, enable_gpu=False)
+
+        sampler = trainer._create_sampler(seed=None)
+
+        sampler_factory = getattr(samplers, sampler_class)
+        assert sampler is sampler_factory.return_value
+        assert sampler_factory.call_args.kwargs["independent_sampler"] is (
+            samplers.TPESampler.return_value
+        )
+        assert sampler_factory.call_args.kwargs["seed"] is None
+
+    def test_unknown_sampler(self, trainer_config, samplers):
+        """Test that unknown sampler names are rejected."""
+        trainer = LSTMTrainer({**trainer_config, "sampler": "random"}, enable_gpu=False)
+
+        with pytest.raises(ValueError, match="Unsupported sampler"):
+            trainer._create_sampler(seed=None)
+
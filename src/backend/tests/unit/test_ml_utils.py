@@ -0,0 +1,616 @@
+"""
+Unit tests for machine learning data utilities covering missing value handling,
+time series preparation, feature matrix construction and normalization.
+
+Version: 1.0.0
+"""
+
+from unittest.mock import MagicMock
+
+import pytest  # pytest v7.4+
+import numpy as np  # numpy v1.23+
+import pandas as pd  # pandas v2.0+
+from sklearn.preprocessing import RobustScaler  # scikit-learn v1.2+
+
+import ml.utils as ml_utils_module
+from ml.utils import MLUtilsManager
+from ml.utils import data as data_module
+from ml.utils import metrics as metrics_module
+from ml.utils.data import (
+    INT8_MAX,
+    INT8_NAN_CODE,
+    _fill_missing,
+    clean_data,
+    create_feature_matrix,
+    dequantize_int8,
+    quantize_int8,
+    DataPreprocessor
+)
+from ml.utils.metrics import (
+    ModelEvaluator,
+    bootstrap_intervals,
+    calculate_confidence_score,
+    calculate_prediction_intervals
+)
+
+# Test configuration constants
+TEST_SEQUENCE_LENGTH = 4
+TEST_ROWS = 32
+
+@pytest.fixture
+def gappy_frame():
+    """Fixture for a mixed-dtype frame with leading, interior and trailing gaps."""
+    return pd.DataFrame({
+        "heart_rate": [np.nan, 72.0, np.nan, np.nan, 75.0, np.nan],
+        "weight": np.array([70.0, np.nan, 71.0, np.nan, np.nan, 72.0], dtype=np.float32),
+        "steps": [100, 200, 300, 400, 500, 600],
+        "label": ["a", None, "b", None, "c", None]
+    })
+
+class TestFillMissing:
+    """Test suite for forward and backward filling of missing values."""
+
+    @pytest.mark.parametrize("n_columns", [1, 3])
+    def test_kernel_warmed_for_runtime_layout(self, n_columns):
+        """Test that the import-time warm-up compiled the layout forward filling passes."""
+        numba = pytest.importorskip("numba")
+        if not data_module.NUMBA_AVAILABLE:
+            pytest.skip("numba kernel disabled")
+        values = np.zeros((TEST_ROWS, n_columns), order="F")
+
+        compiled = [signature[0] for signature in data_module._ffill_columns_inplace.signatures]
+
+        assert numba.typeof(values) in compiled
+
+    @pytest.mark.parametrize("strategy", ["forward_fill", "ffill", "pad"])
+    def test_forward_fill_matches_pandas(self, gappy_frame, strategy):
+        """Test forward filling against pandas for every column dtype."""
+        filled = _fill_missing(gappy_frame, strategy)
+
+        pd.testing.assert_frame_equal(filled, gappy_frame.ffill())
+
+    def test_backward_fill_matches_pandas(self, gappy_frame):
+        """Test backward filling against pandas."""
+        pd.testing.assert_frame_equal(_fill_missing(gappy_frame, "bfill"), gappy_frame.bfill())
+
+    def test_input_frame_not_modified(self, gappy_frame):
+        """Test that filling never writes into the caller's frame."""
+        original = gappy_frame.copy()
+
+        _fill_missing(gappy_frame, "forward_fill")
+
+        pd.testing.assert_frame_equal(gappy_frame, original)
+
+    def test_float64_frame_fills(self):
+        """Regression: float64 columns can come back as read-only views under copy-on-write."""
+        df = pd.DataFrame({"a": [1.0, np.nan, 3.0], "b": [np.nan, 2.0, np.nan]})
+
+        filled = _fill_missing(df, "forward_fill")
+
+        np.testing.assert_array_equal(filled["a"].to_numpy(), [1.0, 1.0, 3.0])
+        np.testing.assert_array_equal(filled["b"].to_numpy(), [np.nan, 2.0, 2.0])
+
+    def test_empty_frame(self, gappy_frame):
+        """Test that a frame without rows is returned unchanged."""
+        empty = gappy_frame.iloc[:0]
+
+        pd.testing.assert_frame_equal(_fill_missing(empty, "forward_fill"), empty)
+
+    def test_unsupported_strategy(self, gappy_frame):
+        """Test rejection of unknown strategies."""
+        with pytest.raises(ValueError):
+            _fill_missing(gappy_frame, "interpolate")
+
+    def test_clean_data_with_float_columns(self, gappy_frame):
+        """Regression: clean_data must not crash on frames with float columns."""
+        cleaned = clean_data(gappy_frame, {"missing_strategy": "forward_fill"})
+
+        assert not cleaned[["weight", "steps"]].isna().any().any()
+
+    def test_prepare_time_series_with_float_columns(self):
+        """Regression: prepare_time_series must not crash on frames with float columns."""
+        df = pd.DataFrame({
+            "heart_rate": np.linspace(60.0, 90.0, TEST_ROWS),
+            "steps": np.arange(TEST_ROWS, dtype=np.float64)
+        })
+        df.iloc[3, 0] = np.nan
+
+        X, y = DataPreprocessor().prepare_time_series(df, TEST_SEQUENCE_LENGTH, "heart_rate")
+
+        assert X.shape == (TEST_ROWS - TEST_SEQUENCE_LENGTH, TEST_SEQUENCE_LENGTH, 2)
+        assert not np.isnan(X).any()
+        assert len(y) == TEST_ROWS - TEST_SEQUENCE_LENGTH
+
+@pytest.fixture
+def vitals_frame():
+    """Fixture for a two-feature vitals frame with distinct values in every cell."""
+    return pd.DataFrame({
+        "heart_rate": np.linspace(60.0, 90.0, TEST_ROWS),
+        "steps": np.arange(TEST_ROWS, dtype=np.float64) * 10.0
+    })
+
+class TestCleanData:
+    """Test suite for duplicate, missing value and outlier cleaning."""
+
+    @pytest.fixture
+    def noisy_frame(self):
+        """Fixture for a frame with one gross outlier per numeric column and a constant column."""
+        rng = np.random.default_rng(7)
+        frame = pd.DataFrame({
+            "heart_rate": rng.normal(70.0, 3.0, TEST_ROWS),
+            "steps": rng.normal(500.0, 50.0, TEST_ROWS),
+            "device": np.full(TEST_ROWS, 1.0),
+            "label": ["a"] * TEST_ROWS
+        })
+        frame.loc[3, "heart_rate"] = 400.0
+        frame.loc[9, "steps"] = 50_000.0
+        return frame
+
+    def test_outlier_rows_match_per_column_filter(self, noisy_frame):
+        """Test that the single row mask keeps exactly the rows a per-column filter keeps."""
+        cleaned = clean_data(noisy_frame, {"missing_strategy": "forward_fill"})
+
+        keep = pd.Series(True, index=noisy_frame.index)
+        for column in ["heart_rate", "steps"]:
+            values = noisy_frame[column]
+            keep &= (values - values.mean()).abs() < 3.0 * values.std()
+        pd.testing.assert_frame_equal(cleaned, noisy_frame[keep])
+
+    def test_constant_column_keeps_rows(self, noisy_frame):
+        """Test that zero-variance columns never flag rows."""
+        frame = noisy_frame.drop(index=[3, 9])
+
+        cleaned = clean_data(frame, {})
+
+        assert len(cleaned) == len(frame)
+
+    def test_outlier_removal_optional(self, noisy_frame):
+        """Test that outliers are kept when removal is disabled."""
+        cleaned = clean_data(noisy_frame, {"remove_outliers": False})
+
+        assert len(cleaned) == TEST_ROWS
+
+    def test_no_numeric_columns(self):
+        """Test that frames without numeric columns skip outlier removal."""
+        frame = pd.DataFrame({"label": ["a", "b", "c"], "unit": ["bpm", "bpm", "kg"]})
+
+        cleaned = clean_data(frame, {})
+
+        pd.testing.assert_frame_equal(cleaned, frame)
+
+    def test_numeric_columns_detected_after_fill(self, noisy_frame, caplog):
+        """Test that the numeric column scan sees every column and the quality log is written."""
+        noisy_frame["steps"] = noisy_frame["steps"].round().astype(np.int64)
+
+        with caplog.at_level("INFO", logger=data_module.__name__):
+            cleaned = clean_data(noisy_frame, {})
+
+        assert 9 not in cleaned.index
+        assert 3 not in cleaned.index
+        assert f"'row_count': {len(cleaned)}" in caplog.text
+
+class TestNormalization:
+    """Test suite for metric scaler fitting and reuse."""
+
+    def test_first_batch_fits_scaler(self):
+        """Test that the scaler is fitted on the first batch and reused afterwards."""
+        preprocessor = DataPreprocessor()
+        first = np.linspace(60.0, 90.0, TEST_ROWS)
+        preprocessor.normalize_health_metrics(first, "heart_rate")
+        center = preprocessor.scalers["heart_rate"].center_.copy()
+
+        normalized = preprocessor.normalize_health_metrics(first + 100.0, "heart_rate")
+
+        np.testing.assert_array_equal(preprocessor.scalers["heart_rate"].center_, center)
+        assert normalized.min() > 0
+
+    def test_explicit_refit(self):
+        """Test that fit=True refits on the given batch."""
+        preprocessor = DataPreprocessor()
+        preprocessor.normalize_health_metrics(np.linspace(60.0, 90.0, TEST_ROWS), "heart_rate")
+
+        normalized = preprocessor.normalize_health_metrics(
+            np.linspace(160.0, 190.0, TEST_ROWS), "heart_rate", fit=True
+        )
+
+        assert np.median(normalized) == pytest.approx(0.0)
+
+    def test_gpu_request_without_cuml(self, monkeypatch):
+        """Test that use_gpu falls back to CPU scalers when RAPIDS is not installed."""
+        monkeypatch.setattr(data_module, "CUML_AVAILABLE", False)
+        preprocessor = DataPreprocessor({"use_gpu": True})
+
+        normalized = preprocessor.normalize_health_metrics(
+            np.linspace(60.0, 90.0, TEST_ROWS), "heart_rate"
+        )
+
+        assert not preprocessor.use_gpu
+        assert isinstance(preprocessor.scalers["heart_rate"], RobustScaler)
+        assert isinstance(normalized, np.ndarray)
+
+    def test_missing_values_filled_with_mean(self):
+        """Test that NaNs are filled with the observed mean without modifying the input."""
+        data = np.array([60.0, np.nan, 80.0, 70.0, np.nan, 90.0])
+        original = data.copy()
+        filled = np.where(np.isnan(data), np.nanmean(data), data)
+        expected = RobustScaler().fit_transform(filled.reshape(-1, 1))
+
+        normalized = DataPreprocessor().normalize_health_metrics(data, "heart_rate")
+
+        np.testing.assert_allclose(normalized, expected)
+        np.testing.assert_array_equal(data, original)
+
+    def test_batch_matches_sequential_loop(self):
+        """Test that parallel batch normalization matches a sequential per-patient loop."""
+        rng = np.random.default_rng(7)
+        patients = [rng.normal(75.0, 10.0, TEST_ROWS) for _ in range(4)]
+        sequential = DataPreprocessor()
+        expected = [sequential.normalize_health_metrics(p, "heart_rate") for p in patients]
+
+        batch = DataPreprocessor().normalize_batch(patients, "heart_rate")
+
+        assert len(batch) == len(expected)
+        for result, reference in zip(batch, expected):
+            np.testing.assert_allclose(result, reference)
+
+    def test_empty_batch(self):
+        """Test that an empty batch leaves the scaler unfitted."""
+        preprocessor = DataPreprocessor()
+
+        assert preprocessor.normalize_batch([], "heart_rate") == []
+        assert "heart_rate" not in preprocessor._fitted
+
+class TestTimeSeriesWindows:
+    """Test suite for strided window construction in prepare_time_series."""
+
+    def test_windows_match_loop(self, vitals_frame):
+        """Test that each window and target match a plain slicing loop."""
+        X, y = DataPreprocessor().prepare_time_series(vitals_frame, TEST_SEQUENCE_LENGTH,
+                                                      "heart_rate")
+
+        values = vitals_frame.to_numpy()
+        for i in range(TEST_ROWS - TEST_SEQUENCE_LENGTH):
+            np.testing.assert_array_equal(X[i], values[i:i + TEST_SEQUENCE_LENGTH])
+            assert y[i] == values[i + TEST_SEQUENCE_LENGTH, 0]
+
+    def test_windows_are_read_only_views(self, vitals_frame):
+        """Test that windows share one buffer instead of copying per window."""
+        X, _ = DataPreprocessor().prepare_time_series(vitals_frame, TEST_SEQUENCE_LENGTH)
+
+        assert not X.flags.writeable
+        assert np.shares_memory(X[0], X[1])
+
+    def test_time_axis_contiguous(self, vitals_frame):
+        """Test that each feature's time axis inside a window is contiguous in memory."""
+        X, _ = DataPreprocessor().prepare_time_series(vitals_frame, TEST_SEQUENCE_LENGTH)
+
+        assert X.strides[1] == X.itemsize
+
+    def test_too_short_for_a_window(self, vitals_frame):
+        """Test that frames no longer than the sequence length yield no windows."""
+        X, y = DataPreprocessor().prepare_time_series(
+            vitals_frame.head(TEST_SEQUENCE_LENGTH), TEST_SEQUENCE_LENGTH, "heart_rate"
+        )
+
+        assert X.shape == (0, TEST_SEQUENCE_LENGTH, 2)
+        assert len(y) == 0
+
+class TestQuantizedTimeSeries:
+    """Test suite for int8 quantization in time series preparation."""
+
+    def test_non_numeric_columns_excluded(self):
+        """Regression: quantization must not fail on frames with a timestamp column."""
+        df = pd.DataFrame({
+            "timestamp": pd.date_range("2024-01-01", periods=TEST_ROWS, freq="h"),
+            "heart_rate": np.linspace(60.0, 90.0, TEST_ROWS),
+            "steps": np.arange(TEST_ROWS)
+        })
+        preprocessor = DataPreprocessor({"quantize": True})
+
+        X, y = preprocessor.prepare_time_series(df, TEST_SEQUENCE_LENGTH, "heart_rate")
+
+        assert X.dtype == np.int8
+        assert X.shape == (TEST_ROWS - TEST_SEQUENCE_LENGTH, TEST_SEQUENCE_LENGTH, 2)
+        assert preprocessor.quantization_columns["time_series"] == ["heart_rate", "steps"]
+        assert len(y) == TEST_ROWS - TEST_SEQUENCE_LENGTH
+
+    def test_codes_round_trip(self):
+        """Test that quantized windows dequantize back to the source values."""
+        df = pd.DataFrame({"heart_rate": np.linspace(60.0, 90.0, TEST_ROWS)})
+        preprocessor = DataPreprocessor({"quantize": True})
+
+        X, _ = preprocessor.prepare_time_series(df, TEST_SEQUENCE_LENGTH)
+        restored = dequantize_int8(X[0], preprocessor.quantization_scales["time_series"])
+
+        expected = df["heart_rate"].to_numpy()[:TEST_SEQUENCE_LENGTH]
+        np.testing.assert_allclose(restored[:, 0], expected, atol=90.0 / INT8_MAX)
+
+class TestFeatureMatrix:
+    """Test suite for feature matrix construction."""
+
+    @pytest.fixture
+    def feature_frame(self):
+        """Fixture for a frame with float, integer and categorical features."""
+        return pd.DataFrame({
+            "heart_rate": np.linspace(60.0, 90.0, TEST_ROWS),
+            "steps": np.arange(TEST_ROWS, dtype=np.int64) % 7,
+            "activity": ["walk", "run", "rest", "walk"] * (TEST_ROWS // 4)
+        })
+
+    def test_values_match_per_column_conversion(self, feature_frame):
+        """Test that numeric columns are copied and other columns become categorical codes."""
+        columns = ["heart_rate", "steps", "activity"]
+
+        matrix = create_feature_matrix(feature_frame, columns)
+
+        expected = np.column_stack([
+            feature_frame["heart_rate"].to_numpy(np.float32),
+            feature_frame["steps"].to_numpy(np.float32),
+            pd.Categorical(feature_frame["activity"]).codes.astype(np.float32)
+        ])
+        assert matrix.dtype == np.float32
+        np.testing.assert_array_equal(matrix, expected)
+
+    def test_missing_column(self, feature_frame):
+        """Test that unknown feature columns are rejected."""
+        with pytest.raises(ValueError, match="Missing columns"):
+            create_feature_matrix(feature_frame, ["heart_rate", "weight"])
+
+    def test_correlated_features_warn(self, feature_frame, caplog):
+        """Test that near-duplicate features trigger the multicollinearity warning."""
+        feature_frame["pulse"] = feature_frame["heart_rate"] * 2.0 + 1.0
+
+        with caplog.at_level("WARNING", logger=data_module.__name__):
+            create_feature_matrix(feature_frame, ["heart_rate", "pulse"])
+
+        assert "High correlation" in caplog.text
+
+    def test_uncorrelated_features_silent(self, feature_frame, caplog):
+        """Test that the diagonal self-correlation never triggers the warning."""
+        with caplog.at_level("WARNING", logger=data_module.__name__):
+            create_feature_matrix(feature_frame, ["heart_rate", "steps"])
+
+        assert "High correlation" not in caplog.text
+
+    def test_sampled_screen_still_warns(self, feature_frame, caplog, monkeypatch):
+        """Test that the row-sampled screen on large frames still detects correlation."""
+        monkeypatch.setattr(data_module, "CORRELATION_SAMPLE_ROWS", TEST_ROWS // 2)
+        feature_frame["pulse"] = feature_frame["heart_rate"] + 0.5
+
+        with caplog.at_level("WARNING", logger=data_module.__name__):
+            create_feature_matrix(feature_frame, ["heart_rate", "pulse"])
+
+        assert "High correlation" in caplog.text
+
+    def test_quantized_matrix(self, feature_frame):
+        """Test that quantize returns int8 codes that dequantize within one step per column."""
+        columns = ["heart_rate", "steps", "activity"]
+        matrix = create_feature_matrix(feature_frame, columns)
+
+        codes, scales = create_feature_matrix(feature_frame, columns, quantize=True)
+
+        assert codes.dtype == np.int8
+        assert scales.shape == (len(columns),)
+        np.testing.assert_allclose(dequantize_int8(codes, scales), matrix, atol=np.max(1 / scales))
+
+class TestInt8Quantization:
+    """Test suite for symmetric per-column int8 quantization."""
+
+    def test_column_maximum_maps_to_int8_max(self):
+        """Test that each column's largest magnitude uses the full int8 range."""
+        values = np.array([[1.0, -40.0], [0.5, 20.0], [-0.25, 10.0]])
+
+        codes, _ = quantize_int8(values)
+
+        np.testing.assert_array_equal(np.abs(codes).max(axis=0), [INT8_MAX, INT8_MAX])
+
+    def test_zero_column(self):
+        """Test that an all-zero column quantizes to zeros with a unit scale."""
+        values = np.zeros((4, 2), dtype=np.float32)
+        values[:, 1] = [1.0, 2.0, 3.0, 4.0]
+
+        codes, scales = quantize_int8(values)
+
+        assert not codes[:, 0].any()
+        assert scales[0] == 1.0
+        np.testing.assert_allclose(dequantize_int8(codes, scales), values, atol=4.0 / INT8_MAX)
+
+    def test_nan_round_trip(self):
+        """Test that NaN gets the reserved code, is left out of the scale and comes back."""
+        values = np.array([[np.nan, np.nan], [2.0, np.nan], [-4.0, np.nan]], dtype=np.float32)
+
+        codes, scales = quantize_int8(values)
+
+        assert codes[0, 0] == INT8_NAN_CODE and (codes[:, 1] == INT8_NAN_CODE).all()
+        np.testing.assert_array_equal(codes[1:, 0], [64, -INT8_MAX])
+        np.testing.assert_allclose(dequantize_int8(codes, scales), values, atol=4.0 / INT8_MAX)
+
+    def test_infinite_values_rejected(self):
+        """Test that infinities, which have no finite scale, are rejected."""
+        with pytest.raises(ValueError):
+            quantize_int8(np.array([[1.0], [np.inf]]))
+
+    def test_time_series_leading_gap(self):
+        """Test that leading gaps forward filling cannot reach stay missing when quantized."""
+        df = pd.DataFrame({"heart_rate": np.linspace(60.0, 90.0, TEST_ROWS)})
+        df.iloc[0, 0] = np.nan
+        preprocessor = DataPreprocessor({"quantize": True})
+
+        X, _ = preprocessor.prepare_time_series(df, TEST_SEQUENCE_LENGTH, "heart_rate")
+
+        assert X[0, 0, 0] == INT8_NAN_CODE
+        assert (X[1:] != INT8_NAN_CODE).all()
+
+class TestTimeSeriesMetrics:
+    """Test suite for the fused time series metric pass."""
+
+    @pytest.fixture
+    def evaluator(self):
+        """Fixture for a CPU-only model evaluator."""
+        return ModelEvaluator(enable_gpu=False)
+
+    @pytest.fixture
+    def series(self):
+        """Fixture for a noisy forecast of a trending series with a zero target."""
+        rng = np.random.default_rng(11)
+        y_true = np.linspace(0.0, 10.0, TEST_ROWS) + rng.normal(0.0, 1.0, TEST_ROWS)
+        y_true[0] = 0.0
+        return y_true, y_true + rng.normal(0.5, 1.0, TEST_ROWS)
+
+    def test_empty_series(self, evaluator):
+        """Test that an empty series yields NaN metrics instead of dividing by zero."""
+        metrics = evaluator.calculate_time_series_metrics(np.array([]), np.array([]))
+
+        for name in ("mape", "smape", "directional_accuracy", "forecast_bias"):
+            assert np.isnan(metrics[name])
+
+    def test_matches_numpy_reference(self, evaluator, series):
+        """Test that the fused pass matches the separate NumPy formulas."""
+        y_true, y_pred = series
+        eps = metrics_module.TIME_SERIES_EPSILON
+
+        metrics = evaluator.calculate_time_series_metrics(y_true, y_pred)
+
+        error = y_pred - y_true
+        assert metrics["mape"] == pytest.approx(np.mean(np.abs(error / (y_true + eps))) * 100)
+        assert metrics["smape"] == pytest.approx(
+            np.mean(2 * np.abs(error) / (np.abs(y_true) + np.abs(y_pred) + eps)) * 100
+        )
+        assert metrics["directional_accuracy"] == pytest.approx(
+            np.mean((np.diff(y_true) > 0) == (np.diff(y_pred) > 0))
+        )
+        assert metrics["forecast_bias"] == pytest.approx(np.mean(error))
+
+    def test_single_point(self, evaluator):
+        """Test that a single point has no directional accuracy."""
+        metrics = evaluator.calculate_time_series_metrics(np.array([1.0]), np.array([2.0]))
+
+        assert np.isnan(metrics["directional_accuracy"])
+        assert metrics["forecast_bias"] == pytest.approx(1.0)
+
+    @pytest.mark.parametrize("period", [1, 5, 7, TEST_ROWS, TEST_ROWS + 3])
+    def test_seasonal_error_matches_loop(self, evaluator, series, period):
+        """Test that the phase-column reduction matches a per-phase mean loop."""
+        y_true, y_pred = series
+        residuals = y_true - y_pred
+        expected = [
+            residuals[phase::period].mean() if phase < len(residuals) else 0.0
+            for phase in range(period)
+        ]
+
+        metrics = evaluator.calculate_time_series_metrics(y_true, y_pred, {"period": period})
+
+        np.testing.assert_allclose(metrics["seasonal_error"], expected)
+
+class TestConfidenceScore:
+    """Test suite for temperature-scaled confidence and uncertainty."""
+
+    @pytest.fixture
+    def probabilities(self):
+        """Fixture for softmax outputs over four classes."""
+        rng = np.random.default_rng(5)
+        logits = rng.normal(0.0, 2.0, (TEST_ROWS, 4))
+        return np.exp(logits) / np.exp(logits).sum(axis=1, keepdims=True)
+
+    @pytest.mark.parametrize("temperature", [0.5, 1.0, 2.0])
+    def test_matches_naive_softmax(self, probabilities, temperature):
+        """Test that log-space scaling matches the direct power-and-normalize formula."""
+        scaled = (probabilities + 1e-10) ** (1 / temperature)
+        scaled /= scaled.sum(axis=1, keepdims=True)
+        entropy = -np.sum(scaled * np.log(scaled), axis=1)
+
+        confidence, uncertainty = calculate_confidence_score(probabilities, temperature)
+
+        np.testing.assert_allclose(confidence, scaled.max(axis=1))
+        np.testing.assert_allclose(uncertainty, entropy / np.log(4))
+
+    def test_small_temperature_stays_finite(self, probabilities):
+        """Regression: very small temperatures must not underflow into NaN."""
+        confidence, uncertainty = calculate_confidence_score(probabilities, 1e-4)
+
+        assert np.isfinite(confidence).all()
+        assert np.isfinite(uncertainty).all()
+        np.testing.assert_allclose(confidence, 1.0)
+
+class TestPredictionIntervals:
+    """Test suite for normal and bootstrap prediction intervals."""
+
+    @pytest.fixture
+    def predictions(self):
+        """Fixture for ensemble predictions, one row per model."""
+        return np.random.default_rng(3).normal(70.0, 5.0, (TEST_ROWS, 3))
+
+    def test_two_sided_normal_quantile(self, predictions):
+        """Test that a 95% interval spans 1.96 standard errors either side of the mean."""
+        lower, upper, estimates = calculate_prediction_intervals(predictions, 0.95)
+
+        std_error = predictions.std(axis=0)
+        np.testing.assert_allclose(estimates["margin"], 1.959964 * std_error, rtol=1e-6)
+        np.testing.assert_allclose(upper - lower, 2 * estimates["margin"])
+        np.testing.assert_allclose((upper + lower) / 2, predictions.mean(axis=0))
+
+    def test_bootstrap_matches_resampling_loop(self, predictions):
+        """Test that the vectorized resampling matches a per-iteration loop on the same draws."""
+        n_bootstrap = 50
+        deviations = predictions - predictions.mean(axis=0)
+        rng = np.random.default_rng(42)
+        indices = rng.integers(0, len(deviations), size=(n_bootstrap, len(deviations)))
+        bounds = np.array([
+            np.quantile(deviations[rows], [0.025, 0.975], axis=0) for rows in indices
+        ])
+
+        lower, upper, estimates = bootstrap_intervals(predictions, n_bootstrap, 0.95, seed=42)
+
+        np.testing.assert_allclose(lower, predictions + bounds[:, 0].mean(axis=0))
+        np.testing.assert_allclose(upper, predictions + bounds[:, 1].mean(axis=0))
+        np.testing.assert_allclose(estimates["bound_std_error"], bounds.std(axis=0))
+
+    def test_bootstrap_reproducible(self, predictions):
+        """Test that a fixed seed reproduces the same bounds."""
+        first = bootstrap_intervals(predictions, 20, seed=1)
+        second = bootstrap_intervals(predictions, 20, seed=1)
+
+        np.testing.assert_array_equal(first[0], second[0])
+        np.testing.assert_array_equal(first[1], second[1])
+
+    def test_bootstrap_empty(self):
+        """Test that empty predictions yield empty bounds."""
+        lower, upper, estimates = bootstrap_intervals(np.array([]))
+
+        assert lower.size == upper.size == 0
+        assert estimates["margin"] == 0.0
+
+class TestMLUtilsManager:
+    """Test suite for the centralized ML utilities manager."""
+
+    @pytest.fixture
+    def manager(self, monkeypatch):
+        """Fixture for a CPU-only manager without a plotting backend."""
+        monkeypatch.setattr(ml_utils_module, "HealthMetricsVisualizer", MagicMock())
+        return MLUtilsManager(config={}, enable_gpu=False)
+
+    def test_float32_input_not_copied(self, manager, monkeypatch):
+        """Test that float32 arrays reach the preprocessor without an intermediate copy."""
+        normalize = MagicMock(return_value=np.zeros((TEST_ROWS, 1), dtype=np.float32))
+        monkeypatch.setattr(manager.preprocessor, "normalize_health_metrics", normalize)
+        data = np.linspace(60.0, 90.0, TEST_ROWS, dtype=np.float32)
+
+        manager.preprocess_health_data(data, "heart_rate")
+
+        assert normalize.call_args.args[0] is data
+
+    def test_list_input_matches_array(self, manager):
+        """Test that list input normalizes the same as the equivalent float32 array."""
+        values = np.linspace(60.0, 90.0, TEST_ROWS, dtype=np.float32)
+
+        from_array, _ = manager.preprocess_health_data(values, "heart_rate")
+        from_list, metadata = manager.preprocess_health_data(values.tolist(), "heart_rate")
+
+        np.testing.assert_allclose(from_list, from_array)
+        assert metadata["metric_type"] == "heart_rate"
+
+    def test_unsupported_metric(self, manager):
+        """Test that unknown metric types are rejected."""
+        with pytest.raises(ValueError, match="Unsupported metric type"):
+            manager.preprocess_health_data([1.0], "glucose")
+